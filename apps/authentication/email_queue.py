@@ -0,0 +1,214 @@
+"""
+Background email delivery.
+
+EmailService builds a message and hands it to ``send_email``, so the OTP form
+responds without waiting on the SMTP/TLS handshake with EMAIL_HOST. One
+sender thread drains the queue in batches over a single connection from
+``get_connection()``, which stays open while mail keeps coming and is closed
+after IDLE_SECONDS without any. A message that fails is retried on a fresh
+connection with exponential backoff, up to MAX_RETRIES attempts.
+
+The queue lives in memory and is bounded. OTP emails carry the plain code,
+which is never stored, and are only useful for a few minutes, so a message
+lost to a restart is recovered by requesting a new code. With ASYNC off (the
+test settings) messages are sent inline.
+
+``send_email`` returns False, and the caller reports the failure as before,
+when the queue is full or the sender is unhealthy. The sender is unhealthy
+until it has opened a connection once, and again after UNHEALTHY_AFTER
+messages in a row failed for good. While unhealthy, each ``send_email``
+opens a test connection first, so broken SMTP settings are reported to the
+user instead of a code that never arrives.
+"""
+
+import logging
+import queue
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger("sisimpur.authentication.email")
+
+EMAIL_QUEUE_CONFIG = getattr(settings, 'EMAIL_QUEUE_CONFIG', {})
+ASYNC = EMAIL_QUEUE_CONFIG.get('ASYNC', True)
+MAX_QUEUED = EMAIL_QUEUE_CONFIG.get('MAX_QUEUED', 500)
+BATCH_SIZE = EMAIL_QUEUE_CONFIG.get('BATCH_SIZE', 20)
+MAX_RETRIES = EMAIL_QUEUE_CONFIG.get('MAX_RETRIES', 3)
+RETRY_BASE_SECONDS = EMAIL_QUEUE_CONFIG.get('RETRY_BASE_SECONDS', 1)
+IDLE_SECONDS = EMAIL_QUEUE_CONFIG.get('IDLE_SECONDS', 30)
+UNHEALTHY_AFTER = EMAIL_QUEUE_CONFIG.get('UNHEALTHY_AFTER', 3)
+
+
+class EmailQueue:
+    """Bounded email queue drained by one sender thread over a reused SMTP connection"""
+
+    def __init__(self, max_queued=MAX_QUEUED, batch_size=BATCH_SIZE, max_retries=MAX_RETRIES,
+                 retry_base_seconds=RETRY_BASE_SECONDS, idle_seconds=IDLE_SECONDS,
+                 unhealthy_after=UNHEALTHY_AFTER, connection_factory=None):
+        self.queue = queue.Queue(maxsize=max_queued)
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.idle_seconds = idle_seconds
+        self.unhealthy_after = unhealthy_after
+        self.connection_factory = connection_factory or get_connection
+        self.connection = None
+        self.thread = None
+        # Guards the thread, the stats and the health state, shared by request threads and the sender
+        self.lock = threading.Lock()
+        self.stats = {'sent': 0, 'failed': 0, 'retried': 0, 'connections': 0, 'rejected': 0}
+        self.connected_once = False
+        self.consecutive_failures = 0
+
+    def count(self, stat):
+        """Increment a stats counter."""
+        with self.lock:
+            self.stats[stat] += 1
+
+    def healthy(self):
+        """
+        Whether messages handed to the sender can be expected to go out.
+
+        Healthy once a connection has been opened and while fewer than
+        unhealthy_after messages in a row failed for good; otherwise a test
+        connection is opened to find out.
+        """
+        with self.lock:
+            if self.connected_once and self.consecutive_failures < self.unhealthy_after:
+                return True
+        try:
+            connection = self.connection_factory(fail_silently=False)
+            connection.open()
+            connection.close()
+        except Exception as e:
+            logger.error(f"Email sender unhealthy, cannot connect to the mail server: {e}")
+            return False
+        with self.lock:
+            self.connected_once = True
+            self.consecutive_failures = 0
+        return True
+
+    def submit(self, message):
+        """
+        Queue a message for the sender thread.
+
+        Returns:
+            bool: True if queued, False if the queue is full
+        """
+        self.start()
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            self.count('rejected')
+            logger.error(f"Email queue full, not sending '{message.subject}' to {message.to}")
+            return False
+        return True
+
+    def start(self):
+        """Start the sender thread if it is not running."""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='sisimpur-email-sender', daemon=True)
+                self.thread.start()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued message has been handled.
+
+        Returns:
+            bool: True if the queue drained within the timeout
+        """
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(lambda: not self.queue.unfinished_tasks, timeout)
+
+    def run(self):
+        """Sender loop: take a batch, send it, close the connection when idle."""
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.idle_seconds)]
+            except queue.Empty:
+                self.close()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.send_batch(batch)
+            except Exception:
+                logger.exception("Email sender failed")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def send_batch(self, batch):
+        """Send a batch over the open connection, retrying each failed message on a new one."""
+        for message in batch:
+            for attempt in range(1, self.max_retries + 1):
+                try:
+                    if not self.open().send_messages([message]):
+                        raise smtplib.SMTPException("Message was not sent")
+                    with self.lock:
+                        self.stats['sent'] += 1
+                        self.consecutive_failures = 0
+                    logger.info(f"Email '{message.subject}' sent to {message.to}")
+                    break
+                except smtplib.SMTPRecipientsRefused as e:
+                    # Retrying cannot help a refused address, and it says nothing about the sender
+                    self.count('failed')
+                    logger.error(f"Email to {message.to} refused: {e}")
+                    break
+                except Exception as e:
+                    self.close()
+                    if attempt == self.max_retries:
+                        with self.lock:
+                            self.stats['failed'] += 1
+                            self.consecutive_failures += 1
+                        logger.error(f"Email to {message.to} failed after {attempt} attempts: {e}")
+                        break
+                    self.count('retried')
+                    delay = self.retry_base_seconds * 2 ** (attempt - 1)
+                    logger.warning(f"Email to {message.to} failed ({e}), retrying in {delay}s")
+                    time.sleep(delay)
+
+    def open(self):
+        """The pooled connection, opened if needed."""
+        if self.connection is None:
+            connection = self.connection_factory(fail_silently=False)
+            connection.open()
+            self.connection = connection
+            with self.lock:
+                self.stats['connections'] += 1
+                self.connected_once = True
+        return self.connection
+
+    def close(self):
+        """Close the pooled connection, ignoring errors from a dead one."""
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+
+email_queue = EmailQueue()
+
+
+def send_email(message):
+    """
+    Send an EmailMessage through the background queue (or inline with ASYNC off).
+
+    Returns:
+        bool: True if the message was queued (or sent), False if the queue is
+        full or the sender cannot reach the mail server
+    """
+    if not ASYNC:
+        return bool(message.send())
+    if not email_queue.healthy():
+        return False
+    return email_queue.submit(message)
@@ -3,16 +3,41 @@ Email service for authentication OTP functionality
 """
 
 import logging
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
+from .email_queue import send_email
+
 logger = logging.getLogger(__name__)
 
 class EmailService:
     """Service for sending authentication emails"""
     
+    @staticmethod
+    def build_message(subject, plain_message, html_message, email):
+        """
+        Build a plain text email with an HTML alternative
+        
+        Args:
+            subject: Email subject
+            plain_message: Plain text body
+            html_message: HTML body
+            email: Email address to send to
+            
+        Returns:
+            EmailMultiAlternatives: The message, ready to send
+        """
+        message = EmailMultiAlternatives(
+            subject=subject,
+            body=plain_message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+        )
+        message.attach_alternative(html_message, 'text/html')
+        return message
+    
     @staticmethod
     def send_otp_email(user, email, otp_code):
         """
@@ -172,21 +197,14 @@ class EmailService:
             © 2025 Sisimpur - AI-Powered Exam Prep
             """
             
-            # Send email
-            result = send_mail(
-                subject=subject,
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                html_message=html_message,
-                fail_silently=False,
-            )
+            # Queue email for the background sender
+            result = send_email(EmailService.build_message(subject, plain_message, html_message, email))
             
             if result:
-                logger.info(f"OTP email sent successfully to {email}")
+                logger.info(f"OTP email queued for {email}")
                 return True
             else:
-                logger.error(f"Failed to send OTP email to {email}")
+                logger.error(f"Failed to queue OTP email to {email}")
                 return False
                 
         except Exception as e:
@@ -315,16 +333,9 @@ class EmailService:
             © 2025 Sisimpur - AI-Powered Exam Prep
             """
             
-            result = send_mail(
-                subject=subject,
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                html_message=html_message,
-                fail_silently=True,  # Don't fail if welcome email fails
-            )
+            result = send_email(EmailService.build_message(subject, plain_message, html_message, email))
             
-            logger.info(f"Welcome email sent to {email}: {result}")
+            logger.info(f"Welcome email queued for {email}: {result}")
             return result
             
         except Exception as e:
@@ -0,0 +1,133 @@
+"""
+Benchmark of the OTP rate limit check.
+
+Runs OTPRateLimit.check_rate_limit's two backends against the configured
+database and cache from several threads and reports checks per second,
+database queries per check, latency and errors (such as "database is locked"
+on SQLite) for each:
+
+- database: the previous per-request get_or_create and save() on OTPRateLimit
+- cache: the sliding-window counters of apps/authentication/rate_limit.py,
+  which only write a row when a pair is blocked (on a cache without atomic
+  incr, such as the file cache, this falls back to the database backend)
+
+Requests are spread over a pool of email/IP pairs so that some of them pass
+MAX_HOURLY_ATTEMPTS and get blocked, as during a signup spike. The rows the
+benchmark writes use @bench.invalid addresses and are deleted afterwards.
+"""
+
+import json
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.authentication.models import OTPRateLimit
+from apps.authentication.rate_limit import check_otp_rate_limit
+from apps.brain.management.commands.loadtest import percentile
+
+BACKENDS = {
+    'database': OTPRateLimit.check_rate_limit_in_database,
+    'cache': check_otp_rate_limit,
+}
+
+
+def run_benchmark(backend, requests=2000, threads=4, pairs=200):
+    """
+    Run rate limit checks for one backend.
+
+    Args:
+        backend: 'database' or 'cache'
+        requests: Total checks
+        threads: Concurrent checking threads
+        pairs: Distinct email/IP pairs the checks are spread over
+
+    Returns:
+        Dictionary with checks, blocked, errors, checks_per_second, queries_per_check and latency percentiles
+    """
+    check = BACKENDS[backend]
+    run = uuid.uuid4().hex[:8]
+    identities = [(f'bench{n}-{run}@bench.invalid', f'10.{n // 250 % 250}.{n % 250}.1') for n in range(pairs)]
+    latencies, errors = [], []
+    totals = {'blocked': 0, 'queries': 0}
+    lock = threading.Lock()
+    multithreaded = threads > 1
+
+    def worker(number):
+        local_latencies, local_errors, blocked = [], [], 0
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                for n in range(number, requests, threads):
+                    email, ip_address = identities[n % pairs]
+                    started = time.perf_counter()
+                    try:
+                        allowed, _ = check(email, ip_address)
+                        blocked += not allowed
+                    except Exception as e:
+                        local_errors.append(str(e))
+                    local_latencies.append(time.perf_counter() - started)
+        finally:
+            if multithreaded:
+                connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.extend(local_errors)
+            totals['blocked'] += blocked
+            totals['queries'] += len(queries)
+
+    start = time.perf_counter()
+    if multithreaded:
+        workers = [threading.Thread(target=worker, args=(number,)) for number in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    else:
+        worker(0)
+    wall_seconds = time.perf_counter() - start
+
+    OTPRateLimit.objects.filter(email__endswith=f'-{run}@bench.invalid').delete()
+
+    latencies.sort()
+    return {
+        'backend': backend,
+        'checks': requests,
+        'blocked': totals['blocked'],
+        'errors': len(errors),
+        'wall_seconds': round(wall_seconds, 3),
+        'checks_per_second': round(requests / wall_seconds, 1) if wall_seconds else 0.0,
+        'queries_per_check': round(totals['queries'] / requests, 2) if requests else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark OTP rate limit checks per second: database counters vs cache sliding window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Total rate limit checks per backend')
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent checking threads')
+        parser.add_argument('--pairs', type=int, default=200, help='Distinct email/IP pairs')
+        parser.add_argument('--backend', choices=['both', *BACKENDS], default='both')
+        parser.add_argument('--output', type=str, help='Write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        backends = list(BACKENDS) if options['backend'] == 'both' else [options['backend']]
+        results = []
+        for backend in backends:
+            result = run_benchmark(backend, options['requests'], options['threads'], options['pairs'])
+            results.append(result)
+            self.stdout.write(
+                f"{result['backend']:>8}: {result['checks_per_second']} checks/s, "
+                f"{result['queries_per_check']} queries/check, {result['blocked']} blocked, "
+                f"{result['errors']} errors, p50 {result['p50_ms']}ms, p95 {result['p95_ms']}ms"
+            )
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"📄 Results written to {options['output']}"))
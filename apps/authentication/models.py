@@ -5,6 +5,7 @@ from django.conf import settings
 from django.contrib.auth.hashers import make_password, check_password
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from core.sqlite import delete_in_batches
 import random
 import string
 import hashlib
@@ -96,11 +97,11 @@ class EmailOTP(models.Model):
         return False
 
     @classmethod
-    def cleanup_expired(cls):
-        """Clean up expired OTPs (call this periodically)"""
-        expired_count = cls.objects.filter(
-            expires_at__lt=timezone.now()
-        ).delete()[0]
+    def cleanup_expired(cls, batch_size=500):
+        """Clean up expired OTPs in bounded batches (run by the housekeeping command)"""
+        expired_count = delete_in_batches(
+            cls.objects.filter(expires_at__lt=timezone.now()), batch_size
+        )
         return expired_count
 
 class OTPRateLimit(models.Model):
@@ -128,7 +129,16 @@ class OTPRateLimit(models.Model):
 
     @classmethod
     def check_rate_limit(cls, email, ip_address):
-        """Check if email/IP combination is rate limited"""
+        """Check if email/IP combination is rate limited (in the cache, see rate_limit.py)"""
+        if settings.OTP_CONFIG.get('RATE_LIMIT_BACKEND', 'cache') == 'database':
+            return cls.check_rate_limit_in_database(email, ip_address)
+
+        from .rate_limit import check_otp_rate_limit
+        return check_otp_rate_limit(email, ip_address)
+
+    @classmethod
+    def check_rate_limit_in_database(cls, email, ip_address):
+        """Check if email/IP combination is rate limited, counting attempts in this table"""
         now = timezone.now()
         hour_ago = now - timezone.timedelta(hours=1)
 
@@ -172,13 +182,16 @@ class OTPRateLimit(models.Model):
         return True, "OK"
 
     @classmethod
-    def cleanup_old_records(cls):
-        """Clean up old rate limit records"""
-        week_ago = timezone.now() - timezone.timedelta(days=7)
-        deleted_count = cls.objects.filter(
-            last_attempt__lt=week_ago,
-            is_blocked=False
-        ).delete()[0]
+    def cleanup_old_records(cls, days=7, batch_size=500):
+        """Clean up old rate limit records in bounded batches (run by the housekeeping command)"""
+        cutoff = timezone.now() - timezone.timedelta(days=days)
+        deleted_count = delete_in_batches(
+            # Block audit rows keep is_blocked set after their block has passed
+            cls.objects.filter(last_attempt__lt=cutoff).filter(
+                models.Q(is_blocked=False) | models.Q(blocked_until__lt=cutoff)
+            ),
+            batch_size
+        )
         return deleted_count
 
 
@@ -0,0 +1,166 @@
+"""
+Sliding-window rate limiting of OTP requests in the cache.
+
+Every OTP request used to read and write an OTPRateLimit row, which put
+writes (and SQLite lock contention) on the signup path. Counters now live in
+the cache instead, keyed by the email/IP pair:
+
+- each hour-long window has its own counter, bumped with an atomic
+  ``cache.incr``
+- the sliding count weights the previous window by how much of it still
+  overlaps the last hour, so a burst across a window boundary is still caught
+- once the count passes MAX_HOURLY_ATTEMPTS the pair is blocked for
+  BLOCK_DURATION_HOURS with a cache key, and only then is an OTPRateLimit
+  row written, as an audit record of the block
+
+Only Redis and locmem have an atomic ``incr``. The file and database caches
+implement it as get and set, which loses updates under concurrent requests,
+so with those caches ``check_otp_rate_limit`` falls back to counting in the
+OTPRateLimit table (the previous behaviour) and logs a warning. Use
+CACHE_BACKEND=redis to get the cache limiter in production.
+
+Counters are only shared between processes that share the cache, so a
+deployment running several workers on CACHE_BACKEND=locmem should set
+OTP_CONFIG['RATE_LIMIT_BACKEND'] to 'database' as well.
+"""
+
+import hashlib
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import BaseCache
+from django.core.exceptions import ImproperlyConfigured
+
+from core.sqlite import serialized_write
+
+logger = logging.getLogger("sisimpur.authentication.rate_limit")
+
+OTP_CONFIG = getattr(settings, 'OTP_CONFIG', {})
+RATE_LIMIT_BACKEND = OTP_CONFIG.get('RATE_LIMIT_BACKEND', 'cache')
+MAX_HOURLY_ATTEMPTS = OTP_CONFIG.get('MAX_HOURLY_ATTEMPTS', 5)
+BLOCK_DURATION_HOURS = OTP_CONFIG.get('BLOCK_DURATION_HOURS', 1)
+
+WINDOW_SECONDS = 3600
+
+_warned_fallback = False
+
+
+def has_atomic_incr():
+    """Whether the default cache implements incr atomically (Redis, locmem)."""
+    return type(caches['default']).incr is not BaseCache.incr
+
+
+def increment(key, timeout):
+    """
+    Increment a cache counter, creating it with a timeout on first use.
+
+    Raises:
+        ImproperlyConfigured: If the default cache has no atomic incr
+    """
+    if not has_atomic_incr():
+        raise ImproperlyConfigured(
+            f"{type(caches['default']).__name__} has no atomic incr; use Redis or locmem for cache counters"
+        )
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # First request of the window; another request may create it first
+        if cache.add(key, 1, timeout=timeout):
+            return 1
+        return cache.incr(key)
+
+
+class SlidingWindowLimiter:
+    """Approximate sliding-window limiter over two fixed-window cache counters"""
+
+    def __init__(self, prefix, limit, window_seconds, block_seconds):
+        self.prefix = prefix
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.block_seconds = block_seconds
+
+    def key(self, identity):
+        """Cache-safe digest of an identity such as (email, ip)."""
+        return hashlib.sha256('|'.join(identity).encode()).hexdigest()[:32]
+
+    def hit(self, identity, now=None):
+        """
+        Count a request and decide whether it is allowed.
+
+        Args:
+            identity: Tuple of strings the limit applies to
+            now: Unix time (default: current time)
+
+        Returns:
+            tuple: (allowed, blocked_until, count); blocked_until is a Unix time
+            when the identity is blocked, count is the sliding-window count
+        """
+        now = time.time() if now is None else now
+        key = self.key(identity)
+        window = int(now // self.window_seconds)
+        block_key = f'{self.prefix}:block:{key}'
+        current_key = f'{self.prefix}:{key}:{window}'
+        previous_key = f'{self.prefix}:{key}:{window - 1}'
+
+        cached = cache.get_many([block_key, previous_key])
+        blocked_until = cached.get(block_key)
+        if blocked_until and blocked_until > now:
+            return False, blocked_until, None
+
+        # Counters outlive their window by one, while they still weigh in
+        current = increment(current_key, 2 * self.window_seconds)
+
+        overlap = 1 - (now % self.window_seconds) / self.window_seconds
+        count = current + cached.get(previous_key, 0) * overlap
+        if count > self.limit:
+            blocked_until = now + self.block_seconds
+            cache.set(block_key, blocked_until, timeout=self.block_seconds)
+            return False, blocked_until, count
+        return True, None, count
+
+
+otp_limiter = SlidingWindowLimiter(
+    'otp_rate', MAX_HOURLY_ATTEMPTS, WINDOW_SECONDS, BLOCK_DURATION_HOURS * 3600
+)
+
+
+def check_otp_rate_limit(email, ip_address, now=None):
+    """
+    Check and count an OTP request for an email/IP pair.
+
+    Counts in the OTPRateLimit table instead when the cache has no atomic incr.
+
+    Returns:
+        tuple: (allowed, message), as OTPRateLimit.check_rate_limit
+    """
+    from .models import OTPRateLimit
+
+    if not has_atomic_incr():
+        global _warned_fallback
+        if not _warned_fallback:
+            _warned_fallback = True
+            logger.warning(
+                f"{type(caches['default']).__name__} has no atomic incr, counting OTP requests in the database"
+            )
+        return OTPRateLimit.check_rate_limit_in_database(email, ip_address)
+
+    allowed, blocked_until, count = otp_limiter.hit((email.lower(), ip_address or ''), now)
+    if allowed:
+        return True, "OK"
+
+    until = datetime.fromtimestamp(blocked_until, tz=dt_timezone.utc)
+    if count is None:
+        return False, f"Too many attempts. Try again after {until.strftime('%H:%M')}"
+
+    # Record the block for auditing; allowed requests never touch the table
+    with serialized_write():
+        OTPRateLimit.objects.update_or_create(
+            email=email,
+            ip_address=ip_address,
+            defaults={'attempts': int(count), 'is_blocked': True, 'blocked_until': until},
+        )
+    logger.warning(f"Blocked OTP requests for {email} from {ip_address} until {until:%H:%M}")
+    return False, f"Too many OTP requests. Please try again in {BLOCK_DURATION_HOURS} hour{'s' if BLOCK_DURATION_HOURS != 1 else ''}."
@@ -0,0 +1,185 @@
+import socketserver
+import threading
+from functools import partial
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import EmailMessage, get_connection
+from django.test import SimpleTestCase, TestCase
+
+from apps.authentication import email_queue as email_queue_module
+from apps.authentication.email_queue import EmailQueue
+from apps.authentication.email_service import EmailService
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    Minimal local SMTP server: accepts every message and records it.
+
+    ``drop_messages`` makes it hang up on that many messages at DATA, like a
+    connection dropped by the mail server.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, drop_messages=0):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.drop_messages = drop_messages
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        with self.server.lock:
+            self.server.connections += 1
+        self.reply('220 standin ESMTP')
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(('EHLO', 'HELO')):
+                self.reply('250 standin')
+            elif command == 'DATA':
+                with self.server.lock:
+                    drop = self.server.drop_messages > 0
+                    self.server.drop_messages -= drop
+                if drop:
+                    return
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                with self.server.lock:
+                    self.server.messages.append(data)
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class EmailQueueTest(SimpleTestCase):
+    """Test cases for the background email sender against a local SMTP stand-in"""
+
+    def start_server(self, **kwargs):
+        server = SMTPStandIn(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def make_queue(self, server, **kwargs):
+        factory = partial(
+            get_connection, 'django.core.mail.backends.smtp.EmailBackend',
+            host='127.0.0.1', port=server.port, use_tls=False, username='', password='', timeout=5,
+        )
+        email_queue = EmailQueue(connection_factory=factory, retry_base_seconds=0, **kwargs)
+        self.addCleanup(email_queue.close)
+        return email_queue
+
+    def message(self, n):
+        return EmailMessage(f'Code {n}', f'Your code is {n}', 'noreply@sisimpur.test', [f'learner{n}@gmail.com'])
+
+    def test_batch_reuses_one_connection(self):
+        """Test that queued emails are sent over a single SMTP connection"""
+        server = self.start_server()
+        email_queue = self.make_queue(server)
+
+        for n in range(5):
+            self.assertTrue(email_queue.submit(self.message(n)))
+        self.assertTrue(email_queue.flush(timeout=10))
+
+        self.assertEqual(len(server.messages), 5)
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(email_queue.stats['sent'], 5)
+
+    def test_dropped_connection_is_retried(self):
+        """Test that a message lost to a dropped connection is resent on a new one"""
+        server = self.start_server(drop_messages=1)
+        email_queue = self.make_queue(server)
+
+        email_queue.submit(self.message(1))
+        email_queue.submit(self.message(2))
+        email_queue.flush(timeout=10)
+
+        self.assertEqual(len(server.messages), 2)
+        self.assertEqual(server.connections, 2)
+        self.assertEqual((email_queue.stats['sent'], email_queue.stats['retried']), (2, 1))
+
+    def test_gives_up_after_max_retries(self):
+        """Test that a message failing on every attempt is dropped after MAX_RETRIES"""
+        server = self.start_server(drop_messages=10)
+        email_queue = self.make_queue(server, max_retries=3)
+
+        email_queue.submit(self.message(1))
+        email_queue.flush(timeout=10)
+
+        self.assertEqual((email_queue.stats['sent'], email_queue.stats['failed']), (0, 1))
+        self.assertEqual(server.connections, 3)
+
+    def test_full_queue_refuses(self):
+        """Test that submit reports failure when the bounded queue is full"""
+        email_queue = EmailQueue(max_queued=1)
+        # Keep the sender from draining the queue
+        email_queue.start = lambda: None
+
+        self.assertTrue(email_queue.submit(self.message(1)))
+        self.assertFalse(email_queue.submit(self.message(2)))
+
+    def test_unreachable_server_is_unhealthy(self):
+        """Test that the sender reports unhealthy when no connection can be opened"""
+        server = self.start_server()
+        email_queue = self.make_queue(server)
+        server.shutdown()
+        server.server_close()
+
+        self.assertFalse(email_queue.healthy())
+
+    def test_unhealthy_after_consecutive_failures(self):
+        """Test that repeated final failures make the sender check the server again"""
+        server = self.start_server(drop_messages=4)
+        email_queue = self.make_queue(server, max_retries=1, unhealthy_after=2)
+        self.assertTrue(email_queue.healthy())
+
+        email_queue.submit(self.message(1))
+        email_queue.submit(self.message(2))
+        email_queue.flush(timeout=10)
+        self.assertEqual(email_queue.consecutive_failures, 2)
+
+        # The server accepts connections again, so the check passes and resets the count
+        connections = server.connections
+        self.assertTrue(email_queue.healthy())
+        self.assertEqual((server.connections, email_queue.consecutive_failures), (connections + 1, 0))
+
+    def test_send_email_refuses_when_unhealthy(self):
+        """Test that send_email reports failure instead of queueing for a broken sender"""
+        email_queue = EmailQueue()
+        email_queue.healthy = lambda: False
+
+        with mock.patch.object(email_queue_module, 'ASYNC', True), \
+                mock.patch.object(email_queue_module, 'email_queue', email_queue):
+            self.assertFalse(email_queue_module.send_email(self.message(1)))
+        self.assertTrue(email_queue.queue.empty())
+
+
+class EmailServiceTest(TestCase):
+    """Test cases for the OTP email built by EmailService"""
+
+    def test_otp_email_has_html_alternative(self):
+        """Test that the OTP email carries the code in plain text and HTML"""
+        user = User.objects.create_user('learner', email='learner@gmail.com')
+
+        self.assertTrue(EmailService.send_otp_email(user, 'learner@gmail.com', '123456'))
+
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ['learner@gmail.com'])
+        self.assertIn('123456', message.body)
+        self.assertEqual(message.alternatives[0][1], 'text/html')
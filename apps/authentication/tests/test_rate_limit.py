@@ -0,0 +1,119 @@
+import tempfile
+import threading
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from apps.authentication.management.commands.otp_ratelimit_benchmark import run_benchmark
+from apps.authentication.models import OTPRateLimit
+from apps.authentication.rate_limit import (
+    MAX_HOURLY_ATTEMPTS,
+    WINDOW_SECONDS,
+    SlidingWindowLimiter,
+    check_otp_rate_limit,
+    increment,
+)
+
+EMAIL = 'learner@gmail.com'
+IP = '203.0.113.7'
+# Start of a window, so the previous window no longer overlaps
+WINDOW_START = 1_000 * WINDOW_SECONDS
+
+
+class OTPRateLimitTest(TestCase):
+    """Test cases for the cache-backed OTP rate limit"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_allowed_requests_do_not_touch_the_database(self):
+        """Test that requests under the limit are counted in the cache only"""
+        with self.assertNumQueries(0):
+            for _ in range(MAX_HOURLY_ATTEMPTS):
+                self.assertEqual(check_otp_rate_limit(EMAIL, IP, now=WINDOW_START), (True, 'OK'))
+
+    def test_block_is_issued_and_audited(self):
+        """Test that passing the limit blocks the pair and writes one audit row"""
+        for _ in range(MAX_HOURLY_ATTEMPTS):
+            check_otp_rate_limit(EMAIL, IP, now=WINDOW_START)
+
+        allowed, message = check_otp_rate_limit(EMAIL, IP, now=WINDOW_START + 1)
+        self.assertFalse(allowed)
+        self.assertIn('Too many OTP requests', message)
+        record = OTPRateLimit.objects.get()
+        self.assertEqual((record.email, record.ip_address, record.is_blocked), (EMAIL, IP, True))
+
+        with self.assertNumQueries(0):
+            allowed, message = check_otp_rate_limit(EMAIL, IP, now=WINDOW_START + 60)
+        self.assertFalse(allowed)
+        self.assertIn('Try again after', message)
+
+        # Other pairs are unaffected
+        self.assertTrue(check_otp_rate_limit(EMAIL, '198.51.100.1', now=WINDOW_START + 60)[0])
+
+    def test_window_slides_across_the_boundary(self):
+        """Test that requests late in one window still count early in the next"""
+        limiter = SlidingWindowLimiter('test_rate', limit=4, window_seconds=100, block_seconds=50)
+        for _ in range(4):
+            self.assertTrue(limiter.hit(('pair',), now=190)[0])
+
+        # 10% into the next window, 90% of the previous window still counts
+        allowed, _, count = limiter.hit(('pair',), now=210)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(count, 4 * 0.9 + 1)
+
+        # After the block and once the old window has slid out, requests pass again
+        self.assertTrue(limiter.hit(('pair',), now=299)[0])
+
+    def test_concurrent_hits_are_all_counted(self):
+        """Test that hits from many threads at once each get their own count"""
+        limiter = SlidingWindowLimiter('test_rate', limit=10_000, window_seconds=100, block_seconds=50)
+        counts, lock = [], threading.Lock()
+        start = threading.Barrier(8)
+
+        def worker():
+            start.wait()
+            for _ in range(50):
+                count = limiter.hit(('pair',), now=200)[2]
+                with lock:
+                    counts.append(count)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(counts), list(range(1, 401)))
+
+    def test_file_cache_falls_back_to_the_database(self):
+        """Test that a cache without atomic incr counts in OTPRateLimit instead"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        file_cache = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name,
+        }}
+
+        with override_settings(CACHES=file_cache):
+            with self.assertRaises(ImproperlyConfigured):
+                increment('test_rate:key', 100)
+            self.assertEqual(check_otp_rate_limit(EMAIL, IP), (True, 'OK'))
+
+        self.assertEqual(OTPRateLimit.objects.get().attempts, 1)
+
+    @override_settings(OTP_CONFIG={'RATE_LIMIT_BACKEND': 'database'})
+    def test_database_backend(self):
+        """Test that the database backend still counts in OTPRateLimit"""
+        self.assertEqual(OTPRateLimit.check_rate_limit(EMAIL, IP), (True, 'OK'))
+        self.assertEqual(OTPRateLimit.objects.get().attempts, 1)
+
+    def test_benchmark_compares_backends(self):
+        """Test that the benchmark reports fewer queries per check for the cache backend"""
+        database = run_benchmark('database', requests=60, threads=1, pairs=5)
+        cache_result = run_benchmark('cache', requests=60, threads=1, pairs=5)
+
+        self.assertEqual((database['errors'], cache_result['errors']), (0, 0))
+        self.assertEqual(database['blocked'], cache_result['blocked'])
+        self.assertLess(cache_result['queries_per_check'], database['queries_per_check'])
+        self.assertFalse(OTPRateLimit.objects.filter(email__endswith='@bench.invalid').exists())
@@ -1,12 +1,16 @@
 from django.contrib import admin
+from django.utils.html import format_html, format_html_join
 from .models import ProcessingJob, QuestionAnswer
 
+# Number of recent completed jobs used for the per-stage latency summary
+RECENT_TRACE_JOBS = 200
+
 @admin.register(ProcessingJob)
 class ProcessingJobAdmin(admin.ModelAdmin):
     list_display = ['id', 'user', 'document_name', 'status', 'language', 'created_at', 'completed_at']
     list_filter = ['status', 'language', 'created_at']
     search_fields = ['document_name', 'user__username', 'user__email']
-    readonly_fields = ['created_at', 'updated_at', 'completed_at']
+    readonly_fields = ['created_at', 'updated_at', 'completed_at', 'trace_waterfall']
     
     fieldsets = (
         ('Basic Information', {
@@ -22,12 +26,66 @@ class ProcessingJobAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at', 'completed_at'),
             'classes': ('collapse',)
         }),
+        ('Trace', {
+            'fields': ('trace_waterfall',),
+        }),
         ('Error Information', {
             'fields': ('error_message',),
             'classes': ('collapse',)
         })
     )
 
+    def trace_waterfall(self, obj):
+        trace = (obj.processing_metadata or {}).get('trace')
+        if not trace or not trace.get('spans'):
+            return "No trace recorded"
+
+        total_ms = max(trace.get('total_ms') or 0, 1)
+        rows = []
+        for span in trace['spans']:
+            name, start_ms, duration_ms = span[:3]
+            attrs = span[3] if len(span) > 3 else {}
+            label = name + "".join(f" {key}={value}" for key, value in attrs.items())
+            rows.append((
+                label,
+                f"{start_ms / total_ms * 100:.2f}",
+                f"{max(duration_ms / total_ms * 100, 0.3):.2f}",
+                duration_ms,
+            ))
+
+        return format_html(
+            '<div>Trace <code>{}</code> &middot; {} ms</div>'
+            '<table style="width:100%">{}</table>',
+            trace.get('id', ''),
+            trace.get('total_ms', 0),
+            format_html_join(
+                '',
+                '<tr><td style="white-space:nowrap">{}</td>'
+                '<td style="width:70%"><div style="margin-left:{}%;width:{}%;'
+                'background:#79aec8;height:10px"></div></td>'
+                '<td style="text-align:right">{} ms</td></tr>',
+                rows,
+            ),
+        )
+    trace_waterfall.short_description = 'Waterfall'
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        extra_context['stage_stats'] = self.recent_stage_stats()
+        extra_context['stage_stats_jobs'] = RECENT_TRACE_JOBS
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def recent_stage_stats(self):
+        """p50/p95 per stage across the most recent completed jobs."""
+        from .brain_engine.utils.tracing import stage_percentiles
+
+        traces = (
+            ProcessingJob.objects.filter(status='completed')
+            .order_by('-created_at')
+            .values_list('processing_metadata__trace', flat=True)[:RECENT_TRACE_JOBS]
+        )
+        return stage_percentiles(trace for trace in traces if trace)
+
 @admin.register(QuestionAnswer)
 class QuestionAnswerAdmin(admin.ModelAdmin):
     list_display = ['id', 'job', 'question_preview', 'question_type', 'created_at']
@@ -8,5 +8,13 @@ class BrainConfig(AppConfig):
 
     def ready(self):
         """Initialize the brain app when Django starts"""
-        # Import signal handlers if any
-        pass
+        from django.db.backends.signals import connection_created
+        from core.housekeeping import RUN_IN_PROCESS, start_scheduler
+        from core.sqlite import configure_connection
+
+        # Tune every SQLite connection (WAL, busy timeout, cache); see core/sqlite.py
+        connection_created.connect(configure_connection, dispatch_uid='sisimpur.sqlite.configure_connection')
+
+        # Optional in-process housekeeping; see core/housekeeping.py
+        if RUN_IN_PROCESS:
+            start_scheduler()
@@ -0,0 +1,269 @@
+"""
+Pipeline benchmark for Sisimpur Brain Engine.
+
+Runs a fixed corpus (text PDFs, scanned PDFs, English and Bengali images)
+through DocumentProcessor at several concurrency levels and reports per-stage
+wall time (from the job traces), LLM calls per document, peak RSS and
+documents per minute. The corpus is generated deterministically, so runs can
+be compared over time; results are plain JSON.
+
+The scanned and image Bengali pages need a font with Bengali glyphs (PIL's
+default font has none and would render boxes, which exercises no Bengali
+OCR). The font is BENCH_BENGALI_FONT, or else the first of BENGALI_FONT_PATHS
+that is installed (e.g. ``apt install fonts-noto-core``). Without one, those
+documents are skipped and listed under ``skipped`` in the report. Conjuncts
+are only shaped correctly when Pillow is built with libraqm, so the report
+also records the font and ``bengali_shaping``.
+
+Used by ``brain_cli.py bench``; pass ``backend='fake'`` to run offline.
+"""
+
+import io
+import logging
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw, ImageFont, features
+
+from .config import BENCH_BENGALI_FONT
+from .processor import DocumentProcessor
+from .utils.tracing import stage_percentiles
+
+logger = logging.getLogger("sisimpur.brain.benchmark")
+
+ENGLISH_PARAGRAPH = (
+    "Rivers shape the land they cross. Over thousands of years a river carries silt "
+    "from the mountains to the sea and deposits it on its banks, building fertile plains. "
+    "Farmers settle on these plains because the soil is rich and water is always nearby. "
+    "Floods bring new silt every year, but they also destroy homes and crops, so people "
+    "build embankments and plant trees to protect their fields."
+)
+
+BENGALI_PARAGRAPH = (
+    "নদী তার চলার পথে ভূমিকে গড়ে তোলে। হাজার বছর ধরে নদী পাহাড় থেকে পলি বয়ে এনে "
+    "তীরে জমা করে এবং উর্বর সমভূমি তৈরি করে। কৃষকেরা এই সমভূমিতে বসতি গড়ে কারণ মাটি "
+    "উর্বর এবং পানি হাতের কাছে। প্রতি বছর বন্যা নতুন পলি আনে, কিন্তু ঘরবাড়ি ও ফসলও নষ্ট করে।"
+)
+
+# name, kind, language, pages
+CORPUS = (
+    ("text_english.pdf", "text_pdf", "english", 3),
+    ("text_english_long.pdf", "text_pdf", "english", 8),
+    ("scanned_english.pdf", "scanned_pdf", "english", 2),
+    ("scanned_bengali.pdf", "scanned_pdf", "bengali", 2),
+    ("image_english.png", "image", "english", 1),
+    ("image_bengali.png", "image", "bengali", 1),
+)
+
+
+# Common install locations of fonts with Bengali glyphs (Debian/Ubuntu, Fedora, macOS)
+BENGALI_FONT_PATHS = (
+    "/usr/share/fonts/truetype/noto/NotoSansBengali-Regular.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansBengali-Regular.ttf",
+    "/usr/share/fonts/google-noto/NotoSansBengali-Regular.ttf",
+    "/usr/share/fonts/noto/NotoSansBengali-Regular.ttf",
+    "/usr/share/fonts/truetype/lohit-bengali/Lohit-Bengali.ttf",
+    "/System/Library/Fonts/KohinoorBangla.ttc",
+)
+
+
+def find_bengali_font() -> Optional[str]:
+    """Path of a font with Bengali glyphs: BENCH_BENGALI_FONT, else the first installed of BENGALI_FONT_PATHS."""
+    for path in ((BENCH_BENGALI_FONT,) if BENCH_BENGALI_FONT else BENGALI_FONT_PATHS):
+        if Path(path).is_file():
+            return str(path)
+    return None
+
+
+def _page_image(paragraph: str, page: int, font_path: Optional[str] = None) -> Image.Image:
+    """Render a paragraph onto a page-sized image, with PIL's default font unless a font is given."""
+    img = Image.new("RGB", (1240, 1754), "white")
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.truetype(font_path, 28) if font_path else None
+    y = 80
+    for line_number in range(30):
+        start = (line_number * 60 + page * 17) % max(1, len(paragraph) - 60)
+        draw.text((80, y), paragraph[start:start + 60], fill="black", font=font)
+        y += 50
+    return img
+
+
+def build_corpus(corpus_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Write the benchmark corpus into a directory (existing files are reused).
+
+    Args:
+        corpus_dir: Directory for the corpus files
+
+    Returns:
+        List of corpus entries with path, kind and language; the scanned and
+        image Bengali documents are left out when no Bengali font is found
+    """
+    corpus_dir = Path(corpus_dir)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    bengali_font = find_bengali_font()
+    entries = []
+
+    for name, kind, language, pages in CORPUS:
+        path = corpus_dir / name
+        paragraph = BENGALI_PARAGRAPH if language == "bengali" else ENGLISH_PARAGRAPH
+        font_path = None
+
+        if language == "bengali" and kind != "text_pdf":
+            if bengali_font is None:
+                logger.warning(f"Skipping {name}: no font with Bengali glyphs found (set BENCH_BENGALI_FONT)")
+                continue
+            font_path = bengali_font
+            # Rebuild pages rendered with another font (or with boxes by an older corpus)
+            marker = corpus_dir / f"{name}.font"
+            if not marker.exists() or marker.read_text() != font_path:
+                path.unlink(missing_ok=True)
+                marker.write_text(font_path)
+
+        if not path.exists():
+            if kind == "text_pdf":
+                doc = fitz.open()
+                for page_number in range(pages):
+                    page = doc.new_page()
+                    page.insert_textbox(page.rect + (50, 50, -50, -50), (paragraph + "\n\n") * 4, fontsize=10)
+                doc.save(path)
+                doc.close()
+            elif kind == "scanned_pdf":
+                doc = fitz.open()
+                for page_number in range(pages):
+                    buffer = io.BytesIO()
+                    _page_image(paragraph, page_number, font_path).save(buffer, format="PNG")
+                    page = doc.new_page()
+                    page.insert_image(page.rect, stream=buffer.getvalue())
+                doc.save(path)
+                doc.close()
+            else:
+                _page_image(paragraph, 0, font_path).save(path)
+
+        entries.append({"name": name, "path": str(path), "kind": kind, "language": language})
+
+    return entries
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _run_document(entry: Dict[str, Any], num_questions: int) -> Dict[str, Any]:
+    """Process one corpus document and collect its trace and LLM rollup."""
+    processor = DocumentProcessor(language=entry["language"], correlation_id=f"bench-{entry['name']}")
+    start = time.perf_counter()
+    error = None
+    try:
+        processor.process(entry["path"], num_questions=num_questions)
+    except Exception as e:
+        error = str(e)
+        logger.error(f"Benchmark document {entry['name']} failed: {e}")
+
+    return {
+        "name": entry["name"],
+        "kind": entry["kind"],
+        "wall_seconds": round(time.perf_counter() - start, 3),
+        "llm_calls": processor.llm_metrics.get("calls", 0),
+        "llm_retries": processor.llm_metrics.get("retries", 0),
+        "llm_sleep_seconds": processor.llm_metrics.get("sleep_seconds", 0.0),
+        "error": error,
+        "trace": processor.trace.to_dict() if processor.trace else None,
+    }
+
+
+def _stage_totals(documents: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-stage wall time: total and mean per document, plus span p50/p95."""
+    traces = [doc["trace"] for doc in documents if doc["trace"]]
+    percentiles = stage_percentiles(traces)
+
+    stages = {}
+    for stage, stats in percentiles.items():
+        total_ms = sum(span[2] for trace in traces for span in trace["spans"] if span[0] == stage)
+        stages[stage] = {
+            "total_ms": total_ms,
+            "mean_ms_per_doc": round(total_ms / max(1, len(documents)), 1),
+            **stats,
+        }
+    return stages
+
+
+def run_level(corpus: Sequence[Dict[str, Any]], concurrency: int, num_questions: int) -> Dict[str, Any]:
+    """
+    Run the whole corpus once with the given number of concurrent documents.
+
+    Args:
+        corpus: Corpus entries from build_corpus
+        concurrency: Documents processed at the same time
+        num_questions: Questions requested per document
+
+    Returns:
+        Result dictionary for this concurrency level
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as executor:
+        documents = list(executor.map(lambda entry: _run_document(entry, num_questions), corpus))
+    wall_seconds = time.perf_counter() - start
+
+    succeeded = [doc for doc in documents if not doc["error"]]
+    return {
+        "concurrency": concurrency,
+        "documents": len(documents),
+        "failures": len(documents) - len(succeeded),
+        "wall_seconds": round(wall_seconds, 3),
+        "docs_per_minute": round(len(succeeded) / wall_seconds * 60, 2) if wall_seconds else 0.0,
+        "llm_calls_per_doc": round(sum(doc["llm_calls"] for doc in documents) / max(1, len(documents)), 2),
+        "llm_retries": sum(doc["llm_retries"] for doc in documents),
+        "llm_sleep_seconds": round(sum(doc["llm_sleep_seconds"] for doc in documents), 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": _stage_totals(documents),
+        "per_document": [
+            {key: value for key, value in doc.items() if key != "trace"} for doc in documents
+        ],
+    }
+
+
+def run_benchmark(corpus_dir: Path, concurrency_levels: Sequence[int] = (1, 2, 4),
+                  num_questions: int = 5, backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the benchmark corpus at each concurrency level.
+
+    Args:
+        corpus_dir: Directory holding (or receiving) the corpus
+        concurrency_levels: Numbers of concurrent documents to measure
+        num_questions: Questions requested per document
+        backend: Model backend to use ('fake' for offline runs), or None for the configured one
+
+    Returns:
+        JSON-serializable benchmark report
+    """
+    from .utils.api_utils import api, use_backend
+
+    if backend:
+        use_backend(backend)
+
+    corpus = build_corpus(corpus_dir)
+    levels = []
+    for concurrency in concurrency_levels:
+        logger.info(f"Benchmarking {len(corpus)} documents at concurrency {concurrency}")
+        levels.append(run_level(corpus, concurrency, num_questions))
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "backend": api.backend,
+        "num_questions": num_questions,
+        "corpus": [{key: entry[key] for key in ("name", "kind", "language")} for entry in corpus],
+        "skipped": [name for name, *_ in CORPUS if name not in {entry["name"] for entry in corpus}],
+        "bengali_font": find_bengali_font(),
+        "bengali_shaping": features.check("raqm"),
+        "levels": levels,
+    }
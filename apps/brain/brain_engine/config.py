@@ -44,7 +44,25 @@ class BrainConfig:
         self.MAX_RETRY_DELAY = self.config.get('MAX_RETRY_DELAY', 60)  # seconds
         self.RATE_LIMIT_BATCH_SIZE = self.config.get('RATE_LIMIT_BATCH_SIZE', 3)  # Number of chunks to process before cooling down
         self.RATE_LIMIT_COOLDOWN = self.config.get('RATE_LIMIT_COOLDOWN', 10)  # seconds between batches
+        self.MAX_CONCURRENT_REQUESTS = self.config.get('MAX_CONCURRENT_REQUESTS', 16)  # In-flight requests per client, counting timed-out calls still running
+
+        # Request deadline settings
+        self.REQUEST_TIMEOUTS = self.config.get('REQUEST_TIMEOUTS', {'ocr': 90, 'classify': 20, 'generate': 120})  # seconds per call, by task
+        self.HEDGE_REQUESTS = self.config.get('HEDGE_REQUESTS', False)  # Send a duplicate request when a call passes the observed p95
+        self.HEDGE_MIN_SAMPLES = self.config.get('HEDGE_MIN_SAMPLES', 20)  # Latency samples needed before hedging a task
         
+        # Model backend settings
+        self.LLM_BACKEND = self.config.get('LLM_BACKEND', 'gemini')  # 'gemini' or 'fake' (offline stand-in)
+        self.LLM_CASSETTE = self.config.get('LLM_CASSETTE')  # Response cassette replayed by 'fake', recorded by 'gemini'
+        self.FAKE_LLM = {
+            'SEED': 0,
+            'LATENCY': {'ocr': (1.5, 0.4), 'classify': (0.4, 0.3), 'generate': (3.0, 0.5)},  # (median seconds, log-normal sigma)
+            'RESOURCE_EXHAUSTED_RATE': 0.0,
+            'SERVICE_UNAVAILABLE_RATE': 0.0,
+            'QUESTION_PAPER_RATE': 0.0,
+            **self.config.get('FAKE_LLM', {}),
+        }
+
         # Model settings
         self.DEFAULT_GEMINI_MODEL = self.config.get('DEFAULT_GEMINI_MODEL', "models/gemini-1.5-flash")
         self.QA_GEMINI_MODEL = self.config.get('QA_GEMINI_MODEL', "models/gemini-1.5-flash")
@@ -53,10 +71,18 @@ class BrainConfig:
         # Document processing settings
         self.MIN_TEXT_LENGTH = self.config.get('MIN_TEXT_LENGTH', 100)  # Minimum text length to consider a PDF as text-based
         
+        self.BENCH_BENGALI_FONT = self.config.get('BENCH_BENGALI_FONT')  # Font for the Bengali benchmark page images
+        
         # Question type settings
         self.QUESTION_TYPE = self.config.get('QUESTION_TYPE', "MULTIPLECHOICE")  # Options: "SHORT" or "MULTIPLECHOICE"
         self.ANSWER_OPTIONS = self.config.get('ANSWER_OPTIONS', 4)  # Number of options for multiple choice questions
 
+        # Token budgeting settings
+        self.CHARS_PER_TOKEN = self.config.get('CHARS_PER_TOKEN', {'english': 4.0, 'bengali': 1.6})  # Calibrated per script
+        self.IMAGE_TOKENS = self.config.get('IMAGE_TOKENS', 258)  # Flat input cost of one image part
+        self.CHUNK_TOKEN_BUDGET = self.config.get('CHUNK_TOKEN_BUDGET', 500)  # Source text tokens per generation chunk
+        self.MAX_PROMPT_TOKENS = self.config.get('MAX_PROMPT_TOKENS', 30000)  # Reject or split prompts above this
+
 # Global configuration instance
 config = BrainConfig()
 
@@ -67,12 +93,24 @@ INITIAL_RETRY_DELAY = config.INITIAL_RETRY_DELAY
 MAX_RETRY_DELAY = config.MAX_RETRY_DELAY
 RATE_LIMIT_BATCH_SIZE = config.RATE_LIMIT_BATCH_SIZE
 RATE_LIMIT_COOLDOWN = config.RATE_LIMIT_COOLDOWN
+MAX_CONCURRENT_REQUESTS = config.MAX_CONCURRENT_REQUESTS
+REQUEST_TIMEOUTS = config.REQUEST_TIMEOUTS
+HEDGE_REQUESTS = config.HEDGE_REQUESTS
+HEDGE_MIN_SAMPLES = config.HEDGE_MIN_SAMPLES
+LLM_BACKEND = config.LLM_BACKEND
+LLM_CASSETTE = config.LLM_CASSETTE
+FAKE_LLM = config.FAKE_LLM
 DEFAULT_GEMINI_MODEL = config.DEFAULT_GEMINI_MODEL
 QA_GEMINI_MODEL = config.QA_GEMINI_MODEL
 FALLBACK_GEMINI_MODEL = config.FALLBACK_GEMINI_MODEL
 MIN_TEXT_LENGTH = config.MIN_TEXT_LENGTH
+BENCH_BENGALI_FONT = config.BENCH_BENGALI_FONT
 QUESTION_TYPE = config.QUESTION_TYPE
 ANSWER_OPTIONS = config.ANSWER_OPTIONS
+CHARS_PER_TOKEN = config.CHARS_PER_TOKEN
+IMAGE_TOKENS = config.IMAGE_TOKENS
+CHUNK_TOKEN_BUDGET = config.CHUNK_TOKEN_BUDGET
+MAX_PROMPT_TOKENS = config.MAX_PROMPT_TOKENS
 TEMP_DIR = config.TEMP_DIR
 OUTPUT_DIR = config.OUTPUT_DIR
 UPLOADS_DIR = config.UPLOADS_DIR
@@ -4,6 +4,7 @@ Base extractor module for Sisimpur Brain Engine.
 This module provides the base class for all document extractors.
 """
 
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 
@@ -11,6 +12,12 @@ from ..utils.file_utils import save_extracted_text
 
 logger = logging.getLogger("sisimpur.brain.extractors")
 
+QUESTION_PAPER_DETECTION_PROMPT = (
+    "Look at this image and determine if it's a question paper or exam. "
+    "Answer only 'YES' if it contains questions, question numbers, or multiple choice options. "
+    "Answer only 'NO' if it's regular text, notes, or other content."
+)
+
 
 class BaseExtractor(ABC):
     """Base class for all document extractors"""
@@ -37,6 +44,21 @@ class BaseExtractor(ABC):
         """
         pass
 
+    async def extract_async(self, file_path: str) -> str:
+        """
+        Extract text from document without blocking the event loop.
+
+        Extractors that make LLM calls override this to issue them
+        concurrently; the default runs extract() in a worker thread.
+
+        Args:
+            file_path: Path to the document
+
+        Returns:
+            Extracted text
+        """
+        return await asyncio.to_thread(self.extract, file_path)
+
     def save_to_temp(self, text: str, file_path: str) -> str:
         """
         Save extracted text to temporary file.
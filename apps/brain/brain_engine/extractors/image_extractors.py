@@ -1,13 +1,15 @@
+import asyncio
 import logging
 import re
 import numpy as np
 import cv2
 from PIL import Image
 
-from .base import BaseExtractor
-from ..utils.api_utils import api
+from .base import BaseExtractor, QUESTION_PAPER_DETECTION_PROMPT
+from ..utils.api_utils import api, async_api, TASK_CLASSIFY, TASK_OCR
 from ..config import DEFAULT_GEMINI_MODEL
-from ..utils.ocr_utils import llm_ocr_extract
+from ..utils.ocr_utils import llm_ocr_extract, llm_ocr_extract_async
+from ..utils.tracing import trace_span
 
 logger = logging.getLogger("sisimpur.brain.extractors.image")
 
@@ -27,10 +29,12 @@ class ImageExtractor(BaseExtractor):
             img = Image.open(file_path)
 
             # Check if it's likely a question paper
-            is_question_paper = self._detect_question_paper(img)
+            with trace_span("classification"):
+                is_question_paper = self._detect_question_paper(img)
 
             # Extract text using LLM
-            text = llm_ocr_extract(img, self.llm_lang, is_question_paper)
+            with trace_span("extraction.page", page=1):
+                text = llm_ocr_extract(img, self.llm_lang, is_question_paper)
 
             self.save_to_temp(text, file_path)
             return text
@@ -38,6 +42,21 @@ class ImageExtractor(BaseExtractor):
             logger.error(f"Error extracting text from image: {e}")
             raise
 
+    async def extract_async(self, file_path: str) -> str:
+        try:
+            img = await asyncio.to_thread(Image.open, file_path)
+
+            with trace_span("classification"):
+                is_question_paper = await self._detect_question_paper_async(img)
+            with trace_span("extraction.page", page=1):
+                text = await llm_ocr_extract_async(img, self.llm_lang, is_question_paper)
+
+            await asyncio.to_thread(self.save_to_temp, text, file_path)
+            return text
+        except Exception as e:
+            logger.error(f"Error extracting text from image: {e}")
+            raise
+
     def _deskew_image(self, img):
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         edges = cv2.Canny(gray, 50, 150, apertureSize=3)
@@ -61,13 +80,22 @@ class ImageExtractor(BaseExtractor):
         Detect if the image is likely a question paper using a quick LLM check.
         """
         try:
-            # Use a simple prompt to check if it's a question paper
-            prompt = (
-                "Look at this image and determine if it's a question paper or exam. "
-                "Answer only 'YES' if it contains questions, question numbers, or multiple choice options. "
-                "Answer only 'NO' if it's regular text, notes, or other content."
+            response = api.generate_content(
+                [QUESTION_PAPER_DETECTION_PROMPT, img], model_name=DEFAULT_GEMINI_MODEL, task=TASK_CLASSIFY
+            )
+            return response.text.strip().upper() == "YES"
+        except Exception as e:
+            logger.warning(f"Question paper detection failed: {e}")
+            return False
+
+    async def _detect_question_paper_async(self, img: Image.Image) -> bool:
+        """
+        Async version of _detect_question_paper.
+        """
+        try:
+            response = await async_api.generate_content(
+                [QUESTION_PAPER_DETECTION_PROMPT, img], model_name=DEFAULT_GEMINI_MODEL, task=TASK_CLASSIFY
             )
-            response = api.generate_content([prompt, img], model_name=DEFAULT_GEMINI_MODEL)
             return response.text.strip().upper() == "YES"
         except Exception as e:
             logger.warning(f"Question paper detection failed: {e}")
@@ -210,7 +238,7 @@ class ImageExtractor(BaseExtractor):
             )
 
         try:
-            response = api.generate_content([prompt, img], model_name=DEFAULT_GEMINI_MODEL)
+            response = api.generate_content([prompt, img], model_name=DEFAULT_GEMINI_MODEL, task=TASK_OCR)
             return response.text
         except Exception as e:
             logger.error(f"Error using Gemini for OCR: {e}")
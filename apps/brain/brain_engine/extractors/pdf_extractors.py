@@ -4,16 +4,18 @@ PDF extractors for Sisimpur Brain Engine.
 This module provides extractors for PDF documents.
 """
 
+import asyncio
 import logging
 import io
 import fitz  # PyMuPDF
 from PIL import Image
 from pdf2image import convert_from_path
 
-from .base import BaseExtractor
-from ..utils.api_utils import api
+from .base import BaseExtractor, QUESTION_PAPER_DETECTION_PROMPT
+from ..utils.api_utils import api, async_api, TASK_CLASSIFY
 from ..config import DEFAULT_GEMINI_MODEL
-from ..utils.ocr_utils import llm_ocr_extract
+from ..utils.ocr_utils import llm_ocr_extract, llm_ocr_extract_async
+from ..utils.tracing import trace_span
 
 logger = logging.getLogger("sisimpur.brain.extractors.pdf")
 
@@ -35,9 +37,10 @@ class TextPDFExtractor(BaseExtractor):
             text = ""
 
             for page_num, page in enumerate(doc):
-                text += f"--- Page {page_num + 1} ---\n"
-                text += page.get_text()
-                text += "\n\n"
+                with trace_span("extraction.page", page=page_num + 1):
+                    text += f"--- Page {page_num + 1} ---\n"
+                    text += page.get_text()
+                    text += "\n\n"
 
             doc.close()
             self.save_to_temp(text, file_path)
@@ -78,7 +81,8 @@ class ImagePDFExtractor(BaseExtractor):
         try:
             try:
                 logger.info("Attempting to convert PDF to images using pdf2image")
-                images = convert_from_path(file_path)
+                with trace_span("extraction.render"):
+                    images = convert_from_path(file_path)
                 return self._process_images(images, file_path)
             except Exception as pdf2image_error:
                 logger.warning(f"pdf2image failed (Poppler may not installed): {pdf2image_error}")
@@ -96,7 +100,8 @@ class ImagePDFExtractor(BaseExtractor):
         is_likely_question_paper = False
         if len(images) > 0:
             try:
-                is_likely_question_paper = self._detect_question_paper(images[0])
+                with trace_span("classification"):
+                    is_likely_question_paper = self._detect_question_paper(images[0])
                 if is_likely_question_paper:
                     logger.info("Detected PDF as likely question paper")
             except Exception as e:
@@ -106,7 +111,8 @@ class ImagePDFExtractor(BaseExtractor):
             text += f"--- Page {i + 1} ---\n"
             try:
                 # Use LLM OCR for all pages
-                page_text = llm_ocr_extract(img, self.llm_lang, is_likely_question_paper)
+                with trace_span("extraction.page", page=i + 1):
+                    page_text = llm_ocr_extract(img, self.llm_lang, is_likely_question_paper)
             except Exception as e:
                 logger.error(f"LLM OCR failed on page {i+1}: {e}")
                 page_text = ""
@@ -122,17 +128,91 @@ class ImagePDFExtractor(BaseExtractor):
         Detect if the image is likely a question paper using LLM.
         """
         try:
-            prompt = (
-                "Look at this image and determine if it's a question paper or exam. "
-                "Answer only 'YES' if it contains questions, question numbers, or multiple choice options. "
-                "Answer only 'NO' if it's regular text, notes, or other content."
+            response = api.generate_content(
+                [QUESTION_PAPER_DETECTION_PROMPT, img], model_name=DEFAULT_GEMINI_MODEL, task=TASK_CLASSIFY
+            )
+            return response.text.strip().upper() == "YES"
+        except Exception as e:
+            logger.warning(f"Question paper detection failed: {e}")
+            return False
+
+    async def _detect_question_paper_async(self, img: Image.Image) -> bool:
+        """
+        Async version of _detect_question_paper.
+        """
+        try:
+            response = await async_api.generate_content(
+                [QUESTION_PAPER_DETECTION_PROMPT, img], model_name=DEFAULT_GEMINI_MODEL, task=TASK_CLASSIFY
             )
-            response = api.generate_content([prompt, img], model_name=DEFAULT_GEMINI_MODEL)
             return response.text.strip().upper() == "YES"
         except Exception as e:
             logger.warning(f"Question paper detection failed: {e}")
             return False
 
+    async def extract_async(self, file_path: str) -> str:
+        """
+        Extract text from image-based PDF, OCRing all pages concurrently.
+
+        Args:
+            file_path: Path to the PDF document
+
+        Returns:
+            Extracted text
+        """
+        try:
+            with trace_span("extraction.render"):
+                images = await asyncio.to_thread(self._render_pages, file_path)
+
+            is_likely_question_paper = False
+            if images:
+                with trace_span("classification"):
+                    is_likely_question_paper = await self._detect_question_paper_async(images[0])
+                if is_likely_question_paper:
+                    logger.info("Detected PDF as likely question paper")
+
+            page_texts = await asyncio.gather(*[
+                self._ocr_page_async(img, i, is_likely_question_paper)
+                for i, img in enumerate(images)
+            ])
+
+            text = "".join(
+                f"--- Page {i + 1} ---\n{page_text}\n\n"
+                for i, page_text in enumerate(page_texts)
+            )
+
+            await asyncio.to_thread(self.save_to_temp, text, file_path)
+            return text
+        except Exception as e:
+            logger.error(f"Error extracting text from image-based PDF: {e}")
+            raise
+
+    async def _ocr_page_async(self, img: Image.Image, index: int, is_question_paper: bool) -> str:
+        """OCR a single page, returning empty text on failure like the sync path."""
+        try:
+            with trace_span("extraction.page", page=index + 1):
+                return await llm_ocr_extract_async(img, self.llm_lang, is_question_paper)
+        except Exception as e:
+            logger.error(f"LLM OCR failed on page {index + 1}: {e}")
+            return ""
+
+    def _render_pages(self, file_path: str) -> list:
+        """Render every PDF page to an image, with PyMuPDF as the fallback renderer."""
+        try:
+            return convert_from_path(file_path)
+        except Exception as pdf2image_error:
+            logger.warning(f"pdf2image failed (Poppler may not installed): {pdf2image_error}")
+            logger.info("Falling back to PyMuPDF for image extraction")
+
+        images = []
+        doc = fitz.open(file_path)
+        try:
+            for page in doc:
+                pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better OCR
+                images.append(Image.open(io.BytesIO(pix.tobytes("png"))))
+        finally:
+            doc.close()
+        return images
+
     def _extract_with_pymupdf(self, file_path: str) -> str:
         """
         Extract text from PDF using PyMuPDF and LLM OCR.
@@ -161,7 +241,8 @@ class ImagePDFExtractor(BaseExtractor):
                 img = Image.open(io.BytesIO(pix.tobytes("png")))
 
                 # Check if it's a question paper using LLM
-                is_likely_question_paper = self._detect_question_paper(img)
+                with trace_span("classification"):
+                    is_likely_question_paper = self._detect_question_paper(img)
                 if is_likely_question_paper:
                     logger.info("Detected PDF as likely question paper")
 
@@ -175,7 +256,8 @@ class ImagePDFExtractor(BaseExtractor):
 
                 # Use LLM OCR for all pages
                 try:
-                    page_text = llm_ocr_extract(img, self.llm_lang, is_likely_question_paper)
+                    with trace_span("extraction.page", page=page_num + 1):
+                        page_text = llm_ocr_extract(img, self.llm_lang, is_likely_question_paper)
                 except Exception as e:
                     logger.error(f"LLM OCR failed on page {page_num + 1}: {e}")
                     page_text = ""
@@ -4,13 +4,21 @@ Q&A Generator for Sisimpur Brain Engine.
 This module provides functionality to generate question-answer pairs from text.
 """
 
+import asyncio
 import logging
 import json
 import re
-from typing import List, Dict, Any, Optional
-
-from ..utils.api_utils import api
-from ..config import QA_GEMINI_MODEL, QUESTION_TYPE, ANSWER_OPTIONS
+from typing import List, Dict, Any, Optional, Tuple
+
+from ..utils.api_utils import api, async_api
+from ..utils.tracing import trace_span
+from ..utils.token_utils import (
+    PromptTooLargeError,
+    check_prompt_budget,
+    estimate_tokens,
+    split_text_by_tokens,
+)
+from ..config import QA_GEMINI_MODEL, QUESTION_TYPE, ANSWER_OPTIONS, CHUNK_TOKEN_BUDGET, MAX_PROMPT_TOKENS
 from ..prompts.prompt_manager import PromptManager
 
 logger = logging.getLogger("sisimpur.brain.generators.qa")
@@ -30,6 +38,7 @@ class QAGenerator:
         self.language = language
         self.document_type = document_type
         self.prompt_manager = PromptManager()
+        self.token_usage = {'calls': 0, 'prompt_tokens': 0, 'response_tokens': 0}
         logger.info(f"Initialized QAGenerator with language: {language}, document_type: {document_type}")
 
     def generate(self, text: str, num_questions: int) -> List[Dict[str, Any]]:
@@ -46,23 +55,12 @@ class QAGenerator:
         try:
             logger.info(f"Generating {num_questions} questions from text")
 
-            # Split text into chunks if it's too long
-            chunks = self._split_text(text)
-
-            # Distribute questions across chunks
-            questions_per_chunk = max(1, num_questions // len(chunks))
-            remaining_questions = num_questions % len(chunks)
-
+            # Split text into token-sized chunks and distribute questions across them
             all_qa_pairs = []
 
-            for i, chunk in enumerate(chunks):
-                chunk_questions = questions_per_chunk
-                if i < remaining_questions:
-                    chunk_questions += 1
-
-                if chunk_questions > 0:
-                    chunk_qa_pairs = self._generate_from_chunk(chunk, chunk_questions)
-                    all_qa_pairs.extend(chunk_qa_pairs)
+            for i, (chunk, chunk_questions) in enumerate(self._plan_chunks(text, num_questions)):
+                chunk_qa_pairs = self._generate_from_chunk(chunk, chunk_questions, i + 1)
+                all_qa_pairs.extend(chunk_qa_pairs)
 
             # Trim to exact number requested
             return all_qa_pairs[:num_questions]
@@ -97,11 +95,85 @@ class QAGenerator:
                 answer_options=ANSWER_OPTIONS
             )
 
-            # Generate using Gemini
-            response = api.generate_content(prompt, model_name=QA_GEMINI_MODEL)
+            # Generate using Gemini, falling back to chunked generation if the prompt is too large
+            try:
+                with trace_span("generation.chunk", chunk=1):
+                    response = self._call_model(prompt)
+            except PromptTooLargeError as e:
+                num_questions = self.prompt_manager.optimal_question_count(text)
+                logger.warning(f"{e}; splitting into chunks for {num_questions} questions")
+                return self.generate(text, num_questions)
 
             # Parse response
-            qa_pairs = self._parse_response(response.text, question_type)
+            with trace_span("parsing"):
+                qa_pairs = self._parse_response(response.text, question_type)
+
+            logger.info(f"Auto-generated {len(qa_pairs)} Q&A pairs")
+            return qa_pairs
+
+        except Exception as e:
+            logger.error(f"Error in optimal generation: {e}")
+            raise
+
+    async def generate_async(self, text: str, num_questions: int) -> List[Dict[str, Any]]:
+        """
+        Async version of generate(); chunks are generated concurrently.
+
+        Args:
+            text: Source text
+            num_questions: Number of questions to generate
+
+        Returns:
+            List of Q&A pairs
+        """
+        try:
+            logger.info(f"Generating {num_questions} questions from text (async)")
+
+            results = await asyncio.gather(*[
+                self._generate_from_chunk_async(chunk, chunk_questions, i + 1)
+                for i, (chunk, chunk_questions) in enumerate(self._plan_chunks(text, num_questions))
+            ])
+
+            # gather preserves chunk order, so output matches the sync path
+            all_qa_pairs = [qa_pair for chunk_qa_pairs in results for qa_pair in chunk_qa_pairs]
+            return all_qa_pairs[:num_questions]
+
+        except Exception as e:
+            logger.error(f"Error generating Q&A pairs: {e}")
+            raise
+
+    async def generate_optimal_async(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Async version of generate_optimal().
+
+        Args:
+            text: Source text
+
+        Returns:
+            List of Q&A pairs
+        """
+        try:
+            question_type = QUESTION_TYPE
+            prompt = self.prompt_manager.get_prompt(
+                language=self.language,
+                document_type=self.document_type,
+                question_type=question_type,
+                question_count_mode="auto",
+                text=text,
+                num_questions=None,
+                answer_options=ANSWER_OPTIONS
+            )
+
+            try:
+                with trace_span("generation.chunk", chunk=1):
+                    response = await self._call_model_async(prompt)
+            except PromptTooLargeError as e:
+                num_questions = self.prompt_manager.optimal_question_count(text)
+                logger.warning(f"{e}; splitting into chunks for {num_questions} questions")
+                return await self.generate_async(text, num_questions)
+
+            with trace_span("parsing"):
+                qa_pairs = self._parse_response(response.text, question_type)
 
             logger.info(f"Auto-generated {len(qa_pairs)} Q&A pairs")
             return qa_pairs
@@ -110,28 +182,105 @@ class QAGenerator:
             logger.error(f"Error in optimal generation: {e}")
             raise
 
-    def _split_text(self, text: str, max_chunk_size: int = 2000) -> List[str]:
-        """Split text into manageable chunks."""
-        words = text.split()
-        chunks = []
-        current_chunk = []
-        current_size = 0
+    def estimate(self, text: str, num_questions: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Forecast the token cost of generating questions from text, without calling the model.
 
-        for word in words:
-            if current_size + len(word) > max_chunk_size and current_chunk:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [word]
-                current_size = len(word)
-            else:
-                current_chunk.append(word)
-                current_size += len(word) + 1  # +1 for space
+        Args:
+            text: Source text
+            num_questions: Number of questions to generate (None for optimal mode)
 
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+        Returns:
+            Dictionary with the planned prompt count and estimated input tokens
+        """
+        if num_questions is None:
+            prompts = [self.prompt_manager.get_prompt(
+                language=self.language,
+                document_type=self.document_type,
+                question_type=QUESTION_TYPE,
+                question_count_mode="auto",
+                text=text,
+                num_questions=None,
+                answer_options=ANSWER_OPTIONS
+            )]
+            if estimate_tokens(prompts[0]) <= MAX_PROMPT_TOKENS:
+                return self._summarize_estimate(text, prompts)
+            num_questions = self.prompt_manager.optimal_question_count(text)
 
-        return chunks
+        prompts = [
+            self.prompt_manager.get_prompt(
+                language=self.language,
+                document_type=self.document_type,
+                question_type=QUESTION_TYPE,
+                question_count_mode="specific",
+                text=chunk,
+                num_questions=chunk_questions,
+                answer_options=ANSWER_OPTIONS
+            )
+            for chunk, chunk_questions in self._plan_chunks(text, num_questions)
+        ]
+        return self._summarize_estimate(text, prompts)
+
+    def _summarize_estimate(self, text: str, prompts: List[str]) -> Dict[str, Any]:
+        """Build the token forecast for a list of planned prompts."""
+        prompt_tokens = [estimate_tokens(prompt) for prompt in prompts]
+        return {
+            'language': self.language,
+            'source_characters': len(text),
+            'source_tokens': estimate_tokens(text),
+            'prompts': len(prompts),
+            'prompt_tokens': sum(prompt_tokens),
+            'max_prompt_tokens': max(prompt_tokens, default=0),
+            'chunk_token_budget': CHUNK_TOKEN_BUDGET,
+        }
+
+    def _plan_chunks(self, text: str, num_questions: int) -> List[Tuple[str, int]]:
+        """Split text into chunks and distribute the requested questions across them."""
+        chunks = self._split_text(text)
+
+        questions_per_chunk = max(1, num_questions // len(chunks))
+        remaining_questions = num_questions % len(chunks)
+
+        plan = []
+        for i, chunk in enumerate(chunks):
+            chunk_questions = questions_per_chunk
+            if i < remaining_questions:
+                chunk_questions += 1
+            if chunk_questions > 0:
+                plan.append((chunk, chunk_questions))
+        return plan
+
+    def _split_text(self, text: str, max_tokens: int = CHUNK_TOKEN_BUDGET) -> List[str]:
+        """Split text into chunks sized by estimated tokens rather than characters."""
+        return split_text_by_tokens(text, max_tokens) or [text]
+
+    def _call_model(self, prompt: str) -> Any:
+        """Check the prompt budget, call Gemini and record estimated token usage."""
+        prompt_tokens = check_prompt_budget(prompt)
+        response = api.generate_content(prompt, model_name=QA_GEMINI_MODEL)
+
+        self._record_usage(prompt_tokens, response)
+        return response
+
+    async def _call_model_async(self, prompt: str) -> Any:
+        """Async version of _call_model()."""
+        prompt_tokens = check_prompt_budget(prompt)
+        response = await async_api.generate_content(prompt, model_name=QA_GEMINI_MODEL)
+
+        self._record_usage(prompt_tokens, response)
+        return response
+
+    def _record_usage(self, prompt_tokens: int, response: Any):
+        """Add one model call to the estimated token usage."""
+        self.token_usage['calls'] += 1
+        self.token_usage['prompt_tokens'] += prompt_tokens
+        try:
+            self.token_usage['response_tokens'] += estimate_tokens(response.text)
+        except Exception:
+            pass
 
-    def _generate_from_chunk(self, text: str, num_questions: int) -> List[Dict[str, Any]]:
+    def _generate_from_chunk(self, text: str, num_questions: int,
+                             chunk_number: int = 1) -> List[Dict[str, Any]]:
         """Generate Q&A pairs from a text chunk."""
         try:
             # Determine question type and count mode
@@ -149,11 +298,41 @@ class QAGenerator:
                 answer_options=ANSWER_OPTIONS
             )
 
-            # Generate using Gemini
-            response = api.generate_content(prompt, model_name=QA_GEMINI_MODEL)
+            # Generate using Gemini (rejected if over the prompt budget)
+            with trace_span("generation.chunk", chunk=chunk_number):
+                response = self._call_model(prompt)
 
             # Parse response
-            qa_pairs = self._parse_response(response.text, question_type)
+            with trace_span("parsing"):
+                qa_pairs = self._parse_response(response.text, question_type)
+
+            logger.info(f"Generated {len(qa_pairs)} Q&A pairs from chunk")
+            return qa_pairs
+
+        except Exception as e:
+            logger.error(f"Error generating from chunk: {e}")
+            return []
+
+    async def _generate_from_chunk_async(self, text: str, num_questions: int,
+                                         chunk_number: int = 1) -> List[Dict[str, Any]]:
+        """Async version of _generate_from_chunk()."""
+        try:
+            question_type = QUESTION_TYPE
+            prompt = self.prompt_manager.get_prompt(
+                language=self.language,
+                document_type=self.document_type,
+                question_type=question_type,
+                question_count_mode="specific",
+                text=text,
+                num_questions=num_questions,
+                answer_options=ANSWER_OPTIONS
+            )
+
+            with trace_span("generation.chunk", chunk=chunk_number):
+                response = await self._call_model_async(prompt)
+
+            with trace_span("parsing"):
+                qa_pairs = self._parse_response(response.text, question_type)
 
             logger.info(f"Generated {len(qa_pairs)} Q&A pairs from chunk")
             return qa_pairs
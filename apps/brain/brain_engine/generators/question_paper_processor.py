@@ -2,191 +2,228 @@
 Question Paper Processor for Sisimpur Brain Engine.
 
 This module processes existing question papers and extracts Q&A pairs.
+
+Extraction is a single pass over the document: each line is tokenized once
+into question numbers, option markers and marks annotations, and a small
+state machine assembles the tokens into questions. Questions are emitted as
+soon as the next question starts, so large question banks are processed in
+linear time and callers can stop early.
 """
 
 import logging
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Union
 
 logger = logging.getLogger("sisimpur.brain.generators.question_paper")
 
+# Bengali digits ০-৯ map onto ASCII 0-9
+BENGALI_DIGITS = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+
+ENGLISH_OPTION_LABELS = "ABCD"
+BENGALI_OPTION_LABELS = "কখগঘ"
+
+# Page separators written by the extractors ("--- Page 3 ---")
+PAGE_MARKER_PATTERN = re.compile(r"^---\s*Page\s+\d+\s*---$")
+
+# One tokenizer for every marker we care about. Question numbers must stand
+# alone and must not be followed by another digit, so decimals like "3.5"
+# are treated as text.
+TOKEN_PATTERN = re.compile(
+    r"(?<!\S)(?P<number>[0-9০-৯]{1,3})\.(?![0-9০-৯])"
+    r"|(?<!\S)\(?(?P<option>[A-Dক-ঘ])\)"
+    r"|\[\s*(?P<marks>[0-9০-৯]+)\s*(?:(?i:marks?)|নম্বর)\s*\]"
+)
+
+MIN_MCQ_OPTIONS = 3
+
+
+def _to_int(digits: str) -> int:
+    """Convert ASCII or Bengali digits to an integer."""
+    return int(digits.translate(BENGALI_DIGITS))
+
+
+class _QuestionBuilder:
+    """Accumulates the parts of a single question while it is being parsed"""
+
+    __slots__ = ("number", "stem", "options", "marks")
+
+    def __init__(self, number: int):
+        self.number = number
+        self.stem: List[str] = []
+        self.options: List[List[str]] = []  # [label, text parts...]
+        self.marks: Optional[int] = None
+
+    def add_text(self, text: str):
+        if self.options:
+            self.options[-1].append(text)
+        else:
+            self.stem.append(text)
+
+    def accepts_option(self, label: str) -> bool:
+        """Options must appear in order (A, B, C, D or ক, খ, গ, ঘ)."""
+        labels = BENGALI_OPTION_LABELS if label in BENGALI_OPTION_LABELS else ENGLISH_OPTION_LABELS
+        position = len(self.options)
+        if position >= len(labels) or labels[position] != label:
+            return False
+        return not self.options or self.options[0][0] in labels
+
 
 class QuestionPaperProcessor:
     """Processor for extracting Q&A pairs from question papers"""
-    
+
     def __init__(self, language: str = "auto"):
         """
         Initialize the question paper processor.
-        
+
         Args:
             language: Language of the question paper ('auto', 'english', 'bengali')
         """
         self.language = language
         logger.info(f"Initialized QuestionPaperProcessor with language: {language}")
-    
-    def process(self, text: str, max_questions: Optional[int] = None) -> List[Dict[str, Any]]:
+
+    def process(self, text: Union[str, Iterable[str]],
+                max_questions: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Process question paper text and extract Q&A pairs.
-        
+
         Args:
-            text: Question paper text
+            text: Question paper text, or an iterable of page texts
             max_questions: Maximum number of questions to extract
-            
+
         Returns:
             List of Q&A pairs
         """
         try:
             logger.info("Processing question paper text")
-            
-            # Detect question type and extract questions
-            if self.language in ['bengali', 'bangla', 'bn']:
-                qa_pairs = self._extract_bengali_questions(text)
-            else:
-                qa_pairs = self._extract_english_questions(text)
-            
-            # Limit to max_questions if specified
-            if max_questions and len(qa_pairs) > max_questions:
-                qa_pairs = qa_pairs[:max_questions]
-            
+
+            pages = [text] if isinstance(text, str) else text
+
+            qa_pairs = []
+            for qa_pair in self.iter_questions(pages):
+                qa_pairs.append(qa_pair)
+                if max_questions and len(qa_pairs) >= max_questions:
+                    break
+
             logger.info(f"Extracted {len(qa_pairs)} questions from question paper")
             return qa_pairs
-            
+
         except Exception as e:
             logger.error(f"Error processing question paper: {e}")
             raise
-    
-    def _extract_english_questions(self, text: str) -> List[Dict[str, Any]]:
-        """Extract questions from English question paper."""
-        qa_pairs = []
-        
-        # Pattern for numbered questions
-        question_pattern = r'(\d+)\.\s*(.+?)(?=\d+\.|$)'
-        matches = re.findall(question_pattern, text, re.DOTALL)
-        
-        for match in matches:
-            question_num, question_text = match
-            question_text = question_text.strip()
-            
-            # Check if it's multiple choice
-            if self._is_multiple_choice(question_text):
-                qa_pair = self._parse_mcq_english(question_text)
-            else:
-                qa_pair = self._parse_short_answer(question_text)
-            
-            if qa_pair:
-                qa_pairs.append(qa_pair)
-        
-        return qa_pairs
-    
-    def _extract_bengali_questions(self, text: str) -> List[Dict[str, Any]]:
-        """Extract questions from Bengali question paper."""
-        qa_pairs = []
-        
-        # Pattern for Bengali numbered questions
-        bengali_pattern = r'([১২৩৪৫৬৭৮৯০]+)\.\s*(.+?)(?=[১২৩৪৫৬৭৮৯০]+\.|$)'
-        matches = re.findall(bengali_pattern, text, re.DOTALL)
-        
-        # Also try regular numbers
-        if not matches:
-            number_pattern = r'(\d+)\.\s*(.+?)(?=\d+\.|$)'
-            matches = re.findall(number_pattern, text, re.DOTALL)
-        
-        for match in matches:
-            question_num, question_text = match
-            question_text = question_text.strip()
-            
-            # Check if it's multiple choice
-            if self._is_multiple_choice_bengali(question_text):
-                qa_pair = self._parse_mcq_bengali(question_text)
-            else:
-                qa_pair = self._parse_short_answer(question_text)
-            
+
+    def iter_questions(self, pages: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream Q&A pairs out of page records.
+
+        Questions may continue across page boundaries; each question is
+        yielded as soon as the following question number is seen.
+
+        Args:
+            pages: Iterable of page texts (e.g. one OCR result per page)
+
+        Yields:
+            Q&A pair dictionaries
+        """
+        current: Optional[_QuestionBuilder] = None
+
+        for page in pages:
+            for line in page.splitlines():
+                line = line.strip()
+                if not line or PAGE_MARKER_PATTERN.match(line):
+                    continue
+
+                position = 0
+                for match in TOKEN_PATTERN.finditer(line):
+                    kind = match.lastgroup
+                    value = match.group(kind)
+
+                    if kind == "number" and not self._starts_question(current, value, match.start()):
+                        continue
+                    if kind == "option" and (current is None or not current.accepts_option(value)):
+                        continue
+
+                    # Flush the text preceding this token into the current target
+                    if current is not None and match.start() > position:
+                        current.add_text(line[position:match.start()])
+                    position = match.end()
+
+                    if kind == "number":
+                        if current is not None:
+                            qa_pair = self._build_qa_pair(current)
+                            if qa_pair:
+                                yield qa_pair
+                        current = _QuestionBuilder(_to_int(value))
+                    elif kind == "option":
+                        current.options.append([value])
+                    elif current is not None:
+                        current.marks = _to_int(value)
+
+                if current is not None and position < len(line):
+                    current.add_text(line[position:])
+
+        if current is not None:
+            qa_pair = self._build_qa_pair(current)
             if qa_pair:
-                qa_pairs.append(qa_pair)
-        
-        return qa_pairs
-    
-    def _is_multiple_choice(self, text: str) -> bool:
-        """Check if question is multiple choice (English)."""
-        # Look for option patterns like A), B), C), D)
-        option_pattern = r'[A-D]\)'
-        options = re.findall(option_pattern, text)
-        return len(options) >= 3
-    
-    def _is_multiple_choice_bengali(self, text: str) -> bool:
-        """Check if question is multiple choice (Bengali)."""
-        # Look for Bengali option patterns like ক), খ), গ), ঘ)
-        option_pattern = r'[কখগঘ]\)'
-        options = re.findall(option_pattern, text)
-        return len(options) >= 3
-    
-    def _parse_mcq_english(self, text: str) -> Dict[str, Any]:
-        """Parse English multiple choice question."""
-        try:
-            # Split question and options
-            parts = re.split(r'[A-D]\)', text)
-            question = parts[0].strip()
-            
-            # Extract options
-            option_pattern = r'([A-D])\)\s*([^A-D\)]+?)(?=[A-D]\)|$)'
-            option_matches = re.findall(option_pattern, text, re.DOTALL)
-            
-            options = []
-            for label, option_text in option_matches:
-                options.append(f"{label}) {option_text.strip()}")
-            
-            return {
-                'question': question,
-                'answer': 'Multiple choice question - answer not provided',
-                'question_type': 'MULTIPLECHOICE',
-                'options': options,
-                'correct_option': ''  # Would need answer key to determine
-            }
-        except Exception as e:
-            logger.error(f"Error parsing English MCQ: {e}")
-            return None
-    
-    def _parse_mcq_bengali(self, text: str) -> Dict[str, Any]:
-        """Parse Bengali multiple choice question."""
-        try:
-            # Split question and options
-            parts = re.split(r'[কখগঘ]\)', text)
-            question = parts[0].strip()
-            
-            # Extract options
-            option_pattern = r'([কখগঘ])\)\s*([^কখগঘ\)]+?)(?=[কখগঘ]\)|$)'
-            option_matches = re.findall(option_pattern, text, re.DOTALL)
-            
+                yield qa_pair
+
+    def _starts_question(self, current: Optional[_QuestionBuilder], digits: str, offset: int) -> bool:
+        """
+        Decide whether a number token opens a new question.
+
+        Numbers at the start of a line are always question numbers. Inline
+        numbers only count when they continue the numbering sequence, which
+        keeps years and counts inside a sentence from splitting a question.
+        """
+        if offset == 0:
+            return True
+        number = _to_int(digits)
+        if current is None:
+            return number == 1
+        return number == current.number + 1
+
+    def _is_bengali(self, builder: _QuestionBuilder) -> bool:
+        """Check whether a question should use Bengali answer placeholders."""
+        if builder.options:
+            return builder.options[0][0] in BENGALI_OPTION_LABELS
+        return self.language in ['bengali', 'bangla', 'bn']
+
+    def _build_qa_pair(self, builder: _QuestionBuilder) -> Optional[Dict[str, Any]]:
+        """Turn a finished question into a Q&A pair dictionary."""
+        question = " ".join(part.strip() for part in builder.stem if part.strip())
+
+        if len(builder.options) >= MIN_MCQ_OPTIONS:
             options = []
-            for label, option_text in option_matches:
-                options.append(f"{label}) {option_text.strip()}")
-            
-            return {
+            for label, *parts in builder.options:
+                option_text = " ".join(part.strip() for part in parts if part.strip())
+                options.append(f"{label}) {option_text}")
+
+            if self._is_bengali(builder):
+                answer = 'বহুনির্বাচনী প্রশ্ন - উত্তর প্রদান করা হয়নি'
+            else:
+                answer = 'Multiple choice question - answer not provided'
+
+            qa_pair = {
                 'question': question,
-                'answer': 'বহুনির্বাচনী প্রশ্ন - উত্তর প্রদান করা হয়নি',
+                'answer': answer,
                 'question_type': 'MULTIPLECHOICE',
                 'options': options,
                 'correct_option': ''  # Would need answer key to determine
             }
-        except Exception as e:
-            logger.error(f"Error parsing Bengali MCQ: {e}")
-            return None
-    
-    def _parse_short_answer(self, text: str) -> Dict[str, Any]:
-        """Parse short answer question."""
-        try:
-            # For short answer questions, the entire text is usually the question
-            question = text.strip()
-            
-            # Remove any trailing marks or instructions
-            question = re.sub(r'\[\d+\s*marks?\]', '', question, flags=re.IGNORECASE)
-            question = re.sub(r'\[\d+\s*নম্বর\]', '', question)
-            
-            return {
+        else:
+            # Too few options to be an MCQ; fold any stray options back into the text
+            for label, *parts in builder.options:
+                question = f"{question} {label}) {' '.join(p.strip() for p in parts if p.strip())}".strip()
+
+            qa_pair = {
                 'question': question,
                 'answer': 'Short answer question - answer not provided',
                 'question_type': 'SHORT'
             }
-        except Exception as e:
-            logger.error(f"Error parsing short answer: {e}")
+
+        if not qa_pair['question']:
             return None
+
+        if builder.marks is not None:
+            qa_pair['marks'] = builder.marks
+
+        return qa_pair
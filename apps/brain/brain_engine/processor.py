@@ -4,31 +4,78 @@ Main document processor for Sisimpur Brain Engine.
 This module provides the main document processing pipeline.
 """
 
+import asyncio
+import functools
 import logging
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 
 from .utils.document_detector import detect_document_type
 from .utils.file_utils import save_qa_pairs
 from .extractors import TextPDFExtractor, ImagePDFExtractor, ImageExtractor
 from .extractors.base import BaseExtractor
 from .utils.extractor_factory import get_extractor
+from .utils.token_utils import summarize_tokens
+from .utils.metrics import llm_metrics
+from .utils.tracing import Trace, trace_span
 
 logger = logging.getLogger("sisimpur.brain.processor")
 
 
+def _instrumented(method):
+    """
+    Trace a processing method and collect a rollup of its LLM calls.
+
+    The trace is left on ``self.trace`` (callers may add persistence spans
+    to it) and the LLM rollup on ``self.llm_metrics``.
+    """
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            self.trace = Trace(self.correlation_id)
+            with self.trace.activate(), llm_metrics.job_scope() as rollup:
+                try:
+                    return await method(self, *args, **kwargs)
+                finally:
+                    self.llm_metrics = rollup.summary()
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.trace = Trace(self.correlation_id)
+        with self.trace.activate(), llm_metrics.job_scope() as rollup:
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self.llm_metrics = rollup.summary()
+    return wrapper
+
+
 class DocumentProcessor:
     """Main document processor for the Sisimpur Brain system"""
     
-    def __init__(self, language: str = "auto"):
+    def __init__(self, language: str = "auto", correlation_id: Optional[str] = None,
+                 on_estimate: Optional[Callable[[Dict[str, Any]], None]] = None):
         """
         Initialize the document processor.
         
         Args:
             language: Language for processing ('auto', 'english', 'bengali')
+            correlation_id: Id attached to traces and logs (e.g. 'job-42')
+            on_estimate: Called with the token forecast before any model call,
+                and again with the usage added once generation ends or fails
         """
         self.language = language
+        self.correlation_id = correlation_id
+        self.on_estimate = on_estimate
+        # Token forecast and usage for the last processed document, for processing_metadata
+        self.token_estimate: Dict[str, Any] = {}
+        # Rollup of LLM calls (latency, retries, sleeps) for the last processed document
+        self.llm_metrics: Dict[str, Any] = {}
+        # Stage spans for the last processed document
+        self.trace: Optional[Trace] = None
         logger.info(f"Initialized DocumentProcessor with language: {language}")
     
+    @_instrumented
     def process(self, file_path: str, num_questions: Optional[int] = None) -> str:
         """
         Process a document and generate Q&A pairs.
@@ -41,11 +88,13 @@ class DocumentProcessor:
             Path to the output JSON file containing Q&A pairs
         """
         try:
-            logger.info(f"Starting document processing for: {file_path}")
+            logger.info(f"Starting document processing for: {file_path} [trace {self.trace.correlation_id}]")
+            self.token_estimate = {}
             
             # Step 1: Detect document type and metadata
             logger.info("Detecting document type and metadata...")
-            metadata = detect_document_type(file_path)
+            with trace_span("detection"):
+                metadata = detect_document_type(file_path)
             logger.info(f"Document metadata: {metadata}")
             
             # Step 2: Determine language
@@ -60,7 +109,8 @@ class DocumentProcessor:
             # Step 3: Extract text using appropriate extractor
             logger.info("Extracting text from document...")
             extractor = get_extractor(metadata)
-            extracted_text = extractor.extract(file_path)
+            with trace_span("extraction"):
+                extracted_text = extractor.extract(file_path)
             
             if not extracted_text.strip():
                 raise ValueError("No text could be extracted from the document")
@@ -79,9 +129,16 @@ class DocumentProcessor:
                 # Specialized processor for genuine question papers
                 logger.info("Document detected as a question paper, using specialized processor")
                 processor = QuestionPaperProcessor(language=language)
-                qa_pairs = processor.process(
-                    extracted_text, max_questions=num_questions
-                )
+                self.token_estimate = {
+                    'language': language,
+                    **summarize_tokens(extracted_text),
+                    'prompts': 0,
+                    'prompt_tokens': 0,
+                }
+                with trace_span("parsing"):
+                    qa_pairs = processor.process(
+                        extracted_text, max_questions=num_questions
+                    )
                 logger.info(
                     f"Extracted {len(qa_pairs)} questions from question paper"
                 )
@@ -89,15 +146,13 @@ class DocumentProcessor:
                 # Standard QA generation
                 logger.info("Using standard QA generator")
                 qa_generator = QAGenerator(language=language)
-                if num_questions is None:
-                    qa_pairs = qa_generator.generate_optimal(extracted_text)
-                else:
-                    qa_pairs = qa_generator.generate(extracted_text, num_questions)
+                qa_pairs = self._generate(qa_generator, extracted_text, num_questions)
                 
                 logger.info(f"Generated {len(qa_pairs)} Q&A pairs")
             
             # Step 5: Save results
-            output_file = save_qa_pairs(qa_pairs, file_path)
+            with trace_span("persistence"):
+                output_file = save_qa_pairs(qa_pairs, file_path)
             logger.info(f"Processing completed. Output saved to: {output_file}")
             
             return output_file
@@ -106,6 +161,73 @@ class DocumentProcessor:
             logger.error(f"Error processing document {file_path}: {e}")
             raise
     
+    @_instrumented
+    async def process_async(self, file_path: str, num_questions: Optional[int] = None) -> str:
+        """
+        Process a document on the asyncio client path.
+
+        Page OCR and chunk generation are issued concurrently through the
+        async API client; blocking file work runs in worker threads.
+
+        Args:
+            file_path: Path to the document file
+            num_questions: Number of questions to generate (optional)
+
+        Returns:
+            Path to the output JSON file containing Q&A pairs
+        """
+        try:
+            logger.info(f"Starting async document processing for: {file_path} [trace {self.trace.correlation_id}]")
+            self.token_estimate = {}
+
+            with trace_span("detection"):
+                metadata = await asyncio.to_thread(detect_document_type, file_path)
+            logger.info(f"Document metadata: {metadata}")
+
+            detected_language = metadata.get("language", "english")
+            language = detected_language if self.language == "auto" else self.language
+            logger.info(f"Using language: {language}")
+
+            extractor = get_extractor(metadata)
+            with trace_span("extraction"):
+                extracted_text = await extractor.extract_async(file_path)
+
+            if not extracted_text.strip():
+                raise ValueError("No text could be extracted from the document")
+
+            logger.info(f"Extracted {len(extracted_text)} characters of text")
+
+            from .generators.qa_generator import QAGenerator
+            from .generators.question_paper_processor import QuestionPaperProcessor
+
+            if metadata.get("is_question_paper", False):
+                logger.info("Document detected as a question paper, using specialized processor")
+                processor = QuestionPaperProcessor(language=language)
+                self.token_estimate = {
+                    'language': language,
+                    **summarize_tokens(extracted_text),
+                    'prompts': 0,
+                    'prompt_tokens': 0,
+                }
+                with trace_span("parsing"):
+                    qa_pairs = processor.process(extracted_text, max_questions=num_questions)
+                logger.info(f"Extracted {len(qa_pairs)} questions from question paper")
+            else:
+                qa_generator = QAGenerator(language=language)
+                qa_pairs = await self._generate_async(qa_generator, extracted_text, num_questions)
+                logger.info(f"Generated {len(qa_pairs)} Q&A pairs")
+
+            with trace_span("persistence"):
+                output_file = await asyncio.to_thread(save_qa_pairs, qa_pairs, file_path)
+            logger.info(f"Processing completed. Output saved to: {output_file}")
+
+            return output_file
+
+        except Exception as e:
+            logger.error(f"Error processing document {file_path}: {e}")
+            raise
+
+    @_instrumented
     def process_text(self, text: str, num_questions: Optional[int] = None, 
                     source_name: str = "raw_text") -> str:
         """
@@ -120,7 +242,8 @@ class DocumentProcessor:
             Path to the output JSON file containing Q&A pairs
         """
         try:
-            logger.info(f"Starting text processing for: {source_name}")
+            logger.info(f"Starting text processing for: {source_name} [trace {self.trace.correlation_id}]")
+            self.token_estimate = {}
             
             if not text.strip():
                 raise ValueError("No text provided for processing")
@@ -132,15 +255,13 @@ class DocumentProcessor:
             
             # Use standard QA generation for raw text
             qa_generator = QAGenerator(language=self.language)
-            if num_questions is None:
-                qa_pairs = qa_generator.generate_optimal(text)
-            else:
-                qa_pairs = qa_generator.generate(text, num_questions)
+            qa_pairs = self._generate(qa_generator, text, num_questions)
             
             logger.info(f"Generated {len(qa_pairs)} Q&A pairs")
             
             # Save results
-            output_file = save_qa_pairs(qa_pairs, source_name)
+            with trace_span("persistence"):
+                output_file = save_qa_pairs(qa_pairs, source_name)
             logger.info(f"Processing completed. Output saved to: {output_file}")
             
             return output_file
@@ -148,3 +269,54 @@ class DocumentProcessor:
         except Exception as e:
             logger.error(f"Error processing text: {e}")
             raise
+
+    def _generate(self, qa_generator, text: str, num_questions: Optional[int]) -> list:
+        """
+        Forecast token usage, then generate Q&A pairs.
+
+        The forecast is recorded on ``self.token_estimate`` and passed to
+        ``on_estimate`` before any model call is made; the estimated actual
+        usage is added and reported again afterwards, also when generation fails.
+        """
+        self.token_estimate = qa_generator.estimate(text, num_questions)
+        logger.info(
+            f"Token forecast: {self.token_estimate['prompt_tokens']} input tokens "
+            f"over {self.token_estimate['prompts']} prompt(s)"
+        )
+        self._report_estimate()
+
+        try:
+            with trace_span("generation"):
+                if num_questions is None:
+                    return qa_generator.generate_optimal(text)
+                return qa_generator.generate(text, num_questions)
+        finally:
+            self.token_estimate['used'] = dict(qa_generator.token_usage)
+            self._report_estimate()
+
+    async def _generate_async(self, qa_generator, text: str, num_questions: Optional[int]) -> list:
+        """Async version of _generate()."""
+        self.token_estimate = qa_generator.estimate(text, num_questions)
+        logger.info(
+            f"Token forecast: {self.token_estimate['prompt_tokens']} input tokens "
+            f"over {self.token_estimate['prompts']} prompt(s)"
+        )
+        await asyncio.to_thread(self._report_estimate)
+
+        try:
+            with trace_span("generation"):
+                if num_questions is None:
+                    return await qa_generator.generate_optimal_async(text)
+                return await qa_generator.generate_async(text, num_questions)
+        finally:
+            self.token_estimate['used'] = dict(qa_generator.token_usage)
+            await asyncio.to_thread(self._report_estimate)
+
+    def _report_estimate(self):
+        """Pass a copy of the token estimate to on_estimate (e.g. to save it on the job)."""
+        if self.on_estimate is None:
+            return
+        try:
+            self.on_estimate(dict(self.token_estimate))
+        except Exception as e:
+            logger.warning(f"Could not record token estimate: {e}")
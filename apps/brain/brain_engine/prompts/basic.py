@@ -0,0 +1,72 @@
+"""
+Basic prompt templates for Sisimpur Brain Engine.
+
+Used when no template under the language/document type directories matches.
+The registry compiles them at load time, as ``basic/<language>/<question_type>``.
+"""
+
+BASIC_TEMPLATES = {
+    ("bengali", "multiplechoice"): """নিচের টেক্সটের উপর ভিত্তি করে ঠিক {num_questions}টি বহুনির্বাচনী প্রশ্ন তৈরি করুন।
+
+টেক্সট:
+{text}
+
+JSON ফরম্যাটে উত্তর দিন:
+{{
+  "questions": [
+    {{
+      "question": "প্রশ্নের টেক্সট?",
+      "options": ["ক) অপশন ১", "খ) অপশন ২", "গ) অপশন ৩", "ঘ) অপশন ৪"],
+      "answer": "অপশন ১",
+      "correct_option": "ক"
+    }}
+  ]
+}}""",
+
+    ("bengali", "short"): """নিচের টেক্সটের উপর ভিত্তি করে ঠিক {num_questions}টি সংক্ষিপ্ত প্রশ্ন তৈরি করুন।
+
+টেক্সট:
+{text}
+
+JSON ফরম্যাটে উত্তর দিন:
+{{
+  "questions": [
+    {{
+      "question": "প্রশ্নের টেক্সট?",
+      "answer": "উত্তরের টেক্সট।"
+    }}
+  ]
+}}""",
+
+    ("english", "multiplechoice"): """Based on the following text, generate exactly {num_questions} multiple choice questions.
+
+Text:
+{text}
+
+Format your response as JSON:
+{{
+  "questions": [
+    {{
+      "question": "Question text?",
+      "options": ["A) Option 1", "B) Option 2", "C) Option 3", "D) Option 4"],
+      "answer": "Option 1",
+      "correct_option": "A"
+    }}
+  ]
+}}""",
+
+    ("english", "short"): """Based on the following text, generate exactly {num_questions} short answer questions.
+
+Text:
+{text}
+
+Format your response as JSON:
+{{
+  "questions": [
+    {{
+      "question": "Question text?",
+      "answer": "Answer text."
+    }}
+  ]
+}}""",
+}
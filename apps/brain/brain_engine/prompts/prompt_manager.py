@@ -11,11 +11,9 @@ Uses Python modules for structured prompt organization with YAML metadata.
 """
 
 import logging
-import yaml
-import importlib
-from pathlib import Path
 from typing import Dict, Any, Optional
 from ..config import QUESTION_TYPE, ANSWER_OPTIONS
+from .registry import CompiledPrompt, PromptRegistry, get_prompt_registry
 
 logger = logging.getLogger("sisimpur.brain.prompts")
 
@@ -25,52 +23,11 @@ class PromptManager:
 
     def __init__(self):
         """Initialize the prompt manager"""
-        self.prompts_dir = Path(__file__).parent
-        self._prompt_cache = {}
-        self.config_file = self.prompts_dir / "prompts_config.yaml"
-        self._load_config()
-        logger.info("Initialized PromptManager with Python module prompts")
-
-    def _load_config(self):
-        """Load prompt configuration from YAML file"""
-        try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    self.config = yaml.safe_load(f)
-            else:
-                # Create default config
-                self.config = self._create_default_config()
-                self._save_config()
-            logger.info("Loaded prompt configuration")
-        except Exception as e:
-            logger.error(f"Error loading config: {e}")
-            self.config = self._create_default_config()
-
-    def _create_default_config(self) -> Dict[str, Any]:
-        """Create default configuration"""
-        return {
-            "languages": ["english", "bengali"],
-            "document_types": ["context_document", "question_paper"],
-            "question_types": ["multiplechoice", "short", "mixed"],
-            "count_modes": ["auto", "specific"],
-            "default_answer_options": 4,
-            "optimal_question_thresholds": {
-                "very_short": {"max_words": 100, "questions": 2},
-                "short": {"max_words": 500, "questions": 5},
-                "medium": {"max_words": 1000, "questions": 8},
-                "long": {"max_words": 2000, "questions": 12},
-                "very_long": {"questions": 15}
-            }
-        }
-
-    def _save_config(self):
-        """Save configuration to YAML file"""
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, default_flow_style=False, allow_unicode=True)
-            logger.info("Saved prompt configuration")
-        except Exception as e:
-            logger.error(f"Error saving config: {e}")
+        # Templates and config are loaded once per process by the registry
+        self.registry = get_prompt_registry()
+        self.prompts_dir = self.registry.prompts_dir
+        self.config_file = self.registry.config_file
+        self.config = self.registry.config
 
     def get_prompt(self,
                    language: str,
@@ -102,12 +59,12 @@ class PromptManager:
             question_type = self._normalize_question_type(question_type)
             question_count_mode = self._normalize_count_mode(question_count_mode)
 
-            # Get prompt from Python module
-            prompt_template = self._get_prompt_from_module(
+            # Get the precompiled prompt
+            prompt_template = self._get_compiled_prompt(
                 language, document_type, question_type, question_count_mode
             )
 
-            # Format the template with parameters
+            # Render the template with parameters
             formatted_prompt = self._format_prompt(
                 prompt_template, text, num_questions, answer_options
             )
@@ -150,68 +107,66 @@ class PromptManager:
             return 'auto'
         return 'specific'
 
-    def _get_prompt_from_module(self, language: str, doc_type: str,
-                               q_type: str, count_mode: str) -> str:
-        """Get prompt template from Python module"""
-        # Create cache key
-        cache_key = f"{language}_{doc_type}_{q_type}_{count_mode}"
-
-        # Check cache first
-        if cache_key in self._prompt_cache:
-            return self._prompt_cache[cache_key]
+    def get_template(self,
+                     language: str,
+                     document_type: str,
+                     question_type: str,
+                     question_count_mode: str) -> CompiledPrompt:
+        """
+        Get the compiled prompt that get_prompt() would render.
 
-        try:
-            # Import the appropriate prompt module
-            module_name = f"apps.brain.brain_engine.prompts.{language}.{doc_type}.{q_type}_{count_mode}"
-            module = importlib.import_module(module_name)
+        The returned prompt's ``version`` can be used as part of a cache key.
+        """
+        return self._get_compiled_prompt(
+            self._normalize_language(language),
+            self._normalize_document_type(document_type),
+            self._normalize_question_type(question_type),
+            self._normalize_count_mode(question_count_mode),
+        )
 
-            # Get the prompt template
-            if hasattr(module, 'PROMPT_TEMPLATE'):
-                template = module.PROMPT_TEMPLATE
-                self._prompt_cache[cache_key] = template
-                return template
-            else:
-                logger.warning(f"PROMPT_TEMPLATE not found in module: {module_name}")
+    def _get_compiled_prompt(self, language: str, doc_type: str,
+                             q_type: str, count_mode: str) -> CompiledPrompt:
+        """Get a compiled prompt from the registry, falling back to the mixed and basic templates"""
+        prompt = self.registry.get(PromptRegistry.make_key(language, doc_type, q_type, count_mode))
+        if prompt is not None:
+            return prompt
 
-        except ImportError as e:
-            logger.warning(f"Could not import prompt module {module_name}: {e}")
-            # Try fallback to mixed template
-            try:
-                fallback_module = f"apps.brain.brain_engine.prompts.{language}.{doc_type}.mixed_{count_mode}"
-                module = importlib.import_module(fallback_module)
-                if hasattr(module, 'PROMPT_TEMPLATE'):
-                    template = module.PROMPT_TEMPLATE
-                    self._prompt_cache[cache_key] = template
-                    return template
-            except ImportError:
-                pass
-
-        except Exception as e:
-            logger.error(f"Error loading prompt module: {e}")
+        logger.warning(f"No prompt template for {language}/{doc_type}/{q_type}_{count_mode}")
+        prompt = self.registry.get(PromptRegistry.make_key(language, doc_type, "mixed", count_mode))
+        if prompt is not None:
+            return prompt
 
         # Ultimate fallback
-        return self._get_basic_template(language, q_type, count_mode)
+        return self._get_basic_prompt(language, q_type)
+
+    def _get_basic_prompt(self, language: str, q_type: str) -> CompiledPrompt:
+        """Get the compiled basic template for a language and question type"""
+        language = 'bengali' if language == 'bengali' else 'english'
+        q_type = 'multiplechoice' if q_type == 'multiplechoice' else 'short'
+        return self.registry.get(PromptRegistry.make_basic_key(language, q_type))
+
+    def optimal_question_count(self, text: str) -> int:
+        """Calculate the optimal number of questions from the configured word thresholds"""
+        word_count = len(text.split())
+        thresholds = self.config.get("optimal_question_thresholds") or {}
+        ordered = sorted(
+            thresholds.values(),
+            key=lambda t: t.get("max_words", float("inf"))
+        )
+        for threshold in ordered:
+            if "max_words" not in threshold or word_count < threshold["max_words"]:
+                return threshold["questions"]
+        return 15
 
-    def _format_prompt(self, template: str, text: str, num_questions: Optional[int],
+    def _format_prompt(self, template: CompiledPrompt, text: str, num_questions: Optional[int],
                       answer_options: int) -> str:
-        """Format the prompt template with actual values"""
+        """Render the compiled prompt with actual values"""
         try:
             # Calculate optimal questions if not specified
             if num_questions is None:
-                word_count = len(text.split())
-                if word_count < 100:
-                    num_questions = 2
-                elif word_count < 500:
-                    num_questions = 5
-                elif word_count < 1000:
-                    num_questions = 8
-                elif word_count < 2000:
-                    num_questions = 12
-                else:
-                    num_questions = 15
+                num_questions = self.optimal_question_count(text)
 
-            # Format the template
-            formatted = template.format(
+            return template.render(
                 text=text,
                 num_questions=num_questions,
                 answer_options=answer_options,
@@ -219,87 +174,15 @@ class PromptManager:
                 option_labels_bn="ক, খ, গ, ঘ" if answer_options == 4 else ", ".join(["ক", "খ", "গ", "ঘ", "ঙ", "চ", "ছ", "জ"][:answer_options])
             )
 
-            return formatted
-
         except Exception as e:
             logger.error(f"Error formatting prompt: {e}")
-            return template  # Return unformatted template as fallback
-
-    def _get_basic_template(self, language: str, q_type: str, count_mode: str) -> str:
-        """Get a basic template as fallback"""
-        if language == 'bengali':
-            if q_type == 'multiplechoice':
-                return """নিচের টেক্সটের উপর ভিত্তি করে ঠিক {num_questions}টি বহুনির্বাচনী প্রশ্ন তৈরি করুন।
-
-টেক্সট:
-{text}
-
-JSON ফরম্যাটে উত্তর দিন:
-{{
-  "questions": [
-    {{
-      "question": "প্রশ্নের টেক্সট?",
-      "options": ["ক) অপশন ১", "খ) অপশন ২", "গ) অপশন ৩", "ঘ) অপশন ৪"],
-      "answer": "অপশন ১",
-      "correct_option": "ক"
-    }}
-  ]
-}}"""
-            else:
-                return """নিচের টেক্সটের উপর ভিত্তি করে ঠিক {num_questions}টি সংক্ষিপ্ত প্রশ্ন তৈরি করুন।
-
-টেক্সট:
-{text}
-
-JSON ফরম্যাটে উত্তর দিন:
-{{
-  "questions": [
-    {{
-      "question": "প্রশ্নের টেক্সট?",
-      "answer": "উত্তরের টেক্সট।"
-    }}
-  ]
-}}"""
-        else:  # English
-            if q_type == 'multiplechoice':
-                return """Based on the following text, generate exactly {num_questions} multiple choice questions.
-
-Text:
-{text}
-
-Format your response as JSON:
-{{
-  "questions": [
-    {{
-      "question": "Question text?",
-      "options": ["A) Option 1", "B) Option 2", "C) Option 3", "D) Option 4"],
-      "answer": "Option 1",
-      "correct_option": "A"
-    }}
-  ]
-}}"""
-            else:
-                return """Based on the following text, generate exactly {num_questions} short answer questions.
-
-Text:
-{text}
-
-Format your response as JSON:
-{{
-  "questions": [
-    {{
-      "question": "Question text?",
-      "answer": "Answer text."
-    }}
-  ]
-}}"""
+            return template.template  # Return unformatted template as fallback
 
     def _get_fallback_prompt(self, text: str, num_questions: int,
                            question_type: str, language: str) -> str:
         """Get a simple fallback prompt"""
-        template = self._get_basic_template(language, question_type.lower(), 'specific')
-        return template.format(
-            text=text,
-            num_questions=num_questions,
-            answer_options=4
+        prompt = self._get_basic_prompt(
+            self._normalize_language(language),
+            self._normalize_question_type(question_type)
         )
+        return prompt.render(text=text, num_questions=num_questions)
@@ -0,0 +1,220 @@
+"""
+Prompt Registry for Sisimpur Brain Engine.
+
+This module loads every prompt template under ``prompts/`` exactly once per
+process, validates it and compiles it into literal/field segments. Rendering
+a compiled prompt splices values between the segments, so the document text
+is never passed through ``str.format`` and braces inside it are harmless.
+
+Each compiled prompt carries a content hash (``version``) and the registry
+exposes an aggregate hash so response caches can key on prompt versions.
+The basic fallback templates are compiled in the same load, so the registry
+is never changed after loading and its version stays fixed for the process.
+"""
+
+import hashlib
+import importlib
+import logging
+import threading
+from pathlib import Path
+from string import Formatter
+from typing import Dict, Any, List, Optional, Tuple
+
+import yaml
+
+from .basic import BASIC_TEMPLATES
+
+logger = logging.getLogger("sisimpur.brain.prompts.registry")
+
+PROMPTS_PACKAGE = __name__.rsplit(".", 1)[0]
+PROMPTS_DIR = Path(__file__).parent
+CONFIG_FILE = PROMPTS_DIR / "prompts_config.yaml"
+
+# Fields a template may reference; anything else is rejected at load time
+ALLOWED_FIELDS = {
+    "text",
+    "num_questions",
+    "answer_options",
+    "option_labels_en",
+    "option_labels_bn",
+}
+REQUIRED_FIELDS = {"text"}
+
+DEFAULT_CONFIG = {
+    "languages": ["english", "bengali"],
+    "document_types": ["context_document", "question_paper"],
+    "question_types": ["multiplechoice", "short", "mixed"],
+    "count_modes": ["auto", "specific"],
+    "default_answer_options": 4,
+    "optimal_question_thresholds": {
+        "very_short": {"max_words": 100, "questions": 2},
+        "short": {"max_words": 500, "questions": 5},
+        "medium": {"max_words": 1000, "questions": 8},
+        "long": {"max_words": 2000, "questions": 12},
+        "very_long": {"questions": 15}
+    }
+}
+
+
+class PromptTemplateError(ValueError):
+    """Raised when a prompt template fails validation"""
+
+
+class CompiledPrompt:
+    """A prompt template pre-split into literal text and replacement fields"""
+
+    __slots__ = ("key", "source", "template", "version", "fields", "metadata", "_segments")
+
+    def __init__(self, key: str, template: str, source: str, metadata: Optional[Dict[str, Any]] = None):
+        self.key = key
+        self.source = source
+        self.template = template
+        self.metadata = metadata or {}
+        self.version = hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+        self._segments = self._compile(template)
+        self.fields = {field for _, field, _, _ in self._segments if field}
+
+    def _compile(self, template: str) -> List[Tuple[str, Optional[str], str, Optional[str]]]:
+        """Parse the template once into (literal, field, format_spec, conversion) tuples."""
+        try:
+            segments = list(Formatter().parse(template))
+        except ValueError as e:
+            raise PromptTemplateError(f"{self.key}: malformed template ({e})")
+
+        for _, field, _, _ in segments:
+            if field is None:
+                continue
+            if field not in ALLOWED_FIELDS:
+                raise PromptTemplateError(f"{self.key}: unknown field '{{{field}}}'")
+        return segments
+
+    def render(self, **values) -> str:
+        """
+        Render the prompt with the given values.
+
+        Args:
+            **values: Values for the template fields
+
+        Returns:
+            Rendered prompt string
+        """
+        parts = []
+        for literal, field, format_spec, conversion in self._segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+            parts.append(format(value, format_spec) if format_spec else str(value))
+        return "".join(parts)
+
+    def __repr__(self):
+        return f"<CompiledPrompt {self.key} v{self.version}>"
+
+
+class PromptRegistry:
+    """Process-wide registry of compiled prompt templates"""
+
+    def __init__(self, prompts_dir: Path = PROMPTS_DIR, config_file: Path = CONFIG_FILE):
+        self.prompts_dir = Path(prompts_dir)
+        self.config_file = Path(config_file)
+        self.config: Dict[str, Any] = {}
+        self.prompts: Dict[str, CompiledPrompt] = {}
+        self.errors: Dict[str, str] = {}
+        self.version = ""
+
+    @staticmethod
+    def make_key(language: str, document_type: str, question_type: str, count_mode: str) -> str:
+        """Build the registry key for a prompt."""
+        return f"{language}/{document_type}/{question_type}_{count_mode}"
+
+    @staticmethod
+    def make_basic_key(language: str, question_type: str) -> str:
+        """Build the registry key for a basic fallback prompt."""
+        return f"basic/{language}/{question_type}"
+
+    def load(self):
+        """Load the configuration and compile every template under the prompts directory."""
+        self.config = self._load_config()
+
+        for path in sorted(self.prompts_dir.glob("*/*/*")):
+            if path.suffix not in (".py", ".txt") or path.name.startswith("__"):
+                continue
+
+            language, document_type = path.parent.parent.name, path.parent.name
+            question_type, _, count_mode = path.stem.partition("_")
+            key = self.make_key(language, document_type, question_type, count_mode)
+
+            try:
+                template, metadata = self._read_template(path, language, document_type)
+                prompt = CompiledPrompt(key, template, str(path.relative_to(self.prompts_dir)), metadata)
+                missing = REQUIRED_FIELDS - prompt.fields
+                if missing:
+                    raise PromptTemplateError(f"{key}: missing required field(s) {sorted(missing)}")
+                self.prompts[key] = prompt
+            except Exception as e:
+                self.errors[key] = str(e)
+                logger.error(f"Invalid prompt template {path.name}: {e}")
+
+        for (language, question_type), template in BASIC_TEMPLATES.items():
+            key = self.make_basic_key(language, question_type)
+            self.prompts[key] = CompiledPrompt(key, template, "basic.py")
+
+        self._update_version()
+        logger.info(f"Loaded {len(self.prompts)} prompt templates (registry version {self.version})")
+        return self
+
+    def _load_config(self) -> Dict[str, Any]:
+        """Load prompt configuration from YAML without ever writing it back."""
+        try:
+            if self.config_file.exists():
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    return yaml.safe_load(f) or dict(DEFAULT_CONFIG)
+        except Exception as e:
+            logger.error(f"Error loading prompt config: {e}")
+        return dict(DEFAULT_CONFIG)
+
+    def _read_template(self, path: Path, language: str, document_type: str) -> Tuple[str, Dict[str, Any]]:
+        """Read the raw template and metadata from a prompt module or text file."""
+        if path.suffix == ".txt":
+            return path.read_text(encoding="utf-8"), {}
+
+        module = importlib.import_module(f"{PROMPTS_PACKAGE}.{language}.{document_type}.{path.stem}")
+        template = getattr(module, "PROMPT_TEMPLATE", None)
+        if not isinstance(template, str):
+            raise PromptTemplateError(f"PROMPT_TEMPLATE not found in {module.__name__}")
+        return template, getattr(module, "METADATA", {})
+
+    def _update_version(self):
+        """Recompute the aggregate version hash over all registered prompts."""
+        digest = hashlib.sha256()
+        for key in sorted(self.prompts):
+            digest.update(f"{key}:{self.prompts[key].version}\n".encode("utf-8"))
+        self.version = digest.hexdigest()[:16]
+
+    def get(self, key: str) -> Optional[CompiledPrompt]:
+        """Get a compiled prompt by key."""
+        return self.prompts.get(key)
+
+    def versions(self) -> Dict[str, str]:
+        """Get the version hash of every registered prompt."""
+        return {key: prompt.version for key, prompt in self.prompts.items()}
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Get the process-wide prompt registry, loading it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PromptRegistry().load()
+    return _registry
@@ -2,16 +2,33 @@
 API utilities for Sisimpur Brain Engine.
 
 This module provides utilities for API calls with rate limiting and retries.
+
+Calls made with a ``task`` ("ocr", "classify" or "generate") are bounded by
+the per-task deadline in ``REQUEST_TIMEOUTS``. Each attempt runs on its own
+thread and holds one of MAX_CONCURRENT_REQUESTS request slots until it
+actually returns, so a call abandoned at its deadline keeps its slot while it
+hangs but never blocks a worker other calls are queued behind. The deadline
+is passed to the client library as well, and only starts once the call has a
+slot and is running. When ``HEDGE_REQUESTS`` is on,
+a call that runs past the task's observed p95 latency gets one duplicate
+request; the first response wins. Hedges only go out while the shared
+rate-limit batch has room, so they never trigger a cooldown on their own.
 """
 
+import asyncio
+import threading
 import time
 import logging
 import random
-from typing import Any, Callable, Dict, List, Optional, Union
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
 
 import google.generativeai as genai
 from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
 
+from .metrics import llm_metrics, classify_outcome
+from .llm_backends import create_model
 from ..config import (
     GEMINI_API_KEY,
     MAX_RETRIES,
@@ -19,6 +36,11 @@ from ..config import (
     MAX_RETRY_DELAY,
     RATE_LIMIT_BATCH_SIZE,
     RATE_LIMIT_COOLDOWN,
+    MAX_CONCURRENT_REQUESTS,
+    REQUEST_TIMEOUTS,
+    HEDGE_REQUESTS,
+    HEDGE_MIN_SAMPLES,
+    LLM_BACKEND,
     DEFAULT_GEMINI_MODEL,
     QA_GEMINI_MODEL,
     FALLBACK_GEMINI_MODEL,
@@ -30,49 +52,178 @@ logger = logging.getLogger("sisimpur.brain.api")
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
 
+# Task types understood by the deadline and hedging logic
+TASK_OCR = "ocr"
+TASK_CLASSIFY = "classify"
+TASK_GENERATE = "generate"
+
+
+class RequestTimeout(TimeoutError):
+    """Raised when a Gemini call misses its per-task deadline"""
+
+    def __init__(self, task: str, timeout: float):
+        self.task = task
+        self.timeout = timeout
+        super().__init__(f"{task} request timed out after {timeout:.1f} seconds")
+
+
+class LatencyTracker:
+    """Keeps a rolling window of winning call latencies per task"""
+
+    def __init__(self, window: int = 200, min_samples: int = HEDGE_MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, task: str, latency: float):
+        with self._lock:
+            self._samples[task].append(latency)
+
+    def percentile(self, task: str, pct: float) -> Optional[float]:
+        """Get a latency percentile for a task, or None until enough samples exist"""
+        with self._lock:
+            samples = sorted(self._samples[task])
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def hedge_delay(self, task: str, timeout: Optional[float]) -> Optional[float]:
+        """Get how long to wait before hedging a call, or None if it should not be hedged"""
+        if not HEDGE_REQUESTS:
+            return None
+        p95 = self.percentile(task, 95)
+        if p95 is None or (timeout is not None and p95 >= timeout):
+            return None
+        return p95
+
 
 class RateLimitedAPI:
     """
     A utility class for making rate-limited API calls with retries and backoff.
     """
 
-    def __init__(self):
+    def __init__(self, backend: str = LLM_BACKEND, max_concurrency: int = MAX_CONCURRENT_REQUESTS):
         self.request_count = 0
         self.last_cooldown = time.time()
         self.models_cache = {}
+        self.backend = backend
+        self.latency = LatencyTracker()
+        self.max_concurrency = max_concurrency
+        # Calls given up on (timed out or lost a hedge) that are still running
+        self.abandoned = 0
+        self._budget_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
 
     def get_model(
         self, model_name: str = DEFAULT_GEMINI_MODEL
     ) -> genai.GenerativeModel:
         """Get a cached model instance or create a new one"""
         if model_name not in self.models_cache:
-            self.models_cache[model_name] = genai.GenerativeModel(model_name)
+            self.models_cache[model_name] = create_model(model_name, self.backend)
         return self.models_cache[model_name]
 
-    def with_rate_limit(self, func: Callable, *args, **kwargs) -> Any:
+    def use_backend(self, backend: str):
+        """Switch model backend ('gemini' or 'fake'), dropping cached models"""
+        self.backend = backend
+        self.models_cache = {}
+
+    def _start_call(self, func: Callable, args: tuple, kwargs: dict,
+                    slot_timeout: Optional[float] = None) -> Optional[Future]:
+        """
+        Run a call on its own thread once a request slot is free.
+
+        The slot is released when the call returns, also after its caller has
+        given up on it. Returns None if no slot frees up within slot_timeout
+        (0 to not wait at all).
+        """
+        if slot_timeout == 0:
+            acquired = self._slots.acquire(blocking=False)
+        else:
+            acquired = self._slots.acquire(timeout=slot_timeout)
+        if not acquired:
+            return None
+
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def run():
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self._slots.release()
+
+        threading.Thread(target=run, name="gemini-call", daemon=True).start()
+        return future
+
+    def _abandon(self, futures):
+        """Count calls whose result is no longer wanted until they finish"""
+        def finished(_):
+            with self._budget_lock:
+                self.abandoned -= 1
+
+        for future in futures:
+            with self._budget_lock:
+                self.abandoned += 1
+            future.add_done_callback(finished)
+
+    def _acquire_hedge_budget(self) -> bool:
+        """
+        Reserve a slot in the current rate-limit batch for a hedged request.
+
+        Hedges never wait for a cooldown: if the batch is full, no hedge is sent.
+        """
+        with self._budget_lock:
+            if self.request_count + 1 >= RATE_LIMIT_BATCH_SIZE:
+                if time.time() - self.last_cooldown < RATE_LIMIT_COOLDOWN:
+                    return False
+                self.request_count = 0
+                self.last_cooldown = time.time()
+            self.request_count += 1
+            return True
+
+    def _cooldown(self) -> float:
+        """Count a request against the batch, sleeping if the batch is used up; returns seconds slept"""
+        # Check if we need to cool down
+        cooldown_time = 0.0
+        with self._budget_lock:
+            self.request_count += 1
+            if self.request_count >= RATE_LIMIT_BATCH_SIZE:
+                time_since_cooldown = time.time() - self.last_cooldown
+                cooldown_time = max(0.0, RATE_LIMIT_COOLDOWN - time_since_cooldown)
+                self.request_count = 0
+                self.last_cooldown = time.time() + cooldown_time
+
+        if cooldown_time:
+            logger.info(
+                f"Rate limit cooldown: sleeping for {cooldown_time:.2f} seconds"
+            )
+            time.sleep(cooldown_time)
+        return cooldown_time
+
+    def with_rate_limit(self, func: Callable, *args, task: Optional[str] = None,
+                        call_stats: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
         """
         Execute a function with rate limiting and retries.
 
         Args:
             func: The function to execute
             *args: Positional arguments for the function
+            task: Task type used to pick the call deadline (None for no deadline)
+            call_stats: Optional dict that receives 'retries' and 'sleep_seconds'
             **kwargs: Keyword arguments for the function
 
         Returns:
             The result of the function call
+
+        Raises:
+            RequestTimeout if an attempt misses the task deadline
         """
-        # Check if we need to cool down
-        self.request_count += 1
-        if self.request_count >= RATE_LIMIT_BATCH_SIZE:
-            time_since_cooldown = time.time() - self.last_cooldown
-            if time_since_cooldown < RATE_LIMIT_COOLDOWN:
-                cooldown_time = RATE_LIMIT_COOLDOWN - time_since_cooldown
-                logger.info(
-                    f"Rate limit cooldown: sleeping for {cooldown_time:.2f} seconds"
-                )
-                time.sleep(cooldown_time)
-            self.request_count = 0
-            self.last_cooldown = time.time()
+        stats = call_stats if call_stats is not None else {}
+        stats.setdefault("retries", 0)
+        stats["sleep_seconds"] = stats.get("sleep_seconds", 0.0) + self._cooldown()
 
         # Try with retries and exponential backoff
         retry_count = 0
@@ -80,7 +231,7 @@ class RateLimitedAPI:
 
         while True:
             try:
-                return func(*args, **kwargs)
+                return self._attempt(func, args, kwargs, task)
 
             except (ResourceExhausted, ServiceUnavailable) as e:
                 retry_count += 1
@@ -98,17 +249,69 @@ class RateLimitedAPI:
                 )
 
                 time.sleep(sleep_time)
+                stats["retries"] += 1
+                stats["sleep_seconds"] += sleep_time
                 retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
 
             except Exception as e:
                 logger.error(f"Error in API call: {e}")
                 raise
 
+    def _attempt(self, func: Callable, args: tuple, kwargs: dict, task: Optional[str]) -> Any:
+        """Make one attempt at a call, enforcing its deadline and hedging if enabled"""
+        timeout = REQUEST_TIMEOUTS.get(task) if task else None
+        start = time.monotonic()
+
+        if timeout is None:
+            result = func(*args, **kwargs)
+            if task:
+                self.latency.record(task, time.monotonic() - start)
+            return result
+
+        # Waiting for a slot is bounded separately, so the deadline only covers the call itself
+        future = self._start_call(func, args, kwargs, slot_timeout=timeout)
+        if future is None:
+            logger.warning(f"No free request slot for {task} call ({self.abandoned} abandoned calls still running)")
+            raise RequestTimeout(task, timeout)
+        start = time.monotonic()
+        deadline = start + timeout
+        pending = {future}
+
+        hedge_after = self.latency.hedge_delay(task, timeout)
+        if hedge_after is not None:
+            done, _ = wait(pending, timeout=hedge_after)
+            if not done and self._acquire_hedge_budget():
+                hedge = self._start_call(func, args, kwargs, slot_timeout=0)
+                if hedge is not None:
+                    logger.info(f"Hedging {task} request after {hedge_after:.2f} seconds")
+                    pending.add(hedge)
+
+        error = None
+        try:
+            while pending:
+                done, pending = wait(
+                    pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for future in done:
+                    if future.exception() is None:
+                        self.latency.record(task, time.monotonic() - start)
+                        return future.result()
+                    error = error or future.exception()
+        finally:
+            self._abandon(pending)
+
+        if error is not None and not pending:
+            raise error
+        raise RequestTimeout(task, timeout)
+
     def generate_content(
         self,
         prompt: Union[str, List],
         model_name: str = DEFAULT_GEMINI_MODEL,
         fallback: bool = True,
+        task: str = TASK_GENERATE,
     ) -> Any:
         """
         Generate content with rate limiting and retries.
@@ -117,25 +320,261 @@ class RateLimitedAPI:
             prompt: The prompt to send to the model
             model_name: The name of the model to use
             fallback: Whether to try fallback models if rate limited
+            task: Task type ("ocr", "classify" or "generate") for the deadline
 
         Returns:
             The model's response
         """
         model = self.get_model(model_name)
+        options = self._request_options(task)
+        stats = {"retries": 0, "sleep_seconds": 0.0}
+        start = time.monotonic()
+        error = None
 
         try:
-            return self.with_rate_limit(model.generate_content, prompt)
+            try:
+                return self.with_rate_limit(
+                    model.generate_content, prompt, task=task, call_stats=stats, **options
+                )
+
+            except ResourceExhausted as e:
+                if fallback and model_name != FALLBACK_GEMINI_MODEL:
+                    logger.warning(
+                        f"Falling back to {FALLBACK_GEMINI_MODEL} due to rate limits"
+                    )
+                    model_name = FALLBACK_GEMINI_MODEL
+                    fallback_model = self.get_model(FALLBACK_GEMINI_MODEL)
+                    return self.with_rate_limit(
+                        fallback_model.generate_content, prompt, task=task, call_stats=stats, **options
+                    )
+                else:
+                    raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._record_call(model_name, task, prompt, start, stats, error)
+
+    @staticmethod
+    def _record_call(model_name: str, task: str, prompt: Union[str, List], start: float,
+                     stats: Dict[str, Any], error: Optional[BaseException]):
+        """Record the metrics entry for one generate_content call"""
+        llm_metrics.record(
+            model=model_name,
+            task=task,
+            prompt=prompt,
+            latency=time.monotonic() - start,
+            retries=stats.get("retries", 0),
+            sleep_seconds=stats.get("sleep_seconds", 0.0),
+            outcome=classify_outcome(error),
+        )
+
+    @staticmethod
+    def _request_options(task: Optional[str]) -> Dict[str, Any]:
+        """Pass the deadline to the client library too, so abandoned calls are cut off"""
+        timeout = REQUEST_TIMEOUTS.get(task) if task else None
+        return {"request_options": {"timeout": timeout}} if timeout else {}
+
+
+class AsyncRateLimitedAPI(RateLimitedAPI):
+    """
+    Asyncio counterpart of RateLimitedAPI.
+
+    Uses the async generation API so a single worker can keep many requests
+    in flight. Cooldowns and backoff are awaited instead of blocking the
+    thread, and a semaphore caps the number of concurrent requests.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_REQUESTS, backend: str = LLM_BACKEND):
+        super().__init__(backend, max_concurrency)
+        self._loop_state = {}
+
+    def _get_loop_state(self):
+        """Get the lock and semaphore bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        state = self._loop_state.get(id(loop))
+        if state is None or state[0] is not loop:
+            state = (loop, asyncio.Lock(), asyncio.Semaphore(self.max_concurrency))
+            self._loop_state = {id(loop): state}
+        return state[1], state[2]
+
+    async def _cooldown(self, lock: asyncio.Lock) -> float:
+        """Apply the batch cooldown, admitting requests one at a time; returns seconds slept"""
+        cooldown_time = 0.0
+        async with lock:
+            self.request_count += 1
+            if self.request_count >= RATE_LIMIT_BATCH_SIZE:
+                time_since_cooldown = time.time() - self.last_cooldown
+                if time_since_cooldown < RATE_LIMIT_COOLDOWN:
+                    cooldown_time = RATE_LIMIT_COOLDOWN - time_since_cooldown
+                    logger.info(
+                        f"Rate limit cooldown: sleeping for {cooldown_time:.2f} seconds"
+                    )
+                    await asyncio.sleep(cooldown_time)
+                else:
+                    cooldown_time = 0.0
+                self.request_count = 0
+                self.last_cooldown = time.time()
+        return cooldown_time
+
+    async def with_rate_limit(self, func: Callable, *args, task: Optional[str] = None,
+                              call_stats: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        """
+        Await a coroutine function with rate limiting and retries.
+
+        Args:
+            func: The coroutine function to execute
+            *args: Positional arguments for the function
+            task: Task type used to pick the call deadline (None for no deadline)
+            call_stats: Optional dict that receives 'retries' and 'sleep_seconds'
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            The result of the function call
+
+        Raises:
+            RequestTimeout if an attempt misses the task deadline
+        """
+        lock, semaphore = self._get_loop_state()
+        stats = call_stats if call_stats is not None else {}
+        stats.setdefault("retries", 0)
+        stats["sleep_seconds"] = stats.get("sleep_seconds", 0.0) + await self._cooldown(lock)
+
+        # Try with retries and exponential backoff
+        retry_count = 0
+        retry_delay = INITIAL_RETRY_DELAY
+
+        while True:
+            try:
+                return await self._attempt(func, args, kwargs, task, semaphore)
+
+            except (ResourceExhausted, ServiceUnavailable) as e:
+                retry_count += 1
+                if retry_count > MAX_RETRIES:
+                    logger.error(f"Max retries ({MAX_RETRIES}) exceeded: {e}")
+                    raise
+
+                # Add jitter to avoid thundering herd
+                jitter = random.uniform(0.8, 1.2)
+                sleep_time = retry_delay * jitter
 
-        except ResourceExhausted as e:
-            if fallback and model_name != FALLBACK_GEMINI_MODEL:
                 logger.warning(
-                    f"Falling back to {FALLBACK_GEMINI_MODEL} due to rate limits"
+                    f"Rate limit hit, retrying in {sleep_time:.2f} seconds "
+                    f"(attempt {retry_count}/{MAX_RETRIES}): {e}"
                 )
-                fallback_model = self.get_model(FALLBACK_GEMINI_MODEL)
-                return self.with_rate_limit(fallback_model.generate_content, prompt)
-            else:
+
+                await asyncio.sleep(sleep_time)
+                stats["retries"] += 1
+                stats["sleep_seconds"] += sleep_time
+                retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+
+            except Exception as e:
+                logger.error(f"Error in API call: {e}")
                 raise
 
+    async def _attempt(self, func: Callable, args: tuple, kwargs: dict,
+                       task: Optional[str], semaphore: asyncio.Semaphore) -> Any:
+        """Make one attempt at a call, enforcing its deadline and hedging if enabled"""
+        timeout = REQUEST_TIMEOUTS.get(task) if task else None
+        start = time.monotonic()
+
+        async def call():
+            async with semaphore:
+                return await func(*args, **kwargs)
+
+        pending = {asyncio.ensure_future(call())}
+        try:
+            hedge_after = self.latency.hedge_delay(task, timeout)
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                if not done and not semaphore.locked() and self._acquire_hedge_budget():
+                    logger.info(f"Hedging {task} request after {hedge_after:.2f} seconds")
+                    pending.add(asyncio.ensure_future(call()))
+
+            error = None
+            while pending:
+                remaining = None if timeout is None else max(0.0, start + timeout - time.monotonic())
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for future in done:
+                    if future.exception() is None:
+                        if task:
+                            self.latency.record(task, time.monotonic() - start)
+                        return future.result()
+                    error = error or future.exception()
+
+            if error is not None and not pending:
+                raise error
+            raise RequestTimeout(task, timeout)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def generate_content(
+        self,
+        prompt: Union[str, List],
+        model_name: str = DEFAULT_GEMINI_MODEL,
+        fallback: bool = True,
+        task: str = TASK_GENERATE,
+    ) -> Any:
+        """
+        Generate content asynchronously with rate limiting and retries.
+
+        Args:
+            prompt: The prompt to send to the model
+            model_name: The name of the model to use
+            fallback: Whether to try fallback models if rate limited
+            task: Task type ("ocr", "classify" or "generate") for the deadline
 
-# Create a singleton instance
+        Returns:
+            The model's response
+        """
+        model = self.get_model(model_name)
+        options = self._request_options(task)
+        stats = {"retries": 0, "sleep_seconds": 0.0}
+        start = time.monotonic()
+        error = None
+
+        try:
+            try:
+                return await self.with_rate_limit(
+                    model.generate_content_async, prompt, task=task, call_stats=stats, **options
+                )
+
+            except ResourceExhausted as e:
+                if fallback and model_name != FALLBACK_GEMINI_MODEL:
+                    logger.warning(
+                        f"Falling back to {FALLBACK_GEMINI_MODEL} due to rate limits"
+                    )
+                    model_name = FALLBACK_GEMINI_MODEL
+                    fallback_model = self.get_model(FALLBACK_GEMINI_MODEL)
+                    return await self.with_rate_limit(
+                        fallback_model.generate_content_async, prompt, task=task, call_stats=stats, **options
+                    )
+                else:
+                    raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._record_call(model_name, task, prompt, start, stats, error)
+
+
+# Create singleton instances
 api = RateLimitedAPI()
+async_api = AsyncRateLimitedAPI()
+
+
+def use_backend(backend: str):
+    """
+    Switch both API singletons to a model backend.
+
+    Args:
+        backend: 'gemini' or 'fake'
+    """
+    api.use_backend(backend)
+    async_api.use_backend(backend)
+    logger.info(f"Using '{backend}' model backend")
@@ -0,0 +1,282 @@
+"""
+Model backends for Sisimpur Brain Engine.
+
+RateLimitedAPI gets its model objects from ``create_model``. The ``gemini``
+backend returns real ``genai.GenerativeModel`` instances; the ``fake``
+backend returns an offline stand-in for benchmarks, load tests and local
+development that never touches the network or the quota.
+
+The fake model answers deterministically: the same prompt always gets the
+same response. If a cassette file is configured, recorded responses are
+replayed by prompt fingerprint; otherwise (or on a cassette miss) it
+synthesizes valid question JSON, OCR text or a YES/NO classification.
+Latency is drawn per task from a log-normal distribution and
+ResourceExhausted/ServiceUnavailable errors are injected at configurable
+rates, so rate limiting, retries and timeouts behave as they would live.
+
+With the ``gemini`` backend, a configured cassette is recorded instead:
+every successful response is stored under its prompt fingerprint.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import google.generativeai as genai
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+
+from ..config import LLM_CASSETTE, FAKE_LLM
+
+logger = logging.getLogger("sisimpur.brain.api.backends")
+
+BACKEND_GEMINI = "gemini"
+BACKEND_FAKE = "fake"
+
+BENGALI_CHAR_PATTERN = re.compile(r"[ঀ-৿]")
+QUESTION_COUNT_PATTERN = re.compile(r"(?:exactly|typically)\s+(\d+)|(?:ঠিক|সাধারণত)\s*(\d+)টি")
+MCQ_HINT_PATTERN = re.compile(r"multiple choice|বহুনির্বাচনী", re.IGNORECASE)
+
+ENGLISH_WORDS = (
+    "river", "energy", "cell", "history", "market", "climate", "system", "language",
+    "equation", "culture", "process", "structure", "network", "economy", "planet", "theory",
+)
+BENGALI_WORDS = (
+    "নদী", "শক্তি", "কোষ", "ইতিহাস", "বাজার", "জলবায়ু", "পদ্ধতি", "ভাষা",
+    "সমীকরণ", "সংস্কৃতি", "প্রক্রিয়া", "গঠন", "অর্থনীতি", "গ্রহ", "তত্ত্ব", "সমাজ",
+)
+
+
+def prompt_fingerprint(contents: Union[str, List[Any]]) -> str:
+    """
+    Fingerprint a prompt so recorded responses can be looked up.
+
+    Args:
+        contents: A prompt string, or a list of strings and images
+
+    Returns:
+        Hex digest identifying the prompt
+    """
+    digest = hashlib.sha256()
+    parts = [contents] if isinstance(contents, str) else contents
+    for part in parts:
+        if isinstance(part, str):
+            digest.update(b"t:" + part.encode("utf-8"))
+        elif isinstance(part, (bytes, bytearray)):
+            digest.update(b"b:" + bytes(part))
+        elif hasattr(part, "tobytes"):
+            digest.update(f"i:{part.size}:".encode("utf-8") + part.tobytes())
+        else:
+            digest.update(b"o:" + repr(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class Cassette:
+    """A JSON file of recorded responses keyed by prompt fingerprint"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.responses: Dict[str, str] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.responses = json.load(f)
+            logger.info(f"Loaded {len(self.responses)} recorded responses from {self.path}")
+
+    def get(self, key: str) -> Optional[str]:
+        return self.responses.get(key)
+
+    def record(self, key: str, text: str):
+        """Store a response and rewrite the cassette atomically."""
+        with self._lock:
+            self.responses[key] = text
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.responses, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+class FakeResponse:
+    """Minimal stand-in for a Gemini GenerateContentResponse"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __repr__(self):
+        return f"<FakeResponse {len(self.text)} chars>"
+
+
+class FakeGenerativeModel:
+    """Offline, deterministic stand-in for genai.GenerativeModel"""
+
+    def __init__(self, model_name: str, settings: Optional[Dict[str, Any]] = None,
+                 cassette: Optional[Cassette] = None):
+        self.model_name = model_name
+        self.settings = {**FAKE_LLM, **(settings or {})}
+        self.cassette = cassette
+        self._rng = random.Random(self.settings.get("SEED", 0))
+        self._rng_lock = threading.Lock()
+
+    def generate_content(self, contents: Union[str, List[Any]], **kwargs) -> FakeResponse:
+        task = self._task(contents)
+        delay, error = self._draw(task)
+        time.sleep(delay)
+        if error:
+            raise error
+        return FakeResponse(self._respond(task, contents))
+
+    async def generate_content_async(self, contents: Union[str, List[Any]], **kwargs) -> FakeResponse:
+        task = self._task(contents)
+        delay, error = self._draw(task)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return FakeResponse(self._respond(task, contents))
+
+    @staticmethod
+    def _task(contents: Union[str, List[Any]]) -> str:
+        """Infer the task type from the prompt shape."""
+        if isinstance(contents, str) or all(isinstance(part, str) for part in contents):
+            return "generate"
+        text = " ".join(part for part in contents if isinstance(part, str))
+        return "classify" if "Answer only 'YES'" in text else "ocr"
+
+    def _draw(self, task: str):
+        """Draw a latency and an optional injected error for one call."""
+        median, sigma = self.settings.get("LATENCY", {}).get(task, (0.0, 0.0))
+        with self._rng_lock:
+            delay = self._rng.lognormvariate(0, sigma) * median if median else 0.0
+            roll = self._rng.random()
+
+        exhausted_rate = self.settings.get("RESOURCE_EXHAUSTED_RATE", 0.0)
+        unavailable_rate = self.settings.get("SERVICE_UNAVAILABLE_RATE", 0.0)
+        if roll < exhausted_rate:
+            return delay * 0.1, ResourceExhausted("Fake backend quota exceeded")
+        if roll < exhausted_rate + unavailable_rate:
+            return delay, ServiceUnavailable("Fake backend unavailable")
+        return delay, None
+
+    def _respond(self, task: str, contents: Union[str, List[Any]]) -> str:
+        key = prompt_fingerprint(contents)
+        if self.cassette is not None:
+            recorded = self.cassette.get(key)
+            if recorded is not None:
+                return recorded
+
+        # Seed from the prompt so identical prompts get identical answers
+        rng = random.Random(f"{self.settings.get('SEED', 0)}:{key}")
+        text = contents if isinstance(contents, str) else " ".join(p for p in contents if isinstance(p, str))
+        bengali = bool(BENGALI_CHAR_PATTERN.search(text))
+
+        if task == "classify":
+            return "YES" if rng.random() < self.settings.get("QUESTION_PAPER_RATE", 0.0) else "NO"
+        if task == "ocr":
+            return self._synthesize_ocr(rng, bengali, "question paper" in text or "প্রশ্নপত্র" in text)
+        return self._synthesize_questions(rng, text, bengali)
+
+    @staticmethod
+    def _sentence(rng: random.Random, words: tuple, length: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(length))
+
+    def _synthesize_ocr(self, rng: random.Random, bengali: bool, question_paper: bool) -> str:
+        words = BENGALI_WORDS if bengali else ENGLISH_WORDS
+        if not question_paper:
+            paragraphs = [
+                ". ".join(self._sentence(rng, words, rng.randint(6, 14)) for _ in range(rng.randint(3, 6))) + "."
+                for _ in range(rng.randint(2, 4))
+            ]
+            return "\n\n".join(paragraphs)
+
+        labels = "কখগঘ" if bengali else "ABCD"
+        lines = []
+        for number in range(1, rng.randint(5, 10) + 1):
+            lines.append(f"{number}. {self._sentence(rng, words, rng.randint(5, 10))}?")
+            lines.append("  ".join(f"{label}) {self._sentence(rng, words, 2)}" for label in labels))
+        return "\n".join(lines)
+
+    def _synthesize_questions(self, rng: random.Random, prompt: str, bengali: bool) -> str:
+        match = QUESTION_COUNT_PATTERN.search(prompt)
+        count = int(next(group for group in match.groups() if group)) if match else 5
+        multiple_choice = bool(MCQ_HINT_PATTERN.search(prompt))
+        words = BENGALI_WORDS if bengali else ENGLISH_WORDS
+        labels = "কখগঘ" if bengali else "ABCD"
+
+        questions = []
+        for _ in range(count):
+            question = {
+                "question": self._sentence(rng, words, rng.randint(5, 10)) + "?",
+                "difficulty": rng.choice(["easy", "medium", "hard"]),
+                "type": "MULTIPLECHOICE" if multiple_choice else "SHORT",
+            }
+            if multiple_choice:
+                options = [{"key": label, "text": self._sentence(rng, words, 3)} for label in labels]
+                correct = rng.choice(options)
+                question.update(options=options, answer=correct["text"], correct_option=correct["key"])
+            else:
+                question["answer"] = self._sentence(rng, words, rng.randint(8, 16)) + "."
+            questions.append(question)
+        return json.dumps({"questions": questions}, ensure_ascii=False)
+
+
+class RecordingModel:
+    """Wraps a real model and records its responses into a cassette"""
+
+    def __init__(self, model: Any, cassette: Cassette):
+        self.model = model
+        self.cassette = cassette
+
+    def generate_content(self, contents, **kwargs):
+        response = self.model.generate_content(contents, **kwargs)
+        self.cassette.record(prompt_fingerprint(contents), response.text)
+        return response
+
+    async def generate_content_async(self, contents, **kwargs):
+        response = await self.model.generate_content_async(contents, **kwargs)
+        self.cassette.record(prompt_fingerprint(contents), response.text)
+        return response
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def _get_cassette() -> Optional[Cassette]:
+    """Get the process-wide cassette, if one is configured."""
+    global _cassette
+    if not LLM_CASSETTE:
+        return None
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(LLM_CASSETTE)
+    return _cassette
+
+
+def create_model(model_name: str, backend: str = BACKEND_GEMINI) -> Any:
+    """
+    Create a model object for the given backend.
+
+    Args:
+        model_name: Gemini model name
+        backend: 'gemini' or 'fake'
+
+    Returns:
+        An object with generate_content and generate_content_async
+    """
+    if backend == BACKEND_FAKE:
+        return FakeGenerativeModel(model_name, cassette=_get_cassette())
+    if backend != BACKEND_GEMINI:
+        raise ValueError(f"Unknown LLM backend: {backend}")
+
+    model = genai.GenerativeModel(model_name)
+    cassette = _get_cassette()
+    return RecordingModel(model, cassette) if cassette is not None else model
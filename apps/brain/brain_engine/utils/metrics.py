@@ -0,0 +1,246 @@
+"""
+LLM call metrics for Sisimpur Brain Engine.
+
+Every Gemini call made through RateLimitedAPI records one entry: model, task,
+prompt characters, image bytes, latency, retry count, time spent sleeping in
+cooldowns or backoff, and outcome. Entries are folded into process-wide
+aggregates (rendered in the Prometheus text format for ``/metrics``) and into
+the rollup of the job currently being processed, if any.
+
+Aggregates live in process memory, so each worker process exposes its own
+counters; Prometheus sums them across scrape targets.
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+
+# Upper bounds (seconds) of the call latency histogram
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_RATE_LIMITED = "rate_limited"
+OUTCOME_UNAVAILABLE = "unavailable"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_ERROR = "error"
+
+_current_rollup: contextvars.ContextVar[Optional["JobRollup"]] = contextvars.ContextVar(
+    "sisimpur_llm_job_rollup", default=None
+)
+
+
+def prompt_size(prompt: Union[str, List[Any]]) -> Tuple[int, int]:
+    """
+    Measure a prompt as passed to generate_content.
+
+    Args:
+        prompt: A prompt string, or a list of strings and images
+
+    Returns:
+        Tuple of (prompt characters, image bytes)
+    """
+    parts = [prompt] if isinstance(prompt, str) else prompt
+    chars = 0
+    image_bytes = 0
+    for part in parts:
+        if isinstance(part, str):
+            chars += len(part)
+        elif isinstance(part, (bytes, bytearray)):
+            image_bytes += len(part)
+        elif hasattr(part, "size") and hasattr(part, "getbands"):
+            # PIL image: raw pixel bytes, without encoding the image
+            width, height = part.size
+            image_bytes += width * height * len(part.getbands())
+    return chars, image_bytes
+
+
+def classify_outcome(error: Optional[BaseException]) -> str:
+    """Map the exception that ended a call (or None) to an outcome label."""
+    if error is None:
+        return OUTCOME_SUCCESS
+    if isinstance(error, ResourceExhausted):
+        return OUTCOME_RATE_LIMITED
+    if isinstance(error, ServiceUnavailable):
+        return OUTCOME_UNAVAILABLE
+    if isinstance(error, TimeoutError):
+        return OUTCOME_TIMEOUT
+    return OUTCOME_ERROR
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "latency_seconds": 0.0,
+        "retries": 0,
+        "sleep_seconds": 0.0,
+        "prompt_chars": 0,
+        "image_bytes": 0,
+        "outcomes": {},
+    }
+
+
+def _add_entry(totals: Dict[str, Any], entry: Dict[str, Any]):
+    totals["calls"] += 1
+    totals["latency_seconds"] += entry["latency"]
+    totals["retries"] += entry["retries"]
+    totals["sleep_seconds"] += entry["sleep_seconds"]
+    totals["prompt_chars"] += entry["prompt_chars"]
+    totals["image_bytes"] += entry["image_bytes"]
+    totals["outcomes"][entry["outcome"]] = totals["outcomes"].get(entry["outcome"], 0) + 1
+
+
+class JobRollup:
+    """Per-job totals of LLM calls, grouped by task"""
+
+    def __init__(self):
+        self.by_task: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, entry: Dict[str, Any]):
+        with self._lock:
+            _add_entry(self.by_task.setdefault(entry["task"], _empty_totals()), entry)
+
+    def summary(self) -> Dict[str, Any]:
+        """Get a JSON-serializable summary for ProcessingJob.processing_metadata."""
+        with self._lock:
+            totals = _empty_totals()
+            by_task = {}
+            for task, task_totals in self.by_task.items():
+                by_task[task] = _round_totals(task_totals)
+                for key in ("calls", "latency_seconds", "retries", "sleep_seconds", "prompt_chars", "image_bytes"):
+                    totals[key] += task_totals[key]
+                for outcome, count in task_totals["outcomes"].items():
+                    totals["outcomes"][outcome] = totals["outcomes"].get(outcome, 0) + count
+        return {**_round_totals(totals), "by_task": by_task}
+
+
+def _round_totals(totals: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **totals,
+        "latency_seconds": round(totals["latency_seconds"], 3),
+        "sleep_seconds": round(totals["sleep_seconds"], 3),
+        "outcomes": dict(totals["outcomes"]),
+    }
+
+
+class LLMMetrics:
+    """Process-wide aggregates of LLM call metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (model, task, outcome) -> totals
+        self._series: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        # (model, task) -> cumulative histogram counts, one per bucket plus +Inf
+        self._latency: Dict[Tuple[str, str], List[int]] = {}
+
+    def record(self, model: str, task: str, prompt: Union[str, List[Any]], latency: float,
+               retries: int = 0, sleep_seconds: float = 0.0, outcome: str = OUTCOME_SUCCESS) -> Dict[str, Any]:
+        """
+        Record one LLM call.
+
+        Args:
+            model: Model that served (or last attempted) the call
+            task: Task type ("ocr", "classify", "generate")
+            prompt: The prompt that was sent
+            latency: Wall time of the call including retries, in seconds
+            retries: Number of retried attempts
+            sleep_seconds: Time spent in cooldown and backoff sleeps
+            outcome: Outcome label (see classify_outcome)
+
+        Returns:
+            The recorded entry
+        """
+        prompt_chars, image_bytes = prompt_size(prompt)
+        entry = {
+            "model": model,
+            "task": task,
+            "prompt_chars": prompt_chars,
+            "image_bytes": image_bytes,
+            "latency": latency,
+            "retries": retries,
+            "sleep_seconds": sleep_seconds,
+            "outcome": outcome,
+        }
+
+        with self._lock:
+            _add_entry(self._series.setdefault((model, task, outcome), _empty_totals()), entry)
+            buckets = self._latency.setdefault((model, task), [0] * (len(LATENCY_BUCKETS) + 1))
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    buckets[i] += 1
+            buckets[-1] += 1
+
+        rollup = _current_rollup.get()
+        if rollup is not None:
+            rollup.add(entry)
+        return entry
+
+    @contextmanager
+    def job_scope(self) -> Iterator[JobRollup]:
+        """Collect a rollup of every call made inside the block (including async tasks it spawns)."""
+        rollup = JobRollup()
+        token = _current_rollup.set(rollup)
+        try:
+            yield rollup
+        finally:
+            _current_rollup.reset(token)
+
+    def reset(self):
+        """Clear all aggregates."""
+        with self._lock:
+            self._series.clear()
+            self._latency.clear()
+
+    def render_prometheus(self) -> str:
+        """Render the aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            series = {key: dict(totals) for key, totals in self._series.items()}
+            latency = {key: list(counts) for key, counts in self._latency.items()}
+
+        lines = []
+        counters = (
+            ("sisimpur_llm_calls_total", "calls", "LLM calls by model, task and outcome."),
+            ("sisimpur_llm_retries_total", "retries", "Retried LLM call attempts."),
+            ("sisimpur_llm_sleep_seconds_total", "sleep_seconds", "Seconds spent in rate-limit cooldown and backoff."),
+            ("sisimpur_llm_prompt_chars_total", "prompt_chars", "Prompt characters sent to the model."),
+            ("sisimpur_llm_image_bytes_total", "image_bytes", "Raw image bytes sent to the model."),
+        )
+        for name, key, help_text in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (model, task, outcome), totals in sorted(series.items()):
+                labels = _labels(model=model, task=task, outcome=outcome)
+                lines.append(f"{name}{{{labels}}} {_number(totals[key])}")
+
+        name = "sisimpur_llm_call_latency_seconds"
+        lines.append(f"# HELP {name} LLM call latency including retries.")
+        lines.append(f"# TYPE {name} histogram")
+        for (model, task), counts in sorted(latency.items()):
+            for bound, count in zip(list(LATENCY_BUCKETS) + ["+Inf"], counts):
+                labels = _labels(model=model, task=task, le=str(bound))
+                lines.append(f"{name}_bucket{{{labels}}} {count}")
+            latency_sum = sum(
+                totals["latency_seconds"] for (m, t, _), totals in series.items() if (m, t) == (model, task)
+            )
+            labels = _labels(model=model, task=task)
+            lines.append(f"{name}_sum{{{labels}}} {_number(latency_sum)}")
+            lines.append(f"{name}_count{{{labels}}} {counts[-1]}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return ",".join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+def _number(value: Union[int, float]) -> str:
+    return str(value) if isinstance(value, int) else f"{value:.6g}"
+
+
+# Create a singleton instance
+llm_metrics = LLMMetrics()
@@ -0,0 +1,145 @@
+"""
+Token estimation utilities for Sisimpur Brain Engine.
+
+This module provides a local, dependency-free token estimator used to size
+chunks and budget prompts before they are sent to Gemini. Bengali script
+tokenizes far less efficiently than Latin text, so characters are costed
+per script using calibrated characters-per-token ratios.
+"""
+
+import math
+import re
+from typing import Any, Dict, List, Union
+
+from ..config import CHARS_PER_TOKEN, IMAGE_TOKENS, MAX_PROMPT_TOKENS
+
+BENGALI_CHAR_PATTERN = re.compile(r"[\u0980-\u09ff]")
+
+
+class PromptTooLargeError(ValueError):
+    """Raised when a prompt is estimated to exceed the model input budget"""
+
+    def __init__(self, tokens: int, limit: int):
+        self.tokens = tokens
+        self.limit = limit
+        super().__init__(f"Prompt is estimated at {tokens} tokens, over the {limit} token limit")
+
+
+def token_cost(text: str) -> float:
+    """
+    Estimate the fractional token cost of a piece of text.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated number of tokens (not rounded)
+    """
+    if not text:
+        return 0.0
+    bengali_chars = len(BENGALI_CHAR_PATTERN.findall(text))
+    other_chars = len(text) - bengali_chars
+    return (
+        bengali_chars / CHARS_PER_TOKEN.get("bengali", 1.6)
+        + other_chars / CHARS_PER_TOKEN.get("english", 4.0)
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate how many tokens a text will cost.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated token count
+    """
+    return math.ceil(token_cost(text))
+
+
+def estimate_prompt_tokens(prompt: Union[str, List[Any]]) -> int:
+    """
+    Estimate the input tokens of a prompt as passed to generate_content.
+
+    Args:
+        prompt: A prompt string, or a list of strings and images
+
+    Returns:
+        Estimated token count
+    """
+    if isinstance(prompt, str):
+        return estimate_tokens(prompt)
+
+    total = 0
+    for part in prompt:
+        total += estimate_tokens(part) if isinstance(part, str) else IMAGE_TOKENS
+    return total
+
+
+def check_prompt_budget(prompt: Union[str, List[Any]], limit: int = MAX_PROMPT_TOKENS) -> int:
+    """
+    Reject a prompt that would exceed the model input budget.
+
+    Args:
+        prompt: Prompt to check
+        limit: Maximum number of input tokens
+
+    Returns:
+        Estimated token count
+
+    Raises:
+        PromptTooLargeError if the estimate is over the limit
+    """
+    tokens = estimate_prompt_tokens(prompt)
+    if tokens > limit:
+        raise PromptTooLargeError(tokens, limit)
+    return tokens
+
+
+def split_text_by_tokens(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text on word boundaries into chunks of at most max_tokens each.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List of text chunks
+    """
+    chunks = []
+    current_chunk = []
+    current_cost = 0.0
+
+    for word in text.split():
+        word_cost = token_cost(word) + token_cost(" ")
+        if current_cost + word_cost > max_tokens and current_chunk:
+            chunks.append(' '.join(current_chunk))
+            current_chunk = [word]
+            current_cost = word_cost
+        else:
+            current_chunk.append(word)
+            current_cost += word_cost
+
+    if current_chunk:
+        chunks.append(' '.join(current_chunk))
+
+    return chunks
+
+
+def summarize_tokens(text: str) -> Dict[str, int]:
+    """
+    Summarize the token profile of a text.
+
+    Args:
+        text: Text to summarize
+
+    Returns:
+        Dictionary with character and estimated token counts
+    """
+    return {
+        "characters": len(text),
+        "bengali_characters": len(BENGALI_CHAR_PATTERN.findall(text)),
+        "estimated_tokens": estimate_tokens(text),
+    }
@@ -0,0 +1,129 @@
+"""
+Stage-level tracing for Sisimpur Brain Engine.
+
+A Trace records spans (detection, per-page extraction, per-chunk generation,
+parsing, persistence) for one processing job under a correlation id. The
+active trace is held in a context variable, so extractors and generators
+emit spans with ``trace_span`` without the trace being passed around, and
+spans from concurrent asyncio tasks land in the same trace.
+
+Traces are stored compactly in ``ProcessingJob.processing_metadata['trace']``:
+
+    {"id": "job-42", "total_ms": 5210,
+     "spans": [["detection", 0, 12], ["extraction.page", 15, 2300, {"page": 1}], ...]}
+
+where each span is ``[name, start_ms, duration_ms]`` plus optional attributes.
+"""
+
+import contextvars
+import math
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar(
+    "sisimpur_brain_trace", default=None
+)
+
+
+class Trace:
+    """Spans recorded for one processing job"""
+
+    def __init__(self, correlation_id: Optional[str] = None):
+        self.correlation_id = correlation_id or uuid.uuid4().hex[:12]
+        self.spans: List[list] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[None]:
+        """
+        Time a block as a span of this trace.
+
+        Args:
+            name: Stage name (e.g. 'detection', 'extraction.page')
+            **attrs: Small attributes stored with the span (page, chunk, ...)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            span = [name, _ms(start - self._origin), _ms(end - start)]
+            if attrs:
+                span.append(attrs)
+            with self._lock:
+                self.spans.append(span)
+
+    @contextmanager
+    def activate(self) -> Iterator["Trace"]:
+        """Make this the active trace for trace_span calls inside the block."""
+        token = _current_trace.set(self)
+        try:
+            yield self
+        finally:
+            _current_trace.reset(token)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the compact, JSON-serializable form of the trace."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span[1])
+        total_ms = max((span[1] + span[2] for span in spans), default=0)
+        return {"id": self.correlation_id, "total_ms": total_ms, "spans": spans}
+
+
+def _ms(seconds: float) -> int:
+    return int(round(seconds * 1000))
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the active trace, if any."""
+    return _current_trace.get()
+
+
+def trace_span(name: str, **attrs):
+    """
+    Time a block as a span of the active trace; a no-op when no trace is active.
+
+    Args:
+        name: Stage name
+        **attrs: Small attributes stored with the span
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return nullcontext()
+    return trace.span(name, **attrs)
+
+
+def _percentile(sorted_values: Sequence[int], pct: float) -> int:
+    """Nearest-rank percentile of an already sorted sequence."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def stage_percentiles(traces: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """
+    Compute p50/p95 span durations per stage across stored traces.
+
+    Args:
+        traces: Compact trace dictionaries (as produced by Trace.to_dict)
+
+    Returns:
+        Dictionary mapping stage name to count, p50_ms and p95_ms
+    """
+    durations: Dict[str, List[int]] = {}
+    for trace in traces:
+        for span in (trace or {}).get("spans", []):
+            durations.setdefault(span[0], []).append(span[2])
+
+    stats = {}
+    for stage in sorted(durations):
+        values = sorted(durations[stage])
+        stats[stage] = {
+            "count": len(values),
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95),
+        }
+    return stats
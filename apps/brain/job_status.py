@@ -0,0 +1,55 @@
+"""
+Conditional and long-poll job status responses.
+
+A job's status ETag is derived from its status and ``updated_at``, so a
+poller repeating ``If-None-Match`` gets an empty 304 until the job moves.
+With ``wait``, a request whose ETag still matches is held, re-reading only
+the status columns, until the job changes or the wait runs out.
+"""
+
+import time
+
+from django.conf import settings
+
+from .models import ProcessingJob
+
+BRAIN_CONFIG = getattr(settings, 'BRAIN_CONFIG', {})
+LONG_POLL_MAX_SECONDS = BRAIN_CONFIG.get('STATUS_LONG_POLL_MAX_SECONDS', 30)
+LONG_POLL_INTERVAL = BRAIN_CONFIG.get('STATUS_LONG_POLL_INTERVAL', 0.5)
+
+
+def status_etag(shape, status, updated_at):
+    """Strong ETag for a status response shape at a job status and update time."""
+    return f'"{shape}-{status}-{updated_at.strftime("%Y%m%d%H%M%S%f")}"'
+
+
+def wait_seconds_from(value):
+    """Parse a requested long-poll wait, clamped to 0..LONG_POLL_MAX_SECONDS."""
+    try:
+        return max(0.0, min(float(value), LONG_POLL_MAX_SECONDS))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def wait_for_change(job, shape, etag, timeout, interval=None):
+    """
+    Hold until a job's status ETag differs from the given one, or the timeout passes.
+
+    Args:
+        job: ProcessingJob as last read
+        shape: Response shape name used in the ETag
+        etag: ETag the client already has
+        timeout: Seconds to wait at most
+        interval: Seconds between checks (default LONG_POLL_INTERVAL)
+
+    Returns:
+        True if the job changed (reload it), False on timeout
+    """
+    interval = interval or LONG_POLL_INTERVAL
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+        row = ProcessingJob.objects.filter(pk=job.pk).values_list('status', 'updated_at').first()
+        if row is None or status_etag(shape, *row) != etag:
+            return True
+    return False
@@ -0,0 +1,110 @@
+"""
+Job listings shared by the brain API and the dashboard.
+
+Listings are built on one annotated queryset per page: the question count
+comes from a COUNT over the joined question_answers (no per-job count
+query), the large ``processing_metadata`` column is deferred, and pages are
+cut with keyset (cursor) pagination on (created_at, id) rather than OFFSET,
+so deep pages cost the same as the first one.
+
+A cursor is an opaque, URL-safe token encoding the (created_at, id) of the
+last job on the previous page.
+"""
+
+import base64
+from datetime import datetime
+
+from django.db.models import Count, Q
+
+JOB_PAGE_SIZE = 20
+MAX_JOB_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(job):
+    """Encode the keyset position after a job."""
+    raw = f"{job.created_at.isoformat()}|{job.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into (created_at, id)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, job_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(job_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def page_size_from(value, default=JOB_PAGE_SIZE):
+    """Parse a requested page size, clamped to 1..MAX_JOB_PAGE_SIZE."""
+    try:
+        return max(1, min(int(value), MAX_JOB_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return default
+
+
+def annotate_jobs(queryset):
+    """Add qa_count and defer the processing metadata for listing."""
+    return queryset.defer('processing_metadata').annotate(qa_count=Count('question_answers'))
+
+
+def paginate_jobs(queryset, cursor=None, page_size=JOB_PAGE_SIZE):
+    """
+    Get one page of jobs, newest first.
+
+    Args:
+        queryset: Jobs to list (annotated or not)
+        cursor: Cursor from the previous page, or None for the first page
+        page_size: Jobs per page
+
+    Returns:
+        Tuple of (list of jobs, cursor for the next page or None)
+
+    Raises:
+        InvalidCursor: If the cursor cannot be decoded
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        created_at, job_id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=job_id))
+
+    # One extra row tells whether there is a next page
+    jobs = list(queryset[:page_size + 1])
+    if len(jobs) > page_size:
+        jobs = jobs[:page_size]
+        return jobs, encode_cursor(jobs[-1])
+    return jobs, None
+
+
+def serialize_job(job):
+    """
+    Convert a listed job to a dictionary for JSON responses.
+
+    Uses the qa_count annotation when present (see annotate_jobs).
+    """
+    data = {
+        'id': job.id,
+        'document_name': job.document_name,
+        'status': job.status,
+        'language': job.language,
+        'question_type': job.question_type,
+        'created_at': job.created_at.isoformat(),
+        'updated_at': job.updated_at.isoformat(),
+    }
+
+    if job.completed_at:
+        data['completed_at'] = job.completed_at.isoformat()
+
+    if job.status == 'completed':
+        qa_count = getattr(job, 'qa_count', None)
+        data['qa_count'] = qa_count if qa_count is not None else job.get_qa_pairs().count()
+
+    if job.status == 'failed':
+        data['error_message'] = job.error_message
+
+    return data
@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from core.housekeeping import TASKS, format_bytes, run_housekeeping
+
+
+class Command(BaseCommand):
+    help = 'Apply retention policies: expired OTPs, old records and orphaned media files (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--task',
+            action='append',
+            choices=list(TASKS),
+            help='Task to run (repeatable; default: all tasks)',
+        )
+        parser.add_argument('--output', type=str, help='Write the report to this JSON file')
+
+    def handle(self, *args, **options):
+        report = run_housekeeping(options.get('task'))
+
+        for name, result in report.items():
+            if 'error' in result:
+                self.stdout.write(self.style.ERROR(f"✗ {name}: {result['error']}"))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {name}: {result['rows']} rows, {result['files']} files, "
+                f"{format_bytes(result['bytes'])} in {result['seconds']}s"
+            ))
+
+        rows = sum(result['rows'] for result in report.values())
+        files = sum(result['files'] for result in report.values())
+        reclaimed = sum(result['bytes'] for result in report.values())
+        self.stdout.write(f"Reclaimed {rows} rows and {files} files ({format_bytes(reclaimed)})")
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"📄 Report written to {options['output']}"))
@@ -0,0 +1,385 @@
+"""
+HTTP load test for the dashboard endpoints.
+
+Each simulated user logs in (a session is created directly, skipping the OTP
+flow), uploads a document to api_process_document, polls api_job_status until
+the job finishes, starts an exam and walks exam_session question by question
+(or, with --exam-mode api, loads it from api_exam and sends batched answers),
+then opens the exam result, the leaderboard and my_quizzes. Requests go over
+real HTTP with one keep-alive connection per user, either to a running server
+(--base-url, which must share this database) or to an in-process threaded
+WSGI server. Latency percentiles and error rates are reported per endpoint.
+
+Run with --offline to serve uploads with the fake model backend; for an
+external server, start it with BRAIN_LLM_BACKEND=fake instead.
+"""
+
+import http.client
+import json
+import math
+import random
+import secrets
+import string
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+UPLOAD_ENDPOINT = 'api_process_document'
+STATUS_ENDPOINT = 'api_job_status'
+FINISHED_STATUSES = ('completed', 'failed')
+MCQ_OPTIONS = 'ABCD'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class EndpointStats:
+    """Thread-safe latency and error counts per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def report(self, wall_seconds):
+        """Summarize requests, error rate and latency percentiles (ms) per endpoint."""
+        with self._lock:
+            latencies = {endpoint: sorted(values) for endpoint, values in self.latencies.items()}
+            errors = dict(self.errors)
+
+        endpoints = {}
+        for endpoint, values in latencies.items():
+            count = len(values)
+            endpoints[endpoint] = {
+                'requests': count,
+                'errors': errors.get(endpoint, 0),
+                'error_rate': round(errors.get(endpoint, 0) / count, 4),
+                'rps': round(count / wall_seconds, 2) if wall_seconds else 0.0,
+                'p50_ms': round(percentile(values, 50) * 1000, 1),
+                'p95_ms': round(percentile(values, 95) * 1000, 1),
+                'p99_ms': round(percentile(values, 99) * 1000, 1),
+                'max_ms': round(values[-1] * 1000, 1),
+            }
+
+        total = sum(item['requests'] for item in endpoints.values())
+        total_errors = sum(item['errors'] for item in endpoints.values())
+        return {
+            'wall_seconds': round(wall_seconds, 2),
+            'requests': total,
+            'errors': total_errors,
+            'rps': round(total / wall_seconds, 2) if wall_seconds else 0.0,
+            'endpoints': endpoints,
+        }
+
+
+class SimulatedUser:
+    """One logged-in user with a keep-alive HTTP connection"""
+
+    def __init__(self, base_url, session_cookie, stats):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.secure = parts.scheme == 'https'
+        self.stats = stats
+        # An unmasked 32-character secret is accepted both as cookie and as form token
+        self.csrf_token = ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32))
+        self.cookies = {'sessionid': session_cookie, 'csrftoken': self.csrf_token}
+        self.connection = None
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+        self.connection = connection_class(self.host, self.port, timeout=300)
+
+    def request(self, endpoint, method, path, body=None, headers=None, expect=(200,)):
+        """
+        Send one request and record its latency under the endpoint name.
+
+        Returns:
+            Tuple of (status, location header, body bytes); status is 0 on connection errors
+        """
+        headers = {
+            'Cookie': '; '.join(f'{name}={value}' for name, value in self.cookies.items()),
+            **(headers or {}),
+        }
+        if self.connection is None:
+            self._connect()
+
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            status, location = response.status, response.getheader('Location', '')
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            status, location, data = 0, '', b''
+        self.stats.record(endpoint, time.perf_counter() - start, status in expect)
+        return status, location, data
+
+    def post_form(self, endpoint, path, fields, expect=(302,)):
+        body = '&'.join(
+            f'{name}={value}' for name, value in {**fields, 'csrfmiddlewaretoken': self.csrf_token}.items()
+        )
+        return self.request(
+            endpoint, 'POST', path, body=body.encode(),
+            headers={'Content-Type': 'application/x-www-form-urlencoded'}, expect=expect
+        )
+
+    def upload(self, file_name, content, num_questions):
+        """Upload a document; returns (job_id, questions_generated) or (None, 0)."""
+        boundary = f'----sisimpur{secrets.token_hex(8)}'
+        parts = []
+        for name, value in (('language', 'auto'), ('question_type', 'MULTIPLECHOICE'), ('num_questions', num_questions)):
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="document"; filename="{file_name}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n'
+        )
+        parts.append(f'--{boundary}--\r\n'.encode())
+
+        status, _, data = self.request(
+            UPLOAD_ENDPOINT, 'POST', '/app/api/process-document/', body=b''.join(parts),
+            headers={'Content-Type': f'multipart/form-data; boundary={boundary}'}
+        )
+        if status != 200:
+            return None, 0
+        result = json.loads(data)
+        return result.get('job_id'), result.get('questions_generated', 0)
+
+    def wait_for_job(self, job_id, poll_interval, max_polls=120):
+        """Poll api_job_status (status only) until the job finishes; returns the final status."""
+        for _ in range(max_polls):
+            status, _, data = self.request(STATUS_ENDPOINT, 'GET', f'/app/api/job-status/{job_id}/?fields=status')
+            if status == 200:
+                job_status = json.loads(data).get('status')
+                if job_status in FINISHED_STATUSES:
+                    return job_status
+            time.sleep(poll_interval)
+        return None
+
+    def start_exam(self, job_id):
+        """Start an exam for a job; returns the session id or None."""
+        status, location, _ = self.request('start_exam', 'GET', f'/app/exam/start/{job_id}/', expect=(302,))
+        if status != 302 or '/exam/session/' not in location:
+            return None
+        return location.rstrip('/').rsplit('/', 1)[-1]
+
+    def take_exam(self, job_id, num_questions, rng, think_time):
+        """Start an exam for a job and answer every question through the page flow."""
+        session_id = self.start_exam(job_id)
+        if session_id is None:
+            return False
+        session_path = f'/app/exam/session/{session_id}/'
+
+        for index in range(num_questions):
+            status, _, _ = self.request('exam_session', 'GET', session_path)
+            if status != 200:
+                return False
+            time.sleep(think_time * rng.random())
+            action = 'submit' if index == num_questions - 1 else 'next'
+            status, location, _ = self.post_form(
+                'exam_session:answer', session_path, {'answer': rng.choice(MCQ_OPTIONS), 'action': action}
+            )
+            if status != 302 or 'my-quizzes' in location:
+                return False
+
+        self.request('exam_result', 'GET', f'/app/exam/result/{session_id}/')
+        return True
+
+    def take_exam_api(self, job_id, rng, think_time, batch_size):
+        """Start an exam, load it in one request and send answers in batches."""
+        session_id = self.start_exam(job_id)
+        if session_id is None:
+            return False
+        status, _, data = self.request('api_exam', 'GET', f'/app/exam/api/{session_id}/')
+        if status != 200:
+            return False
+
+        questions = json.loads(data)['questions']
+        for start in range(0, len(questions), batch_size):
+            batch = questions[start:start + batch_size]
+            time.sleep(think_time * rng.random() * len(batch))
+            payload = {
+                'answers': [
+                    {'question_id': question['id'], 'answer': rng.choice(MCQ_OPTIONS)} for question in batch
+                ],
+                'current_index': batch[-1]['index'],
+                'submit': start + batch_size >= len(questions),
+            }
+            status, _, _ = self.request(
+                'api_exam_answers', 'POST', f'/app/exam/api/{session_id}/answers/',
+                body=json.dumps(payload).encode(),
+                headers={'Content-Type': 'application/json', 'X-CSRFToken': self.csrf_token}
+            )
+            if status != 200:
+                return False
+
+        self.request('exam_result', 'GET', f'/app/exam/result/{session_id}/')
+        return True
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Load test the upload, job status, exam, leaderboard and my_quizzes endpoints over HTTP'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Number of simulated users')
+        parser.add_argument('--iterations', type=int, default=2, help='Quiz flows per user')
+        parser.add_argument('--uploads', type=int, default=1,
+                            help='Iterations per user that upload a new document (later ones reuse the last quiz)')
+        parser.add_argument('--num-questions', type=int, default=5, help='Questions requested per upload')
+        parser.add_argument('--ramp-up', type=float, default=5.0, help='Seconds over which users start')
+        parser.add_argument('--think-time', type=float, default=0.5, help='Maximum pause before answering, in seconds')
+        parser.add_argument('--exam-mode', choices=['pages', 'api'], default='pages',
+                            help='Take exams page by page or through the single-payload exam API')
+        parser.add_argument('--answer-batch', type=int, default=5, help='Answers per batch in api exam mode')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between job status polls')
+        parser.add_argument('--file', type=str, help='Document to upload (default: a generated text PDF)')
+        parser.add_argument('--base-url', type=str,
+                            help='Running server to test (default: start an in-process server)')
+        parser.add_argument('--offline', action='store_true',
+                            help='Use the offline fake model backend for the in-process server')
+        parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        if options['offline']:
+            from apps.brain.brain_engine.utils.api_utils import use_backend
+            use_backend('fake')
+            if options['base_url']:
+                self.stdout.write(self.style.WARNING(
+                    '--offline only affects this process; start the target server with BRAIN_LLM_BACKEND=fake'
+                ))
+
+        file_name, content = self.load_document(options['file'])
+        server = None
+        base_url = options['base_url']
+        if not base_url:
+            server, base_url = self.start_server()
+
+        self.stdout.write(self.style.SUCCESS(f'🚦 Load testing {base_url} with {options["users"]} users'))
+        stats = EndpointStats()
+        threads = []
+        start = time.perf_counter()
+        try:
+            for number in range(options['users']):
+                user = SimulatedUser(base_url, self.session_cookie(number), stats)
+                thread = threading.Thread(
+                    target=self.run_user, args=(user, number, file_name, content, options),
+                    name=f'loadtest-{number}', daemon=True
+                )
+                threads.append(thread)
+                thread.start()
+                time.sleep(options['ramp_up'] / max(1, options['users']))
+            for thread in threads:
+                thread.join()
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+        report = stats.report(time.perf_counter() - start)
+        report.update(users=options['users'], iterations=options['iterations'], base_url=base_url)
+        self.print_report(report)
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2), encoding='utf-8')
+            self.stdout.write(f'\n📄 Report written to {options["output"]}')
+
+    def run_user(self, user, number, file_name, content, options):
+        rng = random.Random(number)
+        job_id, num_questions = None, 0
+        try:
+            for iteration in range(options['iterations']):
+                if iteration < options['uploads'] or job_id is None:
+                    job_id, num_questions = user.upload(file_name, content, options['num_questions'])
+                    if job_id and user.wait_for_job(job_id, options['poll_interval']) != 'completed':
+                        job_id = None
+
+                if job_id and num_questions:
+                    if options['exam_mode'] == 'api':
+                        user.take_exam_api(job_id, rng, options['think_time'], options['answer_batch'])
+                    else:
+                        user.take_exam(job_id, num_questions, rng, options['think_time'])
+
+                user.request('leaderboard', 'GET', '/app/leaderboard/')
+                user.request('my_quizzes', 'GET', '/app/my-quizzes/')
+        finally:
+            user.close()
+
+    def load_document(self, file_path):
+        if file_path:
+            return Path(file_path).name, Path(file_path).read_bytes()
+
+        from apps.brain.brain_engine.benchmark import build_corpus
+        corpus_dir = Path(tempfile.gettempdir()) / 'sisimpur_loadtest'
+        entry = next(entry for entry in build_corpus(corpus_dir) if entry['name'] == 'text_english.pdf')
+        return entry['name'], Path(entry['path']).read_bytes()
+
+    def session_cookie(self, number):
+        """Log a load test user in and return its session cookie."""
+        user, created = User.objects.get_or_create(
+            username=f'loadtest_user_{number}',
+            defaults={'email': f'loadtest_user_{number}@example.com'}
+        )
+        if created:
+            user.set_unusable_password()
+            user.save()
+
+        client = Client()
+        client.force_login(user)
+        return client.cookies['sessionid'].value
+
+    def start_server(self):
+        """Serve the project on a free local port from a background thread."""
+        from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler, allow_reuse_address=False)
+        server.set_app(get_internal_wsgi_application())
+        threading.Thread(target=server.serve_forever, name='loadtest-server', daemon=True).start()
+        host, port = server.server_address[:2]
+        return server, f'http://{host}:{port}'
+
+    def print_report(self, report):
+        self.stdout.write('')
+        self.stdout.write(
+            f"{'Endpoint':<24} {'Requests':>8} {'Errors':>7} {'Err %':>6} {'RPS':>7} "
+            f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Max ms':>9}"
+        )
+        self.stdout.write('-' * 96)
+        for endpoint, item in sorted(report['endpoints'].items()):
+            line = (
+                f"{endpoint:<24} {item['requests']:>8} {item['errors']:>7} {item['error_rate'] * 100:>6.1f} "
+                f"{item['rps']:>7} {item['p50_ms']:>9} {item['p95_ms']:>9} {item['p99_ms']:>9} {item['max_ms']:>9}"
+            )
+            self.stdout.write(self.style.ERROR(line) if item['errors'] else line)
+        self.stdout.write('-' * 96)
+        self.stdout.write(
+            f"Total: {report['requests']} requests, {report['errors']} errors, "
+            f"{report['rps']} req/s over {report['wall_seconds']}s"
+        )
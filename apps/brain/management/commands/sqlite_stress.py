@@ -0,0 +1,200 @@
+"""
+SQLite write-contention stress test.
+
+Runs the app's two hot write paths from many threads against a scratch
+database file, once with SQLite defaults and once with the project's tuning,
+and reports throughput, "database is locked" failures and latency for each:
+
+- question inserts: a generated job's questions saved row by row
+  (baseline, as the views used to) or in one transaction (tuned)
+- exam answers: a transaction that reads the session and its answer, then
+  writes the answer and the session's position
+
+The tuned run applies SQLITE_CONFIG (core/sqlite.py) and holds the same
+process-wide write lock as serialized_write. The scratch database is
+independent of the project database.
+"""
+
+import json
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from core.sqlite import SQLITE_CONFIG, apply_pragmas, write_lock
+from .loadtest import percentile
+
+# Python's sqlite3 default, which the Django backend also uses
+BASELINE_TIMEOUT_SECONDS = 5.0
+BASELINE_PRAGMAS = {'JOURNAL_MODE': 'DELETE', 'SYNCHRONOUS': 'FULL'}
+
+SCHEMA = """
+CREATE TABLE question (id INTEGER PRIMARY KEY, job_id INTEGER, text TEXT, answer TEXT);
+CREATE TABLE session (id INTEGER PRIMARY KEY, current_index INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE answer (
+    id INTEGER PRIMARY KEY, session_id INTEGER, question_index INTEGER, user_answer TEXT,
+    UNIQUE (session_id, question_index)
+);
+"""
+
+
+def create_database(path, sessions):
+    """Create the scratch schema with a number of exam sessions."""
+    db = sqlite3.connect(path, isolation_level=None)
+    db.executescript(SCHEMA)
+    db.executemany('INSERT INTO session (id) VALUES (?)', [(n,) for n in range(1, sessions + 1)])
+    db.close()
+
+
+def insert_questions(db, job_id, count, tuned):
+    """Save a job's questions: one autocommit per row (baseline) or one transaction (tuned)."""
+    rows = [(job_id, f'Question {n}?', f'Answer {n}') for n in range(count)]
+    if not tuned:
+        for row in rows:
+            db.execute('INSERT INTO question (job_id, text, answer) VALUES (?, ?, ?)', row)
+        return
+    with write_lock:
+        db.execute('BEGIN')
+        try:
+            db.executemany('INSERT INTO question (job_id, text, answer) VALUES (?, ?, ?)', rows)
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+
+def save_answer(db, session_id, question_index, tuned, work_seconds=0.0):
+    """
+    Read a session and its answer, then write the answer and the new position.
+
+    ``work_seconds`` stands in for the request's own work (grading, ORM)
+    between the reads and the writes.
+    """
+    with (write_lock if tuned else nullcontext()):
+        db.execute('BEGIN')
+        try:
+            db.execute('SELECT current_index FROM session WHERE id = ?', (session_id,)).fetchone()
+            existing = db.execute(
+                'SELECT id FROM answer WHERE session_id = ? AND question_index = ?', (session_id, question_index)
+            ).fetchone()
+            time.sleep(work_seconds)
+            if existing:
+                db.execute('UPDATE answer SET user_answer = ? WHERE id = ?', (random.choice('ABCD'), existing[0]))
+            else:
+                db.execute(
+                    'INSERT INTO answer (session_id, question_index, user_answer) VALUES (?, ?, ?)',
+                    (session_id, question_index, random.choice('ABCD'))
+                )
+            db.execute('UPDATE session SET current_index = ? WHERE id = ?', (question_index, session_id))
+            db.execute('COMMIT')
+        except BaseException:
+            if db.in_transaction:
+                db.execute('ROLLBACK')
+            raise
+
+
+def run_stress(path, tuned, threads=8, operations=50, questions=20, work_seconds=0.001, seed=0):
+    """
+    Run the mixed write workload from several threads against one database file.
+
+    Args:
+        path: Scratch database file (created)
+        tuned: Apply SQLITE_CONFIG and serialize writes, or keep SQLite defaults
+        threads: Concurrent writer threads
+        operations: Operations per thread; every fifth saves a job's questions
+        questions: Questions per saved job
+        work_seconds: Simulated request work inside each answer transaction
+        seed: Random seed for the answer choices
+
+    Returns:
+        Dictionary with operations, errors (locked), wall_seconds, ops_per_second and latency percentiles
+    """
+    random.seed(seed)
+    create_database(path, sessions=threads)
+    latencies, errors = [], []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(threads)
+
+    def worker(number):
+        timeout = SQLITE_CONFIG.get('BUSY_TIMEOUT_MS', 0) / 1000 if tuned else BASELINE_TIMEOUT_SECONDS
+        db = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        apply_pragmas(db, SQLITE_CONFIG if tuned else BASELINE_PRAGMAS)
+        start_barrier.wait()
+        for operation in range(operations):
+            started = time.perf_counter()
+            try:
+                if operation % 5 == 0:
+                    insert_questions(db, number * operations + operation, questions, tuned)
+                else:
+                    save_answer(db, number + 1, operation % 10, tuned, work_seconds)
+                ok = True
+            except sqlite3.OperationalError as e:
+                ok = False
+                error = str(e)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                if not ok:
+                    errors.append(error)
+        db.close()
+
+    workers = [threading.Thread(target=worker, args=(number,)) for number in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    wall_seconds = time.perf_counter() - start
+
+    latencies.sort()
+    total = threads * operations
+    return {
+        'mode': 'tuned' if tuned else 'baseline',
+        'operations': total,
+        'errors': len(errors),
+        'locked_errors': sum('locked' in error for error in errors),
+        'wall_seconds': round(wall_seconds, 3),
+        'ops_per_second': round(total / wall_seconds, 1) if wall_seconds else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Stress SQLite with concurrent question inserts and exam answers, default vs tuned settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent writer threads')
+        parser.add_argument('--operations', type=int, default=100, help='Operations per thread')
+        parser.add_argument('--questions', type=int, default=20, help='Questions per saved job')
+        parser.add_argument('--work-ms', type=float, default=1.0,
+                            help='Simulated request work between the reads and writes of an answer, in ms')
+        parser.add_argument('--mode', choices=['both', 'baseline', 'tuned'], default='both')
+        parser.add_argument('--output', type=str, help='Write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        modes = {'both': [False, True], 'baseline': [False], 'tuned': [True]}[options['mode']]
+        results = []
+        with tempfile.TemporaryDirectory(prefix='sisimpur-sqlite-') as directory:
+            for tuned in modes:
+                result = run_stress(
+                    str(Path(directory) / f"{'tuned' if tuned else 'baseline'}.sqlite3"), tuned,
+                    threads=options['threads'], operations=options['operations'], questions=options['questions'],
+                    work_seconds=options['work_ms'] / 1000,
+                )
+                results.append(result)
+                self.stdout.write(
+                    f"{result['mode']:>8}: {result['operations']} ops in {result['wall_seconds']}s "
+                    f"({result['ops_per_second']} ops/s), {result['errors']} errors "
+                    f"({result['locked_errors']} locked), p50 {result['p50_ms']}ms, "
+                    f"p95 {result['p95_ms']}ms, max {result['max_ms']}ms"
+                )
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+            self.stdout.write(self.style.SUCCESS(f"📄 Results written to {options['output']}"))
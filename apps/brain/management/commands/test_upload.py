@@ -16,11 +16,21 @@ class Command(BaseCommand):
             type=str,
             help='Path to test file (optional)',
         )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Use the offline fake model backend instead of Gemini',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('🧠 Testing Brain File Upload Workflow'))
         self.stdout.write('=' * 50)
 
+        if options.get('offline'):
+            from apps.brain.brain_engine.utils.api_utils import use_backend
+            use_backend('fake')
+            self.stdout.write('✓ Using offline fake model backend')
+
         # Create test user
         user, created = User.objects.get_or_create(
             username='test_brain_user',
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils import timezone
 import json
@@ -67,6 +69,10 @@ class ProcessingJob(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Processing Job'
         verbose_name_plural = 'Processing Jobs'
+        indexes = [
+            # A user's jobs, newest first (listings and keyset pagination)
+            models.Index(fields=['user', '-created_at', '-id'], name='brain_job_user_created'),
+        ]
     
     def __str__(self):
         return f"{self.document_name} - {self.get_status_display()}"
@@ -77,6 +83,11 @@ class ProcessingJob(models.Model):
         self.completed_at = timezone.now()
         self.save()
     
+    def record_token_estimate(self, token_estimate):
+        """Save the token forecast (and usage, once known) without touching other fields"""
+        self.processing_metadata = {**(self.processing_metadata or {}), 'token_estimate': token_estimate}
+        self.save(update_fields=['processing_metadata', 'updated_at'])
+    
     def mark_failed(self, error_message):
         """Mark the job as failed with error message"""
         self.status = 'failed'
@@ -88,6 +99,38 @@ class ProcessingJob(models.Model):
         """Get all question-answer pairs for this job"""
         return self.question_answers.all()
 
+    def add_questions(self, qa_items, question_type=None):
+        """
+        Save generated Q&A items for this job with one bulk insert.
+
+        The insert is a single short write transaction, serialized with the
+        other hot write paths on SQLite (see core/sqlite.py).
+
+        Args:
+            qa_items: Question dictionaries from the generated output
+            question_type: Question type to store (default: the job's)
+
+        Returns:
+            List of created QuestionAnswer objects
+        """
+        from core.sqlite import serialized_write
+
+        questions = [
+            QuestionAnswer(
+                job=self,
+                question=qa_item.get('question', ''),
+                answer=qa_item.get('answer', ''),
+                question_type=question_type or self.question_type,
+                options=qa_item.get('options', []),
+                correct_option=qa_item.get('correct_option', ''),
+                confidence_score=qa_item.get('confidence_score'),
+                source_text=qa_item.get('source_text', ''),
+            )
+            for qa_item in qa_items
+        ]
+        with serialized_write():
+            return QuestionAnswer.objects.bulk_create(questions, batch_size=500)
+
 
 class QuestionAnswer(models.Model):
     """Model to store individual question-answer pairs"""
@@ -116,6 +159,10 @@ class QuestionAnswer(models.Model):
         ordering = ['id']
         verbose_name = 'Question Answer'
         verbose_name_plural = 'Question Answers'
+        indexes = [
+            # A job's questions in order
+            models.Index(fields=['job', 'id'], name='brain_qa_job_id'),
+        ]
     
     def __str__(self):
         return f"Q: {self.question[:50]}..."
@@ -186,3 +233,13 @@ class QuestionAnswer(models.Model):
             data['confidence_score'] = self.confidence_score
 
         return data
+
+
+@receiver(post_save, sender=QuestionAnswer)
+@receiver(post_delete, sender=QuestionAnswer)
+def touch_completed_job(sender, instance, origin=None, **kwargs):
+    """Bump a completed job's updated_at when its questions change, so cached results move to a new version"""
+    if origin is not None and not isinstance(origin, QuestionAnswer) and getattr(origin, 'model', None) is not QuestionAnswer:
+        # Deleted along with its job (or user); nothing left to version
+        return
+    ProcessingJob.objects.filter(pk=instance.job_id, status='completed').update(updated_at=timezone.now())
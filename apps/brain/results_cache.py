@@ -0,0 +1,90 @@
+"""
+Versioned caching of serialized job results.
+
+Result payloads (the results API, the JSON download and the dashboard's quiz
+results) only change when a job or its questions change, so each is cached
+as its serialized body under a key made of the payload kind, the job id and
+the job's ``updated_at``. Saving or deleting a question of a completed job
+bumps ``updated_at`` (see the QuestionAnswer signals in models.py), which
+moves every payload of that job to a new key; old entries simply expire.
+
+The same version is sent as the ETag, so a client repeating a request with
+``If-None-Match`` gets a 304 without any question rows being read.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+logger = logging.getLogger("sisimpur.brain.results_cache")
+
+RESULTS_CACHE_CONFIG = getattr(settings, 'RESULTS_CACHE_CONFIG', {})
+TIMEOUT_SECONDS = RESULTS_CACHE_CONFIG.get('TIMEOUT_SECONDS', 60 * 60 * 24)
+
+
+def job_version(job):
+    """Version string of a job's results: its id and last update time."""
+    return f"{job.pk}-{job.updated_at.strftime('%Y%m%d%H%M%S%f')}"
+
+
+def make_etag(kind, job):
+    """Strong ETag for one kind of payload of a job."""
+    return f'"{kind}-{job_version(job)}"'
+
+
+def is_not_modified(request, etag):
+    """Check whether the request's If-None-Match already covers the ETag."""
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or any(tag.removeprefix('W/') == etag for tag in etags)
+
+
+def get_cached(kind, job, build):
+    """
+    Get a job's payload from cache, building and storing it on a miss.
+
+    Args:
+        kind: Payload name, part of the cache key
+        job: ProcessingJob the payload belongs to
+        build: Callable returning the payload (anything the cache can pickle)
+
+    Returns:
+        The cached or freshly built payload
+    """
+    key = f"results:{kind}:{job_version(job)}"
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        cache.set(key, payload, TIMEOUT_SECONDS)
+        logger.debug(f"Cached {kind} payload for job {job.pk}")
+    return payload
+
+
+def cached_response(request, kind, job, build, content_type='application/json'):
+    """
+    Respond with a cached payload body, or 304 when the client's copy is current.
+
+    Args:
+        request: The HTTP request
+        kind: Payload name
+        job: ProcessingJob the payload belongs to
+        build: Callable returning the serialized body (str)
+        content_type: Content type of the body
+
+    Returns:
+        HttpResponse carrying the ETag
+    """
+    etag = make_etag(kind, job)
+    if is_not_modified(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(get_cached(kind, job, build), content_type=content_type)
+    response['ETag'] = etag
+    # Private to the owner, and always revalidated with the ETag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.brain.brain_engine.utils import api_utils
+from apps.brain.brain_engine.utils.api_utils import (
+    AsyncRateLimitedAPI,
+    RateLimitedAPI,
+    RequestTimeout,
+)
+
+
+@mock.patch.object(api_utils, "RATE_LIMIT_BATCH_SIZE", 100)
+@mock.patch.dict(api_utils.REQUEST_TIMEOUTS, {"ocr": 0.2})
+class RequestDeadlineTest(SimpleTestCase):
+    """Test cases for per-task deadlines and hedged requests"""
+
+    def test_sync_call_times_out(self):
+        """Test that a hung call raises RequestTimeout instead of stalling"""
+        api = RateLimitedAPI()
+        release = threading.Event()
+
+        with self.assertRaises(RequestTimeout):
+            api.with_rate_limit(release.wait, 5, task="ocr")
+        release.set()
+
+    def test_hung_call_does_not_starve_later_calls(self):
+        """Test that a timed-out call keeps only its own slot and later calls still run"""
+        api = RateLimitedAPI(max_concurrency=2)
+        release = threading.Event()
+
+        with self.assertRaises(RequestTimeout):
+            api.with_rate_limit(release.wait, 5, task="ocr")
+        self.assertEqual(api.abandoned, 1)
+
+        for _ in range(5):
+            self.assertEqual(api.with_rate_limit(lambda: "ok", task="ocr"), "ok")
+        release.set()
+
+    def test_deadline_starts_when_the_call_runs(self):
+        """Test that time spent waiting for a free slot does not count against the deadline"""
+        api = RateLimitedAPI(max_concurrency=1)
+        first = threading.Thread(target=api.with_rate_limit, args=(time.sleep, 0.18), kwargs={"task": "ocr"})
+        first.start()
+        time.sleep(0.02)
+
+        def call():
+            time.sleep(0.15)
+            return "ok"
+
+        start = time.monotonic()
+        self.assertEqual(api.with_rate_limit(call, task="ocr"), "ok")
+        self.assertGreater(time.monotonic() - start, 0.25)
+        first.join()
+
+    def test_async_call_times_out(self):
+        """Test that a hung async call raises RequestTimeout"""
+        api = AsyncRateLimitedAPI()
+
+        with self.assertRaises(RequestTimeout):
+            asyncio.run(api.with_rate_limit(asyncio.sleep, 5, task="ocr"))
+
+    def test_calls_without_task_have_no_deadline(self):
+        """Test that calls without a task type keep the old unbounded behaviour"""
+        api = RateLimitedAPI()
+        self.assertEqual(api.with_rate_limit(lambda: "ok"), "ok")
+
+    @mock.patch.object(api_utils, "HEDGE_REQUESTS", True)
+    def test_slow_call_is_hedged(self):
+        """Test that a call past the observed p95 is duplicated and the fastest wins"""
+        api = RateLimitedAPI()
+        api.latency.min_samples = 1
+        api.latency.record("ocr", 0.01)
+        delays = iter([1.0, 0.0])
+
+        def call():
+            time.sleep(next(delays))
+            return threading.current_thread().name
+
+        start = time.monotonic()
+        api.with_rate_limit(call, task="ocr")
+
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual(api.request_count, 2)
+
+    @mock.patch.object(api_utils, "HEDGE_REQUESTS", True)
+    def test_hedging_respects_rate_limit_budget(self):
+        """Test that no hedge is sent when the rate-limit batch is used up"""
+        api = RateLimitedAPI()
+        api.latency.min_samples = 1
+        api.latency.record("ocr", 0.01)
+
+        with mock.patch.object(api_utils, "RATE_LIMIT_BATCH_SIZE", 2):
+            api.request_count = 0
+            api.last_cooldown = time.time()
+            calls = []
+
+            def call():
+                calls.append(1)
+                time.sleep(0.05)
+                return "ok"
+
+            self.assertEqual(api.with_rate_limit(call, task="ocr"), "ok")
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,76 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+from google.api_core.exceptions import ResourceExhausted
+
+from apps.brain.brain_engine.generators.qa_generator import QAGenerator
+from apps.brain.brain_engine.utils import api_utils
+from apps.brain.brain_engine.utils.api_utils import AsyncRateLimitedAPI
+
+
+def _response(text):
+    return mock.Mock(text=text)
+
+
+@mock.patch.object(api_utils, "RATE_LIMIT_BATCH_SIZE", 100)
+class AsyncRateLimitedAPITest(SimpleTestCase):
+    """Test cases for the asyncio API client"""
+
+    def test_retries_after_resource_exhausted(self):
+        """Test that rate-limit errors are retried without blocking the loop"""
+        api = AsyncRateLimitedAPI(max_concurrency=2)
+        call = mock.AsyncMock(side_effect=[ResourceExhausted("quota"), "ok"])
+
+        with mock.patch("apps.brain.brain_engine.utils.api_utils.asyncio.sleep", mock.AsyncMock()) as sleep:
+            result = asyncio.run(api.with_rate_limit(call, "prompt"))
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(call.await_count, 2)
+        sleep.assert_awaited_once()
+
+    def test_concurrency_is_capped(self):
+        """Test that no more than max_concurrency calls are in flight"""
+        api = AsyncRateLimitedAPI(max_concurrency=2)
+        in_flight = 0
+        peak = 0
+
+        async def call():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        async def run():
+            await asyncio.gather(*[api.with_rate_limit(call) for _ in range(6)])
+
+        asyncio.run(run())
+        self.assertEqual(peak, 2)
+
+
+class AsyncQAGeneratorTest(SimpleTestCase):
+    """Test cases for async Q&A generation"""
+
+    def test_generate_async_keeps_chunk_order(self):
+        """Test that concurrent chunk generation returns pairs in chunk order"""
+        generator = QAGenerator(language="english")
+        text = " ".join(f"word{i}" for i in range(3000))
+
+        async def fake_generate(prompt, model_name=None):
+            # Finish later chunks first to exercise ordering
+            chunk_index = 0 if "word0 " in prompt else 1
+            await asyncio.sleep(0.01 * (1 - chunk_index))
+            return _response(json.dumps({"questions": [
+                {"question": f"Q{chunk_index}", "answer": "A"}
+            ]}))
+
+        with mock.patch(
+            "apps.brain.brain_engine.generators.qa_generator.async_api.generate_content",
+            side_effect=fake_generate,
+        ):
+            qa_pairs = asyncio.run(generator.generate_async(text, 2))
+
+        self.assertEqual(generator.token_usage["calls"], len(generator._plan_chunks(text, 2)))
+        self.assertEqual(qa_pairs[0]["question"], "Q0")
@@ -0,0 +1,65 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+from PIL import Image
+
+from apps.brain.brain_engine import benchmark
+from apps.brain.brain_engine.benchmark import (
+    BENGALI_PARAGRAPH,
+    CORPUS,
+    ENGLISH_PARAGRAPH,
+    build_corpus,
+    run_level,
+)
+from apps.brain.brain_engine.config import QA_GEMINI_MODEL
+from apps.brain.brain_engine.utils import api_utils, file_utils
+from apps.brain.brain_engine.utils.llm_backends import FakeGenerativeModel
+
+
+class BenchmarkTest(SimpleTestCase):
+    """Test cases for the pipeline benchmark"""
+
+    @mock.patch.object(benchmark, "find_bengali_font", return_value="/fonts/NotoSansBengali-Regular.ttf")
+    @mock.patch.object(benchmark, "_page_image", side_effect=lambda *args: Image.new("RGB", (62, 88), "white"))
+    def test_build_corpus_writes_every_document(self, page_image, find_font):
+        """Test that the fixed corpus is generated once and reused, Bengali pages with the Bengali font"""
+        with tempfile.TemporaryDirectory() as tmp:
+            entries = build_corpus(Path(tmp))
+            self.assertEqual(len(entries), len(CORPUS))
+            self.assertTrue(all(Path(entry["path"]).exists() for entry in entries))
+            self.assertEqual(build_corpus(Path(tmp)), entries)
+
+        fonts = {call.args[0][:4]: call.args[2] for call in page_image.call_args_list}
+        self.assertEqual(fonts[BENGALI_PARAGRAPH[:4]], "/fonts/NotoSansBengali-Regular.ttf")
+        self.assertIsNone(fonts[ENGLISH_PARAGRAPH[:4]])
+
+    @mock.patch.object(benchmark, "find_bengali_font", return_value=None)
+    def test_bengali_pages_are_skipped_without_a_font(self, find_font):
+        """Test that Bengali page images are left out rather than rendered as boxes"""
+        with tempfile.TemporaryDirectory() as tmp:
+            names = [entry["name"] for entry in build_corpus(Path(tmp))]
+
+        self.assertNotIn("scanned_bengali.pdf", names)
+        self.assertNotIn("image_bengali.png", names)
+        self.assertIn("scanned_english.pdf", names)
+
+    @mock.patch.object(api_utils, "RATE_LIMIT_BATCH_SIZE", 100)
+    def test_run_level_reports_throughput_and_stages(self):
+        """Test that a level reports docs/min, LLM calls and per-stage times offline"""
+        fake = FakeGenerativeModel(QA_GEMINI_MODEL, {"LATENCY": {}})
+
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.dict(api_utils.api.models_cache, {QA_GEMINI_MODEL: fake}):
+            corpus = [entry for entry in build_corpus(Path(tmp)) if entry["kind"] == "text_pdf"]
+            # Keep extracted text out of the real media/brain/temp_extracts
+            with mock.patch.object(file_utils, "TEMP_DIR", Path(tmp)), \
+                    mock.patch("apps.brain.brain_engine.processor.save_qa_pairs", return_value="out.json"):
+                result = run_level(corpus, concurrency=2, num_questions=2)
+
+        self.assertEqual(result["failures"], 0)
+        self.assertGreater(result["docs_per_minute"], 0)
+        self.assertGreaterEqual(result["llm_calls_per_doc"], 1)
+        self.assertIn("generation.chunk", result["stages"])
+        self.assertIn("p95_ms", result["stages"]["detection"])
@@ -0,0 +1,57 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from brain_cli import BatchProgress, collect_batch_files
+
+
+class BatchIngestionTest(SimpleTestCase):
+    """Test cases for the brain_cli batch mode"""
+
+    def test_collect_from_directory(self):
+        """Test that a directory is searched recursively for supported documents"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "nested").mkdir()
+            for name in ("a.pdf", "nested/b.PNG", "notes.txt", "readme.md"):
+                (root / name).write_text("x")
+
+            files = collect_batch_files(root)
+
+        self.assertEqual(
+            [Path(f).name for f in files], ["a.pdf", "b.PNG", "notes.txt"]
+        )
+
+    def test_collect_from_manifest(self):
+        """Test that line and JSON manifests resolve paths relative to the manifest"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp).resolve()
+            (root / "lines.txt").write_text("# school A\nfirst.pdf\n\n/abs/second.pdf\n")
+            (root / "list.json").write_text(json.dumps(["docs/third.png"]))
+
+            self.assertEqual(
+                collect_batch_files(root / "lines.txt"),
+                [str(root / "first.pdf"), "/abs/second.pdf"],
+            )
+            self.assertEqual(collect_batch_files(root / "list.json"), [str(root / "docs" / "third.png")])
+
+    def test_progress_resumes_only_unchanged_completed_files(self):
+        """Test that completed files are skipped on re-run unless they changed, and failures are retried"""
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            done, failed = root / "done.pdf", root / "failed.pdf"
+            done.write_text("x")
+            failed.write_text("x")
+
+            progress = BatchProgress(root / "progress.json")
+            progress.record(str(done), status="completed", job_id=1, questions=5)
+            progress.record(str(failed), status="failed", job_id=2, error="boom")
+
+            resumed = BatchProgress(root / "progress.json")
+            self.assertTrue(resumed.is_done(str(done)))
+            self.assertFalse(resumed.is_done(str(failed)))
+
+            done.write_text("changed")
+            self.assertFalse(resumed.is_done(str(done)))
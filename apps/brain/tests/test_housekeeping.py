@@ -0,0 +1,141 @@
+import io
+import os
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.authentication.models import EmailOTP, OTPRateLimit
+from apps.brain.models import ProcessingJob
+from apps.dashboard.models import WebhookOutbox
+from core import housekeeping
+from core.sqlite import delete_in_batches
+
+
+def backdate(model, days, **filters):
+    """Move auto_now/auto_now_add timestamps into the past"""
+    past = timezone.now() - timedelta(days=days)
+    fields = {field: past for field in ('created_at', 'last_attempt') if hasattr(model, field)}
+    model.objects.filter(**filters).update(**fields)
+
+
+class HousekeepingRowsTest(TestCase):
+    """Test cases for the row retention policies"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('learner')
+
+    def test_deletes_in_bounded_batches(self):
+        """Test that a large delete is split into one statement per batch"""
+        WebhookOutbox.objects.bulk_create([
+            WebhookOutbox(webhook_url='https://discord.test', event_type='e', title='t') for _ in range(7)
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted = delete_in_batches(WebhookOutbox.objects.all(), batch_size=3)
+
+        self.assertEqual(deleted, 7)
+        self.assertEqual(sum(query['sql'].startswith('DELETE') for query in queries), 3)
+
+    def test_expired_otps_and_old_rate_limits(self):
+        """Test that expired codes and idle or passed rate limit records are removed"""
+        now = timezone.now()
+        expired = EmailOTP.objects.create(user=self.user, email='a@gmail.com', otp_hash='x', expires_at=now - timedelta(minutes=1))
+        valid = EmailOTP.objects.create(user=self.user, email='a@gmail.com', otp_hash='y', expires_at=now + timedelta(minutes=5))
+        OTPRateLimit.objects.create(email='idle@gmail.com', ip_address='10.0.0.1')
+        OTPRateLimit.objects.create(
+            email='passed@gmail.com', ip_address='10.0.0.2', is_blocked=True, blocked_until=now - timedelta(days=8)
+        )
+        OTPRateLimit.objects.create(
+            email='blocked@gmail.com', ip_address='10.0.0.3', is_blocked=True, blocked_until=now + timedelta(hours=1)
+        )
+        OTPRateLimit.objects.create(email='recent@gmail.com', ip_address='10.0.0.4')
+        backdate(OTPRateLimit, 8, email__in=['idle@gmail.com', 'passed@gmail.com', 'blocked@gmail.com'])
+
+        report = housekeeping.run_housekeeping(['expired_otps', 'rate_limits'])
+
+        self.assertEqual((report['expired_otps']['rows'], report['rate_limits']['rows']), (1, 2))
+        self.assertEqual(list(EmailOTP.objects.values_list('pk', flat=True)), [valid.pk])
+        self.assertFalse(EmailOTP.objects.filter(pk=expired.pk).exists())
+        self.assertEqual(
+            sorted(OTPRateLimit.objects.values_list('email', flat=True)), ['blocked@gmail.com', 'recent@gmail.com']
+        )
+
+    def test_finished_webhook_events(self):
+        """Test that old finished events are removed and pending or recent ones kept"""
+        for status in ('sent', 'failed', 'pending'):
+            WebhookOutbox.objects.create(webhook_url='https://discord.test', event_type=status, title=status, status=status)
+        backdate(WebhookOutbox, 30)
+        WebhookOutbox.objects.create(webhook_url='https://discord.test', event_type='new', title='new', status='sent')
+
+        report = housekeeping.run_housekeeping(['webhook_outbox'])
+
+        self.assertEqual(report['webhook_outbox']['rows'], 2)
+        self.assertEqual(sorted(WebhookOutbox.objects.values_list('title', flat=True)), ['new', 'pending'])
+
+    @mock.patch.dict(housekeeping.TASKS, {'expired_otps': mock.Mock(side_effect=RuntimeError('boom'))})
+    def test_failed_task_does_not_stop_the_run(self):
+        """Test that a failing task is reported and the others still run"""
+        report = housekeeping.run_housekeeping(['expired_otps', 'rate_limits'])
+
+        self.assertEqual(report['expired_otps']['error'], 'boom')
+        self.assertNotIn('error', report['rate_limits'])
+
+
+class HousekeepingFilesTest(TestCase):
+    """Test cases for removing orphaned media files"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.media = Path(directory.name)
+        self.temp_dir = self.media / 'brain' / 'temp_extracts'
+        self.output_dir = self.media / 'brain' / 'qa_outputs'
+        self.temp_dir.mkdir(parents=True)
+        self.output_dir.mkdir(parents=True)
+        settings = override_settings(MEDIA_ROOT=self.media, BRAIN_TEMP_DIR=self.temp_dir, BRAIN_OUTPUT_DIR=self.output_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def write(self, path, size, age_days):
+        path.write_bytes(b'x' * size)
+        mtime = time.time() - age_days * 86400
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_orphans_past_retention_are_removed(self):
+        """Test that only old files no job references are removed, and their size is reported"""
+        ProcessingJob.objects.create(
+            user=User.objects.create_user('learner'), document_name='doc.pdf',
+            output_file='brain/qa_outputs/1_results.json',
+        )
+        referenced = self.write(self.output_dir / '1_results.json', 100, age_days=30)
+        orphan = self.write(self.output_dir / 'doc_qa_20250101_120000.json', 300, age_days=30)
+        fresh = self.write(self.output_dir / 'doc_qa_new.json', 50, age_days=0)
+        old_text = self.write(self.temp_dir / 'doc_20250101_120000.txt', 200, age_days=2)
+        new_text = self.write(self.temp_dir / 'doc_new.txt', 200, age_days=0)
+
+        report = housekeeping.run_housekeeping(['temp_extracts', 'qa_outputs'])
+
+        self.assertEqual(report['qa_outputs'], {**report['qa_outputs'], 'files': 1, 'bytes': 300})
+        self.assertEqual(report['temp_extracts'], {**report['temp_extracts'], 'files': 1, 'bytes': 200})
+        self.assertTrue(referenced.exists() and fresh.exists() and new_text.exists())
+        self.assertFalse(orphan.exists() or old_text.exists())
+
+    def test_command_reports_reclaimed_space(self):
+        """Test that the management command prints a total of what it reclaimed"""
+        self.write(self.temp_dir / 'doc_20250101_120000.txt', 2048, age_days=2)
+        out = io.StringIO()
+
+        call_command('housekeeping', stdout=out)
+
+        self.assertIn('temp_extracts: 0 rows, 1 files, 2.0 KB', out.getvalue())
+        self.assertIn('Reclaimed 0 rows and 1 files (2.0 KB)', out.getvalue())
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.brain.job_status import wait_seconds_from
+from apps.brain.models import ProcessingJob, QuestionAnswer
+
+
+@override_settings(COMING_SOON=False)
+class JobStatusTest(TestCase):
+    """Test cases for conditional and long-poll job status responses"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('poller')
+        self.client.force_login(self.user)
+        self.job = ProcessingJob.objects.create(user=self.user, document_name='doc.pdf', status='processing')
+        self.url = reverse('brain:job_status', args=[self.job.id])
+
+    def test_status_only_shape(self):
+        """Test that fields=status leaves out the questions of a completed job"""
+        QuestionAnswer.objects.create(job=self.job, question='Q?', answer='A', question_type='SHORT')
+        self.job.mark_completed()
+
+        status_only = self.client.get(self.url, {'fields': 'status'})
+        self.assertEqual(status_only.json()['status'], 'completed')
+        self.assertNotIn('questions', status_only.json())
+
+        full = self.client.get(self.url)
+        self.assertEqual(full.json()['qa_count'], 1)
+        self.assertNotEqual(full['ETag'], status_only['ETag'])
+
+    def test_unchanged_job_gets_304(self):
+        """Test that a matching If-None-Match gets an empty 304 until the status changes"""
+        etag = self.client.get(self.url, {'fields': 'status'})['ETag']
+
+        response = self.client.get(self.url, {'fields': 'status'}, headers={'if_none_match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.job.mark_completed()
+        response = self.client.get(self.url, {'fields': 'status'}, headers={'if_none_match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_long_poll_returns_on_change(self):
+        """Test that a held request answers as soon as the job changes"""
+        etag = self.client.get(self.url, {'fields': 'status'})['ETag']
+
+        def complete_job(seconds):
+            self.job.mark_completed()
+
+        with mock.patch('apps.brain.job_status.time.sleep', side_effect=complete_job) as sleep:
+            response = self.client.get(self.url, {'fields': 'status', 'wait': 20}, headers={'if_none_match': etag})
+
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'completed')
+
+    def test_long_poll_times_out_with_304(self):
+        """Test that a held request for an unchanged job ends with 304 after the wait"""
+        etag = self.client.get(self.url, {'fields': 'status'})['ETag']
+        response = self.client.get(self.url, {'fields': 'status', 'wait': 0.05}, headers={'if_none_match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_wait_is_clamped(self):
+        """Test parsing of the requested wait"""
+        self.assertEqual(wait_seconds_from('5'), 5.0)
+        self.assertEqual(wait_seconds_from('3600'), 30)
+        self.assertEqual(wait_seconds_from('-1'), 0.0)
+        self.assertEqual(wait_seconds_from('soon'), 0.0)
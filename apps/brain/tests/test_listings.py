@@ -0,0 +1,94 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.brain.listings import InvalidCursor, decode_cursor, paginate_jobs
+from apps.brain.models import ProcessingJob, QuestionAnswer
+
+
+def create_jobs(user, count, questions=2):
+    """Create completed jobs with a few questions each"""
+    jobs = []
+    for number in range(count):
+        job = ProcessingJob.objects.create(user=user, document_name=f'doc{number}.pdf', status='completed')
+        QuestionAnswer.objects.bulk_create([
+            QuestionAnswer(job=job, question=f'Q{i}', answer='A', question_type='SHORT') for i in range(questions)
+        ])
+        jobs.append(job)
+    return jobs
+
+
+class KeysetPaginationTest(TestCase):
+    """Test cases for cursor pagination of job listings"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('lister')
+
+    def test_pages_cover_every_job_once_with_tied_timestamps(self):
+        """Test that walking the cursors returns each job once, newest first, even with equal created_at"""
+        jobs = create_jobs(self.user, 25, questions=0)
+        ProcessingJob.objects.filter(id__in=[job.id for job in jobs[5:15]]).update(created_at=timezone.now())
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = paginate_jobs(ProcessingJob.objects.filter(user=self.user), cursor, page_size=7)
+            seen.extend(job.id for job in page)
+            if cursor is None:
+                break
+
+        expected = list(ProcessingJob.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor')
+
+
+@override_settings(COMING_SOON=False)
+class JobListingViewTest(TestCase):
+    """Test cases for the job listing endpoints"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('lister', is_staff=True)
+        self.client.force_login(self.user)
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_list_jobs_query_budget_is_flat(self):
+        """Test that list_jobs costs the same queries for 3 and 40 jobs and reports question counts"""
+        create_jobs(self.user, 3)
+        small, data = self.count_queries(reverse('brain:list_jobs'))
+        self.assertEqual([job['qa_count'] for job in data['jobs']], [2, 2, 2])
+        self.assertIsNone(data['next_cursor'])
+
+        create_jobs(self.user, 37)
+        large, data = self.count_queries(reverse('brain:list_jobs'))
+        self.assertEqual(large, small)
+        self.assertEqual(len(data['jobs']), 20)
+        self.assertLessEqual(large, 3)
+
+        _, second = self.count_queries(reverse('brain:list_jobs'), cursor=data['next_cursor'], page_size=100)
+        self.assertEqual(len(second['jobs']), 20)
+
+    def test_list_jobs_rejects_bad_cursor(self):
+        """Test that list_jobs answers 400 for an invalid cursor"""
+        response = self.client.get(reverse('brain:list_jobs'), {'cursor': '!!!'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_dev_list_jobs_query_budget_is_flat(self):
+        """Test that dev_list_jobs costs the same queries for 2 and 30 jobs"""
+        create_jobs(self.user, 2)
+        small, _ = self.count_queries(reverse('brain:dev_jobs'))
+        create_jobs(self.user, 28)
+        large, data = self.count_queries(reverse('brain:dev_jobs'))
+        self.assertEqual(large, small)
+        self.assertEqual(data['total'], 20)
+        self.assertEqual(data['jobs'][0]['questions_count'], 2)
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+from google.api_core.exceptions import ResourceExhausted
+from PIL import Image
+
+from apps.brain.brain_engine.generators.qa_generator import QAGenerator
+from apps.brain.brain_engine.utils import api_utils
+from apps.brain.brain_engine.utils.api_utils import RateLimitedAPI
+from apps.brain.brain_engine.utils.llm_backends import (
+    Cassette,
+    FakeGenerativeModel,
+    create_model,
+    prompt_fingerprint,
+)
+
+NO_LATENCY = {"LATENCY": {}}
+
+
+class FakeBackendTest(SimpleTestCase):
+    """Test cases for the offline fake model backend"""
+
+    def test_generation_returns_requested_question_json(self):
+        """Test that generation prompts get valid question JSON of the requested size"""
+        model = FakeGenerativeModel("models/x", NO_LATENCY)
+        prompt = "Generate exactly 3 multiple choice questions with 4 options each.\\nContext: rivers"
+        data = json.loads(model.generate_content(prompt).text)
+
+        self.assertEqual(len(data["questions"]), 3)
+        self.assertEqual(len(data["questions"][0]["options"]), 4)
+        self.assertIn(data["questions"][0]["correct_option"], "ABCD")
+
+    def test_responses_are_deterministic(self):
+        """Test that the same prompt always gets the same response"""
+        first = FakeGenerativeModel("models/x", NO_LATENCY).generate_content("exactly 2 questions").text
+        second = FakeGenerativeModel("models/x", NO_LATENCY).generate_content("exactly 2 questions").text
+        self.assertEqual(first, second)
+
+    def test_bengali_ocr_returns_bengali_text(self):
+        """Test that Bengali OCR prompts get Bengali text"""
+        model = FakeGenerativeModel("models/x", NO_LATENCY)
+        text = asyncio.run(model.generate_content_async(["এই ছবি থেকে সমস্ত টেক্সট", Image.new("RGB", (4, 4))])).text
+        self.assertRegex(text, "[ঀ-৿]")
+
+    def test_error_injection(self):
+        """Test that configured error rates raise the corresponding exceptions"""
+        model = FakeGenerativeModel("models/x", {**NO_LATENCY, "RESOURCE_EXHAUSTED_RATE": 1.0})
+        with self.assertRaises(ResourceExhausted):
+            model.generate_content("exactly 1 questions")
+
+    def test_cassette_replay(self):
+        """Test that recorded responses are replayed by prompt fingerprint"""
+        with tempfile.TemporaryDirectory() as tmp:
+            cassette = Cassette(Path(tmp) / "cassette.json")
+            cassette.record(prompt_fingerprint("hello"), "recorded answer")
+
+            model = FakeGenerativeModel("models/x", NO_LATENCY, cassette=Cassette(cassette.path))
+            self.assertEqual(model.generate_content("hello").text, "recorded answer")
+
+    @mock.patch.object(api_utils, "RATE_LIMIT_BATCH_SIZE", 100)
+    def test_qa_generator_runs_offline(self):
+        """Test that the generator produces questions end to end on the fake backend"""
+        api = RateLimitedAPI(backend="fake")
+        api.models_cache["models/gemini-1.5-flash"] = FakeGenerativeModel("models/gemini-1.5-flash", NO_LATENCY)
+
+        with mock.patch("apps.brain.brain_engine.generators.qa_generator.api", api):
+            qa_pairs = QAGenerator(language="english").generate("Rivers carry water to the sea. " * 20, 4)
+
+        self.assertEqual(len(qa_pairs), 4)
+
+    def test_unknown_backend_is_rejected(self):
+        """Test that a misconfigured backend name fails loudly"""
+        with self.assertRaises(ValueError):
+            create_model("models/x", "nonexistent")
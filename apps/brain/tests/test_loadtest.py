@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+
+from apps.brain.management.commands.loadtest import EndpointStats, percentile
+
+
+class LoadTestReportTest(SimpleTestCase):
+    """Test cases for the load test report"""
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles, including the empty case"""
+        values = [0.1 * n for n in range(1, 11)]
+        self.assertAlmostEqual(percentile(values, 50), 0.5)
+        self.assertAlmostEqual(percentile(values, 95), 1.0)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_report_per_endpoint_error_rates(self):
+        """Test that requests, errors and latency are summarized per endpoint"""
+        stats = EndpointStats()
+        for ms in (10, 20, 30, 40):
+            stats.record('leaderboard', ms / 1000, ok=True)
+        stats.record('exam_session', 0.05, ok=True)
+        stats.record('exam_session', 0.5, ok=False)
+
+        report = stats.report(wall_seconds=2.0)
+
+        self.assertEqual(report['requests'], 6)
+        self.assertEqual(report['errors'], 1)
+        self.assertEqual(report['rps'], 3.0)
+        self.assertEqual(report['endpoints']['leaderboard']['p50_ms'], 20.0)
+        self.assertEqual(report['endpoints']['leaderboard']['error_rate'], 0)
+        self.assertEqual(report['endpoints']['exam_session']['error_rate'], 0.5)
+        self.assertEqual(report['endpoints']['exam_session']['max_ms'], 500.0)
@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from google.api_core.exceptions import ResourceExhausted
+from PIL import Image
+
+from apps.brain.brain_engine.utils import api_utils
+from apps.brain.brain_engine.utils.api_utils import RateLimitedAPI
+from apps.brain.brain_engine.utils.metrics import LLMMetrics, llm_metrics, prompt_size
+
+
+class LLMMetricsTest(SimpleTestCase):
+    """Test cases for LLM call metrics"""
+
+    def test_prompt_size_counts_chars_and_image_bytes(self):
+        """Test that prompts are measured without encoding images"""
+        img = Image.new("RGB", (10, 20))
+        self.assertEqual(prompt_size(["abc", img]), (3, 600))
+        self.assertEqual(prompt_size("hello"), (5, 0))
+
+    def test_job_scope_collects_rollup(self):
+        """Test that calls inside a job scope are rolled up by task"""
+        metrics = LLMMetrics()
+        with metrics.job_scope() as rollup:
+            metrics.record("m", "ocr", "abc", latency=1.5, retries=1, sleep_seconds=2.0)
+            metrics.record("m", "generate", "abcd", latency=0.5, outcome="timeout")
+        metrics.record("m", "ocr", "outside", latency=1.0)
+
+        summary = rollup.summary()
+        self.assertEqual(summary["calls"], 2)
+        self.assertEqual(summary["retries"], 1)
+        self.assertEqual(summary["sleep_seconds"], 2.0)
+        self.assertEqual(summary["outcomes"], {"success": 1, "timeout": 1})
+        self.assertEqual(summary["by_task"]["ocr"]["prompt_chars"], 3)
+
+    def test_prometheus_rendering(self):
+        """Test that aggregates render as Prometheus counters and histograms"""
+        metrics = LLMMetrics()
+        metrics.record("models/x", "ocr", "abc", latency=1.5)
+        text = metrics.render_prometheus()
+
+        self.assertIn('sisimpur_llm_calls_total{model="models/x",task="ocr",outcome="success"} 1', text)
+        self.assertIn('sisimpur_llm_call_latency_seconds_bucket{model="models/x",task="ocr",le="1"} 0', text)
+        self.assertIn('sisimpur_llm_call_latency_seconds_bucket{model="models/x",task="ocr",le="2"} 1', text)
+        self.assertIn('sisimpur_llm_call_latency_seconds_count{model="models/x",task="ocr"} 1', text)
+
+    @mock.patch.object(api_utils, "INITIAL_RETRY_DELAY", 0)
+    def test_generate_content_records_retries_and_outcome(self):
+        """Test that every generate_content call records one metrics entry"""
+        api = RateLimitedAPI()
+        model = mock.Mock()
+        model.generate_content.side_effect = [ResourceExhausted("quota"), mock.Mock(text="ok")]
+
+        with mock.patch.object(api, "get_model", return_value=model), \
+                llm_metrics.job_scope() as rollup:
+            api.generate_content("prompt", model_name="models/x", task="generate")
+
+        summary = rollup.summary()
+        self.assertEqual(summary["calls"], 1)
+        self.assertEqual(summary["retries"], 1)
+        self.assertEqual(summary["outcomes"], {"success": 1})
+
+
+class MetricsEndpointTest(TestCase):
+    """Test cases for the /metrics endpoint"""
+
+    def test_metrics_endpoint_serves_prometheus_text(self):
+        """Test that /metrics is served as Prometheus text to staff users"""
+        self.client.force_login(User.objects.create_user("ops", is_staff=True))
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(b"# TYPE sisimpur_llm_calls_total counter", response.content)
+
+    def test_metrics_endpoint_requires_staff_or_token(self):
+        """Test that anonymous users and non-staff users are refused, and the bearer token is accepted"""
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+        with override_settings(BRAIN_CONFIG={**settings.BRAIN_CONFIG, "METRICS_TOKEN": "scrape-secret"}):
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-secret").status_code, 200)
+
+            self.client.force_login(User.objects.create_user("learner"))
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase
+
+from apps.brain.brain_engine.prompts.prompt_manager import PromptManager
+from apps.brain.brain_engine.prompts.registry import (
+    CompiledPrompt,
+    PromptTemplateError,
+    get_prompt_registry,
+)
+
+
+class PromptRegistryTest(SimpleTestCase):
+    """Test cases for the process-wide prompt registry"""
+
+    def test_registry_is_shared(self):
+        """Test that prompt managers share one loaded registry"""
+        self.assertIs(PromptManager().registry, PromptManager().registry)
+        self.assertIs(get_prompt_registry(), PromptManager().registry)
+
+    def test_all_templates_load(self):
+        """Test that every template under prompts/ compiles cleanly"""
+        registry = get_prompt_registry()
+        self.assertEqual(registry.errors, {})
+        self.assertIn("english/context_document/multiplechoice_specific", registry.prompts)
+        self.assertIn("bengali/context_document/short_auto", registry.prompts)
+        self.assertTrue(registry.version)
+
+    def test_braces_in_document_text(self):
+        """Test that braces in the source text are spliced in verbatim"""
+        text = "The set {x | x > 0} and a stray {text} placeholder"
+        prompt = PromptManager().get_prompt(
+            language="english",
+            document_type="context_document",
+            question_type="MULTIPLECHOICE",
+            question_count_mode="specific",
+            text=text,
+            num_questions=3,
+        )
+        self.assertIn(text, prompt)
+        self.assertIn("exactly 3 multiple choice questions", prompt)
+
+    def test_unknown_field_is_rejected(self):
+        """Test that templates referencing unknown fields fail validation"""
+        with self.assertRaises(PromptTemplateError):
+            CompiledPrompt("bad", "Use {txt} here", "inline")
+
+    def test_version_tracks_template_content(self):
+        """Test that prompt versions change with the template text"""
+        first = CompiledPrompt("a", "Text: {text}", "inline")
+        second = CompiledPrompt("b", "Text:\n{text}", "inline")
+        self.assertNotEqual(first.version, second.version)
+        self.assertEqual(first.version, CompiledPrompt("c", "Text: {text}", "inline").version)
+
+    def test_fallback_does_not_change_registry(self):
+        """Test that basic fallback prompts are loaded up front and leave the version fixed"""
+        registry = get_prompt_registry()
+        version, keys = registry.version, set(registry.prompts)
+        self.assertIn("basic/bengali/short", keys)
+
+        prompt = PromptManager()._get_basic_prompt("bengali", "short")
+
+        self.assertIs(prompt, registry.get("basic/bengali/short"))
+        self.assertEqual((registry.version, set(registry.prompts)), (version, keys))
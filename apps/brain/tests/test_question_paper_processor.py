@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase
+
+from apps.brain.brain_engine.generators.question_paper_processor import QuestionPaperProcessor
+
+
+class QuestionPaperProcessorTest(SimpleTestCase):
+    """Test cases for the streaming question paper parser"""
+
+    def setUp(self):
+        """Set up the processor"""
+        self.processor = QuestionPaperProcessor(language="english")
+
+    def test_english_mcq_with_marks(self):
+        """Test that options and marks annotations are recognized"""
+        text = "1. What is 3.5 times 2? [2 marks]\nA) 7 B) 6\nC) 5 D) 8"
+        qa_pairs = self.processor.process(text)
+
+        self.assertEqual(len(qa_pairs), 1)
+        self.assertEqual(qa_pairs[0]["question"], "What is 3.5 times 2?")
+        self.assertEqual(qa_pairs[0]["question_type"], "MULTIPLECHOICE")
+        self.assertEqual(qa_pairs[0]["options"], ["A) 7", "B) 6", "C) 5", "D) 8"])
+        self.assertEqual(qa_pairs[0]["marks"], 2)
+
+    def test_decimals_and_years_do_not_split_questions(self):
+        """Test that numbers inside a sentence are kept as question text"""
+        text = "1. Explain why 2.5 kg fell in 1990. in detail\n2. Define force."
+        qa_pairs = self.processor.process(text)
+
+        self.assertEqual(
+            [qa["question"] for qa in qa_pairs],
+            ["Explain why 2.5 kg fell in 1990. in detail", "Define force."],
+        )
+        self.assertTrue(all(qa["question_type"] == "SHORT" for qa in qa_pairs))
+
+    def test_bengali_question_across_pages(self):
+        """Test Bengali numbering and options continuing onto the next page"""
+        pages = [
+            "--- Page 1 ---\n১. বাংলাদেশের রাজধানী কোথায়?\nক) ঢাকা খ) চট্টগ্রাম",
+            "--- Page 2 ---\nগ) খুলনা ঘ) রাজশাহী [৫ নম্বর]",
+        ]
+        qa_pairs = self.processor.process(pages)
+
+        self.assertEqual(len(qa_pairs), 1)
+        self.assertEqual(qa_pairs[0]["question"], "বাংলাদেশের রাজধানী কোথায়?")
+        self.assertEqual(len(qa_pairs[0]["options"]), 4)
+        self.assertEqual(qa_pairs[0]["marks"], 5)
+        self.assertIn("বহুনির্বাচনী", qa_pairs[0]["answer"])
+
+    def test_questions_are_streamed(self):
+        """Test that max_questions stops the parser early"""
+        text = "\n".join(f"{i}. Question number {i}" for i in range(1, 101))
+        qa_pairs = self.processor.process(text, max_questions=3)
+
+        self.assertEqual(len(qa_pairs), 3)
+        self.assertEqual(qa_pairs[-1]["question"], "Question number 3")
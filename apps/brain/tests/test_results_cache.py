@@ -0,0 +1,87 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.brain.models import ProcessingJob, QuestionAnswer
+
+
+@override_settings(COMING_SOON=False)
+class ResultsCacheTest(TestCase):
+    """Test cases for versioned caching of job results"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('reader')
+        self.client.force_login(self.user)
+        self.job = ProcessingJob.objects.create(user=self.user, document_name='doc.pdf', status='completed')
+        self.questions = [
+            QuestionAnswer.objects.create(
+                job=self.job, question=f'Question {n}?', answer='Answer', question_type='MULTIPLECHOICE',
+                options=[{'key': key, 'text': f'Option {key}'} for key in 'ABCD'], correct_option='A'
+            )
+            for n in range(5)
+        ]
+        self.results_url = reverse('brain:job_results', args=[self.job.id])
+
+    def get(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, headers=headers)
+        question_queries = [q for q in queries if 'brain_questionanswer' in q['sql']]
+        return response, question_queries
+
+    def test_results_served_from_cache_with_etag(self):
+        """Test that repeated requests skip the question query and a matching If-None-Match gets 304"""
+        first, question_queries = self.get(self.results_url)
+        self.assertEqual(first.json()['qa_count'], 5)
+        self.assertEqual(len(question_queries), 1)
+        etag = first['ETag']
+
+        second, question_queries = self.get(self.results_url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(question_queries, [])
+
+        not_modified, _ = self.get(self.results_url, if_none_match=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], etag)
+
+    def test_question_edit_changes_version(self):
+        """Test that editing or deleting a question invalidates the cached results"""
+        etag = self.get(self.results_url)[0]['ETag']
+
+        self.questions[0].question = 'Edited?'
+        self.questions[0].save()
+        edited, _ = self.get(self.results_url, if_none_match=etag)
+        self.assertEqual(edited.status_code, 200)
+        self.assertEqual(edited.json()['questions'][0]['question'], 'Edited?')
+
+        self.questions[1].delete()
+        deleted, _ = self.get(self.results_url, if_none_match=edited['ETag'])
+        self.assertEqual(deleted.json()['qa_count'], 4)
+
+    def test_download_and_quiz_results_are_cached(self):
+        """Test that the download and the quiz results JSON carry ETags and honour If-None-Match"""
+        download_url = reverse('brain:download_results', args=[self.job.id])
+        quiz_url = reverse('dashboard:quiz_results', args=[self.job.id]) + '?format=json'
+
+        for url in (download_url, quiz_url):
+            response, _ = self.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('Question 0?', response.content.decode())
+
+            repeat, question_queries = self.get(url, if_none_match=response['ETag'])
+            self.assertEqual(repeat.status_code, 304)
+            self.assertEqual(question_queries, [])
+
+        self.assertIn('attachment', self.get(download_url)[0]['Content-Disposition'])
+
+    def test_quiz_results_page_renders(self):
+        """Test that the HTML quiz results page still renders from the cached data"""
+        url = reverse('dashboard:quiz_results', args=[self.job.id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['generated_values']['generated_num_questions'], 5)
+        self.assertContains(response, 'Question 4?')
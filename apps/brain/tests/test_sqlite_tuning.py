@@ -0,0 +1,62 @@
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from apps.brain.management.commands.sqlite_stress import run_stress
+from apps.brain.models import ProcessingJob
+from core.sqlite import pragmas, serialized_write
+
+
+class SqliteConnectionTest(TestCase):
+    """Test cases for the SQLite connection hook"""
+
+    def test_connection_is_tuned(self):
+        """Test that new connections get the busy timeout, cache size and synchronous mode"""
+        with connection.cursor() as cursor:
+            self.assertEqual(cursor.execute('PRAGMA busy_timeout').fetchone()[0], 20000)
+            self.assertEqual(cursor.execute('PRAGMA cache_size').fetchone()[0], -65536)
+            # NORMAL
+            self.assertEqual(cursor.execute('PRAGMA synchronous').fetchone()[0], 1)
+
+    def test_pragmas_skip_unset_options(self):
+        """Test that only configured PRAGMAs are issued"""
+        self.assertEqual(pragmas({'JOURNAL_MODE': 'WAL'}), ['PRAGMA journal_mode=WAL'])
+        self.assertEqual(pragmas({'CACHE_SIZE_KIB': 1024}), ['PRAGMA cache_size=-1024'])
+
+    def test_add_questions_is_one_bulk_insert(self):
+        """Test that a job's questions are saved with a single INSERT"""
+        job = ProcessingJob.objects.create(user=User.objects.create_user('writer'), document_name='doc.pdf')
+        items = [{'question': f'Q{n}?', 'answer': 'A', 'options': ['A', 'B'], 'correct_option': 'A'} for n in range(30)]
+
+        with self.assertNumQueries(3):  # savepoint, insert, release
+            job.add_questions(items, 'MULTIPLECHOICE')
+        self.assertEqual(job.question_answers.count(), 30)
+
+
+class SerializedWriteTest(TransactionTestCase):
+    """Test cases for serialized write transactions"""
+
+    def test_nested_and_rolled_back(self):
+        """Test that serialized writes nest and roll back as one transaction"""
+        with self.assertRaises(RuntimeError):
+            with serialized_write():
+                User.objects.create_user('first')
+                with serialized_write():
+                    User.objects.create_user('second')
+                raise RuntimeError('abort')
+        self.assertFalse(User.objects.exists())
+
+
+class SqliteStressTest(SimpleTestCase):
+    """Concurrency stress test of the hot write paths"""
+
+    def test_tuned_writes_do_not_fail(self):
+        """Test that concurrent question inserts and answer transactions all succeed with the tuning"""
+        with tempfile.TemporaryDirectory() as directory:
+            result = run_stress(str(Path(directory) / 'stress.sqlite3'), tuned=True, threads=8, operations=25)
+
+        self.assertEqual(result['operations'], 200)
+        self.assertEqual(result['errors'], 0)
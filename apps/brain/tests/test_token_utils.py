@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+
+from apps.brain.brain_engine.processor import DocumentProcessor
+from apps.brain.models import ProcessingJob
+
+from apps.brain.brain_engine.utils.token_utils import (
+    PromptTooLargeError,
+    check_prompt_budget,
+    estimate_prompt_tokens,
+    estimate_tokens,
+    split_text_by_tokens,
+)
+
+
+class TokenEstimationTest(SimpleTestCase):
+    """Test cases for the local token estimator"""
+
+    def test_bengali_costs_more_than_english(self):
+        """Test that Bengali text is estimated at more tokens per character"""
+        english = "a" * 2000
+        bengali = "ক" * 2000
+        self.assertGreater(estimate_tokens(bengali), 2 * estimate_tokens(english))
+
+    def test_chunks_respect_token_budget(self):
+        """Test that chunks stay within the token budget for both scripts"""
+        text = "বাংলাদেশ একটি সুন্দর দেশ। Dhaka is the capital. " * 200
+        chunks = split_text_by_tokens(text, 200)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(" ".join(chunks), " ".join(text.split()))
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 200)
+
+    def test_prompt_budget_rejects_oversized_prompts(self):
+        """Test that prompts over the limit are rejected"""
+        self.assertEqual(check_prompt_budget("short prompt", limit=10), 3)
+        with self.assertRaises(PromptTooLargeError):
+            check_prompt_budget("x" * 100, limit=10)
+
+    def test_image_parts_have_flat_cost(self):
+        """Test that non-text prompt parts are charged as images"""
+        self.assertGreater(estimate_prompt_tokens(["Extract text", object()]), estimate_tokens("Extract text"))
+
+
+class TokenEstimateRecordingTest(TestCase):
+    """Test cases for saving the token forecast on the job"""
+
+    def test_forecast_is_saved_before_the_model_call(self):
+        """Test that the forecast is on the job before generation, and kept with the usage when it fails"""
+        job = ProcessingJob.objects.create(user=User.objects.create_user('learner'), document_name='notes.txt')
+        processor = DocumentProcessor(language="english", on_estimate=job.record_token_estimate)
+        saved = []
+
+        def generate_content(*args, **kwargs):
+            saved.append(ProcessingJob.objects.get(pk=job.pk).processing_metadata.get('token_estimate'))
+            raise RuntimeError("model unavailable")
+
+        with mock.patch("apps.brain.brain_engine.generators.qa_generator.api.generate_content",
+                        side_effect=generate_content), \
+                mock.patch("apps.brain.brain_engine.processor.save_qa_pairs", side_effect=RuntimeError("no output")):
+            with self.assertRaises(RuntimeError):
+                processor.process_text("Some source text about rivers.", num_questions=1)
+        job.mark_failed("no output")
+
+        self.assertGreater(saved[0]['prompt_tokens'], 0)
+        self.assertNotIn('used', saved[0])
+        job.refresh_from_db()
+        self.assertEqual(job.processing_metadata['token_estimate']['prompt_tokens'], saved[0]['prompt_tokens'])
+        self.assertIn('used', job.processing_metadata['token_estimate'])
@@ -0,0 +1,69 @@
+import json
+from unittest import mock
+
+from django.contrib.admin.sites import AdminSite
+from django.test import SimpleTestCase
+
+from apps.brain.admin import ProcessingJobAdmin
+from apps.brain.brain_engine.processor import DocumentProcessor
+from apps.brain.brain_engine.utils.tracing import Trace, stage_percentiles, trace_span
+from apps.brain.models import ProcessingJob
+
+
+class TraceTest(SimpleTestCase):
+    """Test cases for stage-level tracing"""
+
+    def test_spans_are_recorded_compactly(self):
+        """Test that spans are stored as [name, start_ms, duration_ms, attrs]"""
+        trace = Trace("job-1")
+        with trace.activate():
+            with trace_span("detection"):
+                pass
+            with trace_span("extraction.page", page=2):
+                pass
+
+        data = trace.to_dict()
+        self.assertEqual(data["id"], "job-1")
+        self.assertEqual([span[0] for span in data["spans"]], ["detection", "extraction.page"])
+        self.assertEqual(data["spans"][1][3], {"page": 2})
+        self.assertEqual(len(data["spans"][0]), 3)
+        json.dumps(data)
+
+    def test_trace_span_without_active_trace_is_noop(self):
+        """Test that library code can emit spans outside a traced job"""
+        with trace_span("detection"):
+            pass
+
+    def test_stage_percentiles(self):
+        """Test p50/p95 per stage across traces"""
+        traces = [
+            {"spans": [["detection", 0, duration]]} for duration in range(1, 101)
+        ] + [None]
+        stats = stage_percentiles(traces)
+        self.assertEqual(stats["detection"], {"count": 100, "p50_ms": 50, "p95_ms": 95})
+
+    def test_process_text_records_stage_spans(self):
+        """Test that processing text traces generation, parsing and persistence"""
+        response = mock.Mock(text=json.dumps({"questions": [{"question": "Q", "answer": "A"}]}))
+        processor = DocumentProcessor(language="english", correlation_id="job-7")
+
+        with mock.patch("apps.brain.brain_engine.generators.qa_generator.api.generate_content",
+                        return_value=response), \
+                mock.patch("apps.brain.brain_engine.processor.save_qa_pairs", return_value="out.json"):
+            processor.process_text("Some source text about rivers.", num_questions=1)
+
+        stages = {span[0] for span in processor.trace.to_dict()["spans"]}
+        self.assertEqual(processor.trace.correlation_id, "job-7")
+        self.assertTrue({"generation", "generation.chunk", "parsing", "persistence"} <= stages)
+
+    def test_admin_waterfall_renders_spans(self):
+        """Test that the admin renders a waterfall row per span"""
+        job = ProcessingJob(processing_metadata={
+            "trace": {"id": "job-3", "total_ms": 100,
+                      "spans": [["detection", 0, 10], ["extraction.page", 10, 90, {"page": 1}]]}
+        })
+        html = ProcessingJobAdmin(ProcessingJob, AdminSite()).trace_waterfall(job)
+
+        self.assertIn("job-3", html)
+        self.assertIn("extraction.page page=1", html)
+        self.assertEqual(html.count("<tr>"), 2)
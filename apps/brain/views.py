@@ -1,18 +1,22 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.conf import settings
+import hmac
 import json
 import logging
 import os
 import tempfile
 from pathlib import Path
 
-from .models import ProcessingJob, QuestionAnswer
+from .models import ProcessingJob
+from .listings import InvalidCursor, annotate_jobs, page_size_from, paginate_jobs, serialize_job
+from .job_status import status_etag, wait_for_change, wait_seconds_from
+from .results_cache import cached_response, get_cached, is_not_modified
 # Import DocumentProcessor only when needed to avoid hanging during Django startup
 
 logger = logging.getLogger("sisimpur.brain.views")
@@ -87,7 +91,9 @@ def process_document(request):
 
             # Initialize processor
             from .brain_engine.processor import DocumentProcessor
-            processor = DocumentProcessor(language=language)
+            processor = DocumentProcessor(
+                language=language, correlation_id=f"job-{job.id}", on_estimate=job.record_token_estimate
+            )
 
             # Process document
             if file_ext == '.txt':
@@ -108,20 +114,18 @@ def process_document(request):
                 qa_data = json.load(f)
 
             # Save Q&A pairs to database
-            for qa_item in qa_data.get('questions', []):
-                question_answer = QuestionAnswer.objects.create(
-                    job=job,
-                    question=qa_item.get('question', ''),
-                    answer=qa_item.get('answer', ''),
-                    question_type=question_type,
-                    options=qa_item.get('options', []),
-                    correct_option=qa_item.get('correct_option', ''),
-                    confidence_score=qa_item.get('confidence_score')
-                )
+            with processor.trace.span("persistence.db"):
+                job.add_questions(qa_data.get('questions', []), question_type)
 
-            # Save output file path
+            # Save output file path, token forecast and LLM call metrics
             relative_output_path = os.path.relpath(output_file, settings.MEDIA_ROOT)
             job.output_file = relative_output_path
+            job.processing_metadata = {
+                **(job.processing_metadata or {}),
+                'token_estimate': processor.token_estimate,
+                'llm_metrics': processor.llm_metrics,
+                'trace': processor.trace.to_dict(),
+            }
             job.mark_completed()
 
             return JsonResponse({
@@ -194,7 +198,9 @@ def process_text(request):
         try:
             # Initialize processor
             from .brain_engine.processor import DocumentProcessor
-            processor = DocumentProcessor(language=language)
+            processor = DocumentProcessor(
+                language=language, correlation_id=f"job-{job.id}", on_estimate=job.record_token_estimate
+            )
 
             # Process text
             output_file = processor.process_text(
@@ -208,20 +214,18 @@ def process_text(request):
                 qa_data = json.load(f)
 
             # Save Q&A pairs to database
-            for qa_item in qa_data.get('questions', []):
-                question_answer = QuestionAnswer.objects.create(
-                    job=job,
-                    question=qa_item.get('question', ''),
-                    answer=qa_item.get('answer', ''),
-                    question_type=question_type,
-                    options=qa_item.get('options', []),
-                    correct_option=qa_item.get('correct_option', ''),
-                    confidence_score=qa_item.get('confidence_score')
-                )
+            with processor.trace.span("persistence.db"):
+                job.add_questions(qa_data.get('questions', []), question_type)
 
-            # Save output file path
+            # Save output file path, token forecast and LLM call metrics
             relative_output_path = os.path.relpath(output_file, settings.MEDIA_ROOT)
             job.output_file = relative_output_path
+            job.processing_metadata = {
+                **(job.processing_metadata or {}),
+                'token_estimate': processor.token_estimate,
+                'llm_metrics': processor.llm_metrics,
+                'trace': processor.trace.to_dict(),
+            }
             job.mark_completed()
 
             return JsonResponse({
@@ -256,17 +260,36 @@ def process_text(request):
 def get_job_status(request, job_id):
     """
     Get the status of a processing job.
+
+    Query parameters: ``fields=status`` returns the status only, without the
+    question list; ``wait`` (seconds, max 30) long-polls. Responses carry an
+    ETag from the job status and ``updated_at``; a matching ``If-None-Match``
+    gets a 304, after waiting up to ``wait`` seconds for the job to change.
     """
     try:
         job = get_object_or_404(ProcessingJob, id=job_id, user=request.user)
+        status_only = request.GET.get('fields') == 'status'
+        shape = 'status' if status_only else 'job'
+
+        etag = status_etag(shape, job.status, job.updated_at)
+        if is_not_modified(request, etag):
+            wait = wait_seconds_from(request.GET.get('wait'))
+            if wait and wait_for_change(job, shape, etag, wait):
+                job = get_object_or_404(ProcessingJob, id=job_id, user=request.user)
+                etag = status_etag(shape, job.status, job.updated_at)
+            if is_not_modified(request, etag):
+                response = HttpResponseNotModified()
+                response['ETag'] = etag
+                return response
 
         response_data = {
             'job_id': job.id,
             'status': job.status,
-            'document_name': job.document_name,
-            'created_at': job.created_at.isoformat(),
             'updated_at': job.updated_at.isoformat(),
         }
+        if not status_only:
+            response_data['document_name'] = job.document_name
+            response_data['created_at'] = job.created_at.isoformat()
 
         if job.completed_at:
             response_data['completed_at'] = job.completed_at.isoformat()
@@ -274,12 +297,17 @@ def get_job_status(request, job_id):
         if job.status == 'failed':
             response_data['error_message'] = job.error_message
 
-        if job.status == 'completed':
-            qa_pairs = job.get_qa_pairs()
-            response_data['qa_count'] = qa_pairs.count()
-            response_data['questions'] = [qa.to_dict() for qa in qa_pairs]
+        if job.status == 'completed' and not status_only:
+            def build():
+                questions = [qa.to_dict() for qa in job.get_qa_pairs()]
+                return {'qa_count': len(questions), 'questions': questions}
 
-        return JsonResponse(response_data)
+            response_data.update(get_cached('status', job, build))
+
+        response = JsonResponse(response_data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
     except Exception as e:
         logger.error(f"Error getting job status for job {job_id}: {e}")
@@ -303,16 +331,18 @@ def get_job_results(request, job_id):
                 'error': 'Job is not completed yet'
             }, status=400)
 
-        qa_pairs = job.get_qa_pairs()
+        def build():
+            questions = [qa.to_dict() for qa in job.get_qa_pairs()]
+            return json.dumps({
+                'success': True,
+                'job_id': job.id,
+                'document_name': job.document_name,
+                'qa_count': len(questions),
+                'questions': questions,
+                'generated_at': job.completed_at.isoformat() if job.completed_at else None
+            })
 
-        return JsonResponse({
-            'success': True,
-            'job_id': job.id,
-            'document_name': job.document_name,
-            'qa_count': qa_pairs.count(),
-            'questions': [qa.to_dict() for qa in qa_pairs],
-            'generated_at': job.completed_at.isoformat() if job.completed_at else None
-        })
+        return cached_response(request, 'results', job, build)
 
     except Exception as e:
         logger.error(f"Error getting job results for job {job_id}: {e}")
@@ -328,8 +358,6 @@ def download_results(request, job_id):
     Download Q&A results as JSON file.
     """
     try:
-        from django.http import HttpResponse
-
         job = get_object_or_404(ProcessingJob, id=job_id, user=request.user)
 
         if job.status != 'completed':
@@ -338,23 +366,19 @@ def download_results(request, job_id):
                 'error': 'Job is not completed yet'
             }, status=400)
 
-        qa_pairs = job.get_qa_pairs()
-
-        # Prepare data for download
-        download_data = {
-            'source_document': job.document_name,
-            'generated_at': job.completed_at.isoformat() if job.completed_at else None,
-            'language': job.language,
-            'question_type': job.question_type,
-            'total_questions': qa_pairs.count(),
-            'questions': [qa.to_dict() for qa in qa_pairs]
-        }
+        def build():
+            questions = [qa.to_dict() for qa in job.get_qa_pairs()]
+            download_data = {
+                'source_document': job.document_name,
+                'generated_at': job.completed_at.isoformat() if job.completed_at else None,
+                'language': job.language,
+                'question_type': job.question_type,
+                'total_questions': len(questions),
+                'questions': questions
+            }
+            return json.dumps(download_data, ensure_ascii=False, indent=2)
 
-        # Create response
-        response = HttpResponse(
-            json.dumps(download_data, ensure_ascii=False, indent=2),
-            content_type='application/json'
-        )
+        response = cached_response(request, 'download', job, build)
         response['Content-Disposition'] = f'attachment; filename="{job.document_name}_qa_results.json"'
 
         return response
@@ -370,39 +394,30 @@ def download_results(request, job_id):
 @login_required
 def list_jobs(request):
     """
-    List all processing jobs for the current user.
+    List processing jobs for the current user, newest first.
+
+    Query parameters: ``cursor`` (from the previous page's ``next_cursor``)
+    and ``page_size`` (default 20, max 100).
     """
     try:
-        jobs = ProcessingJob.objects.filter(user=request.user).order_by('-created_at')
-
-        jobs_data = []
-        for job in jobs:
-            job_data = {
-                'id': job.id,
-                'document_name': job.document_name,
-                'status': job.status,
-                'language': job.language,
-                'question_type': job.question_type,
-                'created_at': job.created_at.isoformat(),
-                'updated_at': job.updated_at.isoformat(),
-            }
-
-            if job.completed_at:
-                job_data['completed_at'] = job.completed_at.isoformat()
-
-            if job.status == 'completed':
-                job_data['qa_count'] = job.get_qa_pairs().count()
-
-            if job.status == 'failed':
-                job_data['error_message'] = job.error_message
-
-            jobs_data.append(job_data)
+        jobs, next_cursor = paginate_jobs(
+            annotate_jobs(ProcessingJob.objects.filter(user=request.user)),
+            cursor=request.GET.get('cursor'),
+            page_size=page_size_from(request.GET.get('page_size')),
+        )
 
         return JsonResponse({
             'success': True,
-            'jobs': jobs_data
+            'jobs': [serialize_job(job) for job in jobs],
+            'next_cursor': next_cursor,
         })
 
+    except InvalidCursor as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e)
+        }, status=400)
+
     except Exception as e:
         logger.error(f"Error listing jobs: {e}")
         return JsonResponse({
@@ -445,13 +460,21 @@ def dev_test_processing(request):
         )
 
         # Process the document
-        processor = DocumentProcessor(language=language)
+        processor = DocumentProcessor(
+            language=language, correlation_id=f"job-{job.id}", on_estimate=job.record_token_estimate
+        )
         output_file = processor.process(file_path, num_questions=int(num_questions))
 
         # Load and return results
         with open(output_file, 'r', encoding='utf-8') as f:
             qa_data = json.load(f)
 
+        job.processing_metadata = {
+            **(job.processing_metadata or {}),
+            'token_estimate': processor.token_estimate,
+            'llm_metrics': processor.llm_metrics,
+            'trace': processor.trace.to_dict(),
+        }
         job.mark_completed()
 
         return JsonResponse({
@@ -475,34 +498,33 @@ def dev_test_processing(request):
 def dev_list_jobs(request):
     """
     Development endpoint to list jobs as JSON
-    Usage: GET /api/brain/dev/jobs/
+    Usage: GET /api/brain/dev/jobs/?cursor=...&page_size=20
     """
     if not request.user.is_staff:
         return JsonResponse({'error': 'Admin access required'}, status=403)
 
-    jobs = ProcessingJob.objects.all().order_by('-created_at')[:20]  # Last 20 jobs
+    try:
+        jobs, next_cursor = paginate_jobs(
+            annotate_jobs(ProcessingJob.objects.all()),
+            cursor=request.GET.get('cursor'),
+            page_size=page_size_from(request.GET.get('page_size')),
+        )
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
     jobs_data = []
     for job in jobs:
-        job_data = {
-            'id': job.id,
-            'document_name': job.document_name,
-            'status': job.status,
-            'language': job.language,
-            'question_type': job.question_type,
-            'created_at': job.created_at.isoformat(),
-            'questions_count': job.get_qa_pairs().count() if job.status == 'completed' else 0
-        }
-
+        job_data = serialize_job(job)
+        job_data['questions_count'] = job.qa_count if job.status == 'completed' else 0
         if job.status == 'failed':
             job_data['error'] = job.error_message
-
         jobs_data.append(job_data)
 
     return JsonResponse({
         'success': True,
         'jobs': jobs_data,
-        'total': jobs.count()
+        'total': len(jobs_data),
+        'next_cursor': next_cursor,
     })
 
 
@@ -561,4 +583,31 @@ def delete_job(request, job_id):
         return JsonResponse({
             'success': False,
             'error': 'Failed to delete quiz'
-        }, status=500)
\ No newline at end of file
+        }, status=500)
+
+def metrics_access_allowed(request):
+    """Allow staff users, and scrapers sending the configured METRICS_TOKEN as a bearer token"""
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = settings.BRAIN_CONFIG.get('METRICS_TOKEN')
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.strip(), token)
+
+
+@require_http_methods(["GET"])
+def metrics(request):
+    """
+    Expose LLM call metrics in the Prometheus text format.
+
+    Only staff users and requests with the METRICS_TOKEN bearer token may read them.
+    """
+    from .brain_engine.utils.metrics import llm_metrics
+
+    if not metrics_access_allowed(request):
+        return HttpResponse('Admin access or metrics token required', status=403,
+                            content_type="text/plain; charset=utf-8")
+
+    return HttpResponse(
+        llm_metrics.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,203 @@
+"""
+Answer grading for exam sessions.
+
+Each ProcessingJob gets a normalized answer key, built with one query and
+cached per job: multiple choice questions map to a canonical option label
+(A-D and ক-ঘ are treated as the same four positions, ignoring case, brackets
+and punctuation), short answers to case-folded, whitespace-collapsed text.
+Saving or deleting a question drops its job's key.
+
+The page-by-page exam flow, the batched exam API and session scoring all
+grade through this module, so they agree with each other.
+"""
+
+import unicodedata
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+ANSWER_KEY_CACHE_SECONDS = 60 * 60 * 24
+
+# Bengali option labels and the Latin labels they stand for
+BENGALI_OPTION_LABELS = {'ক': 'A', 'খ': 'B', 'গ': 'C', 'ঘ': 'D'}
+
+
+def normalize_text(text):
+    """Case-fold and collapse whitespace for comparing short answers."""
+    return ' '.join(unicodedata.normalize('NFC', text or '').casefold().split())
+
+
+def normalize_option(label):
+    """
+    Reduce an option label to its canonical form.
+
+    "b", "B)", "(B)", "B." and "খ" all become "B".
+    """
+    label = normalize_text(label).strip('()[]).:- ')
+    return BENGALI_OPTION_LABELS.get(label, label.upper())
+
+
+def key_entry(question):
+    """Build the answer key entry for one question."""
+    return {
+        'type': question.question_type,
+        'option': normalize_option(question.correct_option) if question.correct_option else '',
+        'answer': normalize_text(question.answer),
+    }
+
+
+def _cache_key(job_id):
+    return f'grading:answer_key:{job_id}'
+
+
+def get_answer_key(job_id):
+    """
+    Get the normalized answer key of a job, from cache when possible.
+
+    Returns:
+        Dictionary mapping question id to its key entry
+    """
+    answer_key = cache.get(_cache_key(job_id))
+    if answer_key is None:
+        from apps.brain.models import QuestionAnswer
+
+        questions = QuestionAnswer.objects.filter(job_id=job_id).only(
+            'id', 'question_type', 'answer', 'correct_option'
+        )
+        answer_key = {question.id: key_entry(question) for question in questions}
+        cache.set(_cache_key(job_id), answer_key, ANSWER_KEY_CACHE_SECONDS)
+    return answer_key
+
+
+def invalidate_answer_key(job_id):
+    """Drop a job's cached answer key (after its questions change)."""
+    cache.delete(_cache_key(job_id))
+
+
+def check_answer(entry, user_answer):
+    """
+    Check a user's answer against an answer key entry.
+
+    Multiple choice answers are compared by option label (or by answer text
+    when the question has no correct option); short answers are correct when
+    they appear in the expected answer.
+    """
+    if entry['type'] == 'MULTIPLECHOICE':
+        if entry['option']:
+            return normalize_option(user_answer) == entry['option']
+        return normalize_text(user_answer) == entry['answer']
+
+    answer = normalize_text(user_answer)
+    return bool(answer) and answer in entry['answer']
+
+
+def grade_answer(question, user_answer):
+    """
+    Check a user's answer against a question.
+
+    Args:
+        question: QuestionAnswer being answered
+        user_answer: Submitted answer (option label for multiple choice, text otherwise)
+
+    Returns:
+        True if the answer is correct
+    """
+    return check_answer(key_entry(question), user_answer)
+
+
+def grade_submissions(exam_session, submissions):
+    """
+    Grade a batch of submitted answers and save them with bulk writes.
+
+    Submissions for questions outside the session, or with empty answers, are
+    ignored; when a batch answers the same question twice, the last answer wins.
+    Call inside a transaction.
+
+    Args:
+        exam_session: Active ExamSession the answers belong to
+        submissions: List of {"question_id": int, "answer": str} dictionaries
+
+    Returns:
+        Number of answers saved
+    """
+    from .models import ExamAnswer
+
+    positions = {question_id: index for index, question_id in enumerate(exam_session.questions_order)}
+    latest = {}
+    for submission in submissions:
+        if not isinstance(submission, dict):
+            continue
+        question_id = submission.get('question_id')
+        answer = submission.get('answer')
+        if question_id in positions and isinstance(answer, str) and answer.strip():
+            latest[question_id] = answer.strip()
+    if not latest:
+        return 0
+
+    answer_key = get_answer_key(exam_session.processing_job_id)
+    existing = {
+        answer.question_id: answer
+        for answer in ExamAnswer.objects.filter(exam_session=exam_session, question_id__in=list(latest))
+    }
+
+    created, updated = [], []
+    for question_id, user_answer in latest.items():
+        entry = answer_key.get(question_id)
+        if entry is None:
+            continue
+        is_correct = check_answer(entry, user_answer)
+        if question_id in existing:
+            answer = existing[question_id]
+            answer.user_answer = user_answer
+            answer.is_correct = is_correct
+            updated.append(answer)
+        else:
+            created.append(ExamAnswer(
+                exam_session=exam_session,
+                question_id=question_id,
+                question_index=positions[question_id],
+                user_answer=user_answer,
+                is_correct=is_correct,
+            ))
+
+    ExamAnswer.objects.bulk_create(created)
+    ExamAnswer.objects.bulk_update(updated, ['user_answer', 'is_correct'])
+    return len(created) + len(updated)
+
+
+def grade_session(exam_session):
+    """
+    Regrade every saved answer of a session against the current answer key in one pass.
+
+    Only answers whose result changed are written back.
+
+    Returns:
+        Number of answers whose result changed
+    """
+    from .models import ExamAnswer
+
+    answer_key = get_answer_key(exam_session.processing_job_id)
+    changed = []
+    for answer in ExamAnswer.objects.filter(exam_session=exam_session).only('id', 'question_id', 'user_answer', 'is_correct'):
+        entry = answer_key.get(answer.question_id)
+        is_correct = entry is not None and check_answer(entry, answer.user_answer)
+        if is_correct != answer.is_correct:
+            answer.is_correct = is_correct
+            changed.append(answer)
+
+    ExamAnswer.objects.bulk_update(changed, ['is_correct'])
+    return len(changed)
+
+
+def score_counts(exam_session):
+    """
+    Count answered and correct answers of a session with one aggregate query.
+
+    Returns:
+        Tuple of (answered, correct)
+    """
+    counts = exam_session.exam_answers.aggregate(
+        answered=Count('id'),
+        correct=Count('id', filter=Q(is_correct=True)),
+    )
+    return counts['answered'], counts['correct']
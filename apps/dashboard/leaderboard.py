@@ -0,0 +1,267 @@
+"""
+Materialized leaderboard for the dashboard.
+
+Each window (all/week/month/year) is stored as LeaderboardEntry rows with a
+precomputed rank, so the leaderboard page reads the top entries and the
+current user's neighbourhood through the (window, rank) and (window, user)
+indexes instead of aggregating every user's exams per request.
+
+A window is rebuilt with one grouped query over completed exams, ranked in
+the database with ROW_NUMBER(). Rebuilds never run on the request path:
+
+- completing an exam marks the snapshots stale and, once the transaction
+  commits, wakes the in-process Refresher thread
+- the Refresher rebuilds stale windows at most once per
+  REFRESH_INTERVAL_SECONDS, and any window older than MAX_AGE_SECONDS so the
+  rolling windows move forward
+- page views serve the current rows, and only wake the Refresher when a
+  window is missing or due
+
+Several processes may run a Refresher; each window is claimed (by moving
+refreshed_at forward, or with a cache lock for a missing window) so only one
+of them rebuilds it. With REFRESH_IN_PROCESS off, run the
+``refresh_leaderboard`` management command on a schedule instead.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Avg, Count, F, Sum, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import ExamSession, LeaderboardEntry, LeaderboardSnapshot
+
+logger = logging.getLogger("sisimpur.dashboard.leaderboard")
+
+LEADERBOARD_CONFIG = getattr(settings, 'LEADERBOARD_CONFIG', {})
+REFRESH_IN_PROCESS = LEADERBOARD_CONFIG.get('REFRESH_IN_PROCESS', True)
+REFRESH_INTERVAL_SECONDS = LEADERBOARD_CONFIG.get('REFRESH_INTERVAL_SECONDS', 30)
+MAX_AGE_SECONDS = LEADERBOARD_CONFIG.get('MAX_AGE_SECONDS', 900)
+TOP_N = LEADERBOARD_CONFIG.get('TOP_N', 50)
+NEIGHBOURS = LEADERBOARD_CONFIG.get('NEIGHBOURS', 2)
+
+# Window name -> days covered (None for all time)
+WINDOW_DAYS = {'all': None, 'week': 7, 'month': 30, 'year': 365}
+
+
+def ranked_rows(window, now=None):
+    """
+    Aggregate completed exams per user for a window and rank them.
+
+    Ranking follows total score, then average percentage, then number of exams.
+
+    Args:
+        window: Window name ('all', 'week', 'month' or 'year')
+        now: Reference time for the rolling windows
+
+    Returns:
+        Queryset of dicts with user, exams, score, avg, credits and rank
+    """
+    sessions = ExamSession.objects.filter(status='completed')
+    days = WINDOW_DAYS[window]
+    if days:
+        sessions = sessions.filter(completed_at__gte=(now or timezone.now()) - timedelta(days=days))
+
+    return sessions.order_by().values('user').annotate(
+        exams=Count('id'),
+        score=Sum('total_score'),
+        avg=Avg('percentage_score'),
+        credits=Sum('credit_points'),
+    ).annotate(
+        rank=Window(
+            RowNumber(),
+            order_by=[F('score').desc(), F('avg').desc(), F('exams').desc(), F('user').asc()],
+        )
+    ).order_by('rank')
+
+
+def refresh_window(window, now=None):
+    """
+    Rebuild one leaderboard window.
+
+    Args:
+        window: Window name
+        now: Reference time for the rolling windows
+
+    Returns:
+        The updated LeaderboardSnapshot
+    """
+    now = now or timezone.now()
+    rows = list(ranked_rows(window, now))
+
+    with transaction.atomic():
+        LeaderboardEntry.objects.filter(window=window).delete()
+        LeaderboardEntry.objects.bulk_create([
+            LeaderboardEntry(
+                window=window,
+                user_id=row['user'],
+                rank=row['rank'],
+                total_exams=row['exams'],
+                total_score=row['score'] or 0,
+                avg_percentage=round(row['avg'] or 0, 1),
+                total_credit_points=row['credits'] or 0,
+            )
+            for row in rows
+        ], batch_size=500)
+        snapshot, _ = LeaderboardSnapshot.objects.update_or_create(
+            window=window,
+            defaults={
+                'refreshed_at': now,
+                'is_stale': False,
+                'total_users': len(rows),
+                'total_exams': sum(row['exams'] for row in rows),
+            },
+        )
+
+    logger.info(f"Refreshed leaderboard window {window}: {len(rows)} users")
+    return snapshot
+
+
+def refresh_leaderboard(windows=None, now=None):
+    """Rebuild the given windows (default: all of them)."""
+    return {window: refresh_window(window, now) for window in (windows or WINDOW_DAYS)}
+
+
+def _needs_refresh(snapshot, now):
+    age = (now - snapshot.refreshed_at).total_seconds()
+    return age >= MAX_AGE_SECONDS or (snapshot.is_stale and age >= REFRESH_INTERVAL_SECONDS)
+
+
+def refresh_due(now=None):
+    """
+    Rebuild the windows that are missing or due.
+
+    Each window is claimed first, so when several processes find the same
+    window due only one of them rebuilds it.
+
+    Returns:
+        List of the rebuilt window names
+    """
+    now = now or timezone.now()
+    snapshots = {snapshot.window: snapshot for snapshot in LeaderboardSnapshot.objects.all()}
+    refreshed = []
+
+    for window in WINDOW_DAYS:
+        snapshot = snapshots.get(window)
+        if snapshot is None:
+            claimed = cache.add(f'leaderboard:build:{window}', True, timeout=REFRESH_INTERVAL_SECONDS)
+        elif _needs_refresh(snapshot, now):
+            claimed = LeaderboardSnapshot.objects.filter(
+                pk=snapshot.pk, refreshed_at=snapshot.refreshed_at
+            ).update(refreshed_at=now)
+        else:
+            continue
+        if claimed:
+            refresh_window(window, now)
+            refreshed.append(window)
+
+    return refreshed
+
+
+def get_snapshots(windows):
+    """
+    Get the current snapshots for the given windows without rebuilding them.
+
+    Windows that are missing or due are left to the Refresher, which is woken
+    up; until it is done the current rows are served, and a window never
+    built yet is an empty, unsaved snapshot.
+
+    Args:
+        windows: Window names
+
+    Returns:
+        Dictionary mapping window name to LeaderboardSnapshot
+    """
+    now = timezone.now()
+    snapshots = {snapshot.window: snapshot for snapshot in LeaderboardSnapshot.objects.filter(window__in=windows)}
+
+    due = False
+    for window in windows:
+        snapshot = snapshots.get(window)
+        if snapshot is None:
+            snapshots[window] = LeaderboardSnapshot(window=window, refreshed_at=None)
+            due = True
+        elif _needs_refresh(snapshot, now):
+            due = True
+
+    if due and REFRESH_IN_PROCESS:
+        wake_refresher()
+    return snapshots
+
+
+class Refresher(threading.Thread):
+    """Background thread rebuilding due leaderboard windows, soon after a wake-up and every MAX_AGE_SECONDS"""
+
+    def __init__(self, interval=REFRESH_INTERVAL_SECONDS, max_age=MAX_AGE_SECONDS):
+        super().__init__(name='sisimpur-leaderboard', daemon=True)
+        self.interval = interval
+        self.max_age = max_age
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+
+    def run(self):
+        logger.info("Leaderboard refresher started")
+        while not self.stopping.is_set():
+            try:
+                close_old_connections()
+                refreshed = refresh_due()
+                if refreshed:
+                    logger.info(f"Refreshed leaderboard windows: {', '.join(refreshed)}")
+            except Exception:
+                logger.exception("Leaderboard refresh failed")
+            self.wakeup.wait(self.max_age)
+            # At most one rebuild per interval, however many exams complete
+            self.stopping.wait(self.interval)
+            self.wakeup.clear()
+        close_old_connections()
+
+    def stop(self):
+        self.stopping.set()
+        self.wakeup.set()
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def wake_refresher():
+    """Start the in-process refresher if needed and tell it windows are due."""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = Refresher()
+            _refresher.start()
+    _refresher.wakeup.set()
+
+
+def standings(window, user):
+    """
+    Get the top entries and the user's own neighbourhood for a window.
+
+    Args:
+        window: Window name
+        user: The user viewing the leaderboard
+
+    Returns:
+        Tuple of (top entries, user's entry or None, neighbouring entries
+        around the user when they are outside the top entries)
+    """
+    entries = LeaderboardEntry.objects.filter(window=window).select_related('user__profile')
+    top = list(entries.order_by('rank')[:TOP_N])
+
+    current = next((entry for entry in top if entry.user_id == user.id), None)
+    if current is None:
+        current = entries.filter(user=user).first()
+
+    neighbours = []
+    if current is not None and current.rank > TOP_N:
+        neighbours = list(entries.filter(
+            rank__gte=current.rank - NEIGHBOURS, rank__lte=current.rank + NEIGHBOURS
+        ).order_by('rank'))
+
+    return top, current, neighbours
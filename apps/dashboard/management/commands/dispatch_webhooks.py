@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.dashboard.outbox import POLL_INTERVAL_SECONDS, Dispatcher, dispatch_pending
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued Discord webhooks from the outbox (run as a worker, or once from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Deliver the due events once and exit')
+        parser.add_argument('--interval', type=float, default=POLL_INTERVAL_SECONDS,
+                            help='Seconds between dispatch passes')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            stats = dispatch_pending()
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {stats['sent']} sent in {stats['messages']} messages, {stats['retried']} retrying, "
+                f"{stats['failed']} failed, {stats['dropped']} dropped"
+            ))
+            return
+
+        self.stdout.write(f'Dispatching webhooks every {options["interval"]}s (Ctrl+C to stop)')
+        dispatcher = Dispatcher(interval=options['interval'], batch_window=0)
+        try:
+            dispatcher.run()
+        except KeyboardInterrupt:
+            dispatcher.stop()
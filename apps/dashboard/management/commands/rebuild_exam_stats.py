@@ -0,0 +1,23 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from apps.dashboard.models import UserExamStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user exam stats from exam sessions (backfill or repair)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            help='Username to rebuild (repeatable; default: all users)',
+        )
+
+    def handle(self, *args, **options):
+        users = None
+        if options.get('user'):
+            users = User.objects.filter(username__in=options['user'])
+
+        written = UserExamStats.rebuild(users)
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt exam stats for {written} users'))
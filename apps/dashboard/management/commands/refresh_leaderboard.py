@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from apps.dashboard.leaderboard import WINDOW_DAYS, refresh_due, refresh_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized leaderboard windows (run from cron or a scheduler)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window',
+            action='append',
+            choices=list(WINDOW_DAYS),
+            help='Window to rebuild (repeatable; default: all windows)',
+        )
+        parser.add_argument(
+            '--due',
+            action='store_true',
+            help='Only rebuild windows that are missing, stale past the refresh interval or past their max age',
+        )
+
+    def handle(self, *args, **options):
+        if options['due']:
+            refreshed = refresh_due()
+            self.stdout.write(self.style.SUCCESS(f"✓ Rebuilt {', '.join(refreshed) or 'no windows'}"))
+            return
+
+        snapshots = refresh_leaderboard(options.get('window'))
+        for window, snapshot in snapshots.items():
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {window}: {snapshot.total_users} users, {snapshot.total_exams} exams'
+            ))
@@ -1,7 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils import timezone
 from apps.brain.models import ProcessingJob, QuestionAnswer
+from core.sqlite import serialized_write
+from .grading import grade_session, invalidate_answer_key, score_counts
 import json
 
 
@@ -49,6 +54,12 @@ class ExamSession(models.Model):
     class Meta:
         ordering = ['-started_at']
         unique_together = ['user', 'processing_job', 'attempt_number']
+        indexes = [
+            # A user's attempts at a job, latest first
+            models.Index(fields=['user', 'processing_job', '-started_at'], name='exam_user_job_started'),
+            # Completed exams by completion time (leaderboard windows, stats)
+            models.Index(fields=['status', 'completed_at'], name='exam_status_completed'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.processing_job.document_name} (Attempt {self.attempt_number})"
@@ -83,9 +94,7 @@ class ExamSession(models.Model):
 
     def calculate_score(self):
         """Calculate final score and credit points"""
-        answers = self.exam_answers.all()
-        correct_answers = answers.filter(is_correct=True).count()
-        total_questions = answers.count()
+        total_questions, correct_answers = score_counts(self)
 
         if total_questions > 0:
             self.percentage_score = (correct_answers / total_questions) * 100
@@ -106,6 +115,33 @@ class ExamSession(models.Model):
 
         self.save()
 
+    def finish(self, status='completed'):
+        """
+        Move an active session to completed or expired, score it and fold it into the user's stats.
+
+        The status change is a conditional update, so a session finished by two
+        requests at once is scored and counted only once.
+
+        Returns:
+            True if this call finished the session, False if it was no longer active
+        """
+        with serialized_write():
+            now = timezone.now()
+            finished = ExamSession.objects.filter(pk=self.pk, status='active').update(
+                status=status, completed_at=now
+            )
+            if not finished:
+                self.refresh_from_db()
+                return False
+
+            self.status = status
+            self.completed_at = now
+            # Regrade against the current answer key in case questions were edited mid-exam
+            grade_session(self)
+            self.calculate_score()
+            UserExamStats.record_exam(self)
+        return True
+
 
 class ExamAnswer(models.Model):
     """Model to store individual exam answers"""
@@ -134,6 +170,96 @@ class ExamAnswer(models.Model):
         return f"{self.exam_session.user.username} - Q{self.question_index + 1}"
 
 
+class UserExamStats(models.Model):
+    """Running exam totals per user, maintained as sessions finish"""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='exam_stats')
+
+    # Totals over completed exams (expired sessions only update last activity)
+    completed_exams = models.PositiveIntegerField(default=0)
+    total_score = models.PositiveIntegerField(default=0)
+    percentage_sum = models.FloatField(default=0.0)
+    credit_points = models.PositiveIntegerField(default=0)
+
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'User Exam Stats'
+        verbose_name_plural = 'User Exam Stats'
+
+    def __str__(self):
+        return f"{self.user.username} - {self.completed_exams} exams"
+
+    @property
+    def average_percentage(self):
+        """Average percentage score over completed exams"""
+        if not self.completed_exams:
+            return 0.0
+        return round(self.percentage_sum / self.completed_exams, 1)
+
+    @classmethod
+    def for_user(cls, user):
+        """Get a user's stats, or an unsaved empty row if they have none yet"""
+        return cls.objects.filter(user=user).first() or cls(user=user)
+
+    @classmethod
+    def record_exam(cls, exam_session):
+        """Add a finished exam session to its user's totals with a single atomic update"""
+        updates = {'last_activity_at': exam_session.completed_at}
+        if exam_session.status == 'completed':
+            updates.update(
+                completed_exams=F('completed_exams') + 1,
+                total_score=F('total_score') + exam_session.total_score,
+                percentage_sum=F('percentage_sum') + exam_session.percentage_score,
+                credit_points=F('credit_points') + exam_session.credit_points,
+            )
+
+        cls.objects.get_or_create(user_id=exam_session.user_id)
+        cls.objects.filter(user_id=exam_session.user_id).update(**updates)
+
+    @classmethod
+    def rebuild(cls, users=None):
+        """
+        Recompute stats from ExamSession rows (for backfills and repairs).
+
+        Args:
+            users: Optional queryset or list of users to limit the rebuild to
+
+        Returns:
+            Number of stats rows written
+        """
+        sessions = ExamSession.objects.filter(status__in=['completed', 'expired'])
+        stats = cls.objects.all()
+        if users is not None:
+            sessions = sessions.filter(user__in=users)
+            stats = stats.filter(user__in=users)
+
+        completed = Q(status='completed')
+        rows = sessions.order_by().values('user').annotate(
+            exams=Count('id', filter=completed),
+            score=Sum('total_score', filter=completed),
+            percentages=Sum('percentage_score', filter=completed),
+            credits=Sum('credit_points', filter=completed),
+            last_activity=Max('completed_at'),
+        )
+
+        with transaction.atomic():
+            stats.delete()
+            created = cls.objects.bulk_create([
+                cls(
+                    user_id=row['user'],
+                    completed_exams=row['exams'],
+                    total_score=row['score'] or 0,
+                    percentage_sum=row['percentages'] or 0.0,
+                    credit_points=row['credits'] or 0,
+                    last_activity_at=row['last_activity'],
+                )
+                for row in rows
+            ], batch_size=500)
+        return len(created)
+
+
 class FlashcardSession(models.Model):
     """Model to track flashcard study sessions"""
 
@@ -249,3 +375,132 @@ class ExamConfiguration(models.Model):
             # Create default configuration if none exists
             config = cls.objects.create()
         return config
+
+
+# Materialized leaderboard, rebuilt by apps.dashboard.leaderboard
+class LeaderboardSnapshot(models.Model):
+    """Refresh state and totals of one leaderboard window"""
+
+    WINDOW_CHOICES = [
+        ('all', 'All Time'),
+        ('week', 'This Week'),
+        ('month', 'This Month'),
+        ('year', 'This Year'),
+    ]
+
+    window = models.CharField(max_length=10, choices=WINDOW_CHOICES, unique=True)
+    refreshed_at = models.DateTimeField()
+    is_stale = models.BooleanField(default=False)  # Set when an exam completes after the last refresh
+
+    # Window totals
+    total_users = models.PositiveIntegerField(default=0)
+    total_exams = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Leaderboard {self.window} (Refreshed: {self.refreshed_at.strftime('%Y-%m-%d %H:%M')})"
+
+
+class LeaderboardEntry(models.Model):
+    """A user's precomputed standing in one leaderboard window"""
+
+    window = models.CharField(max_length=10, choices=LeaderboardSnapshot.WINDOW_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    rank = models.PositiveIntegerField()
+
+    # Aggregates over the user's completed exams in the window
+    total_exams = models.PositiveIntegerField(default=0)
+    total_score = models.PositiveIntegerField(default=0)
+    avg_percentage = models.FloatField(default=0.0)
+    total_credit_points = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['window', 'rank']
+        unique_together = ['window', 'user']
+        indexes = [
+            models.Index(fields=['window', 'rank'], name='leaderboard_window_rank'),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} {self.user.username} ({self.window})"
+
+    def get_badge(self):
+        """Get the (badge, label) pair for this standing"""
+        if self.avg_percentage >= 95 and self.total_exams >= 20:
+            return 'champion', 'Champion'
+        if self.avg_percentage >= 90 and self.total_exams >= 15:
+            return 'expert', 'Expert'
+        if self.avg_percentage >= 85 and self.total_exams >= 10:
+            return 'master', 'Master'
+        if self.avg_percentage >= 75 and self.total_exams >= 5:
+            return 'pro', 'Pro'
+        return 'beginner', 'Beginner'
+
+    def get_title(self):
+        """Get the user title for this standing"""
+        if self.avg_percentage >= 95:
+            return 'Quiz Master'
+        if self.avg_percentage >= 90:
+            return 'Knowledge Seeker'
+        if self.avg_percentage >= 85:
+            return 'Study Enthusiast'
+        if self.avg_percentage >= 75:
+            return 'Quick Learner'
+        if self.avg_percentage >= 65:
+            return 'Rising Star'
+        return 'Knowledge Hunter'
+
+
+@receiver(post_save, sender=ExamSession)
+def mark_leaderboard_stale(sender, instance, **kwargs):
+    """Flag the leaderboard windows for refresh when an exam completes, and wake the refresher"""
+    from .leaderboard import REFRESH_IN_PROCESS, wake_refresher
+
+    if instance.status == 'completed':
+        LeaderboardSnapshot.objects.filter(is_stale=False).update(is_stale=True)
+        if REFRESH_IN_PROCESS:
+            transaction.on_commit(wake_refresher)
+
+
+@receiver(post_save, sender=QuestionAnswer)
+@receiver(post_delete, sender=QuestionAnswer)
+def drop_cached_answer_key(sender, instance, **kwargs):
+    """Drop the cached answer key of a job when one of its questions changes"""
+    invalidate_answer_key(instance.job_id)
+
+
+# Discord webhook outbox, delivered by apps.dashboard.outbox
+class WebhookOutbox(models.Model):
+    """A webhook event waiting to be delivered to a Discord channel"""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+        ('dropped', 'Dropped'),
+    ]
+
+    webhook_url = models.TextField()  # The Discord channel; events are batched per URL
+    event_type = models.CharField(max_length=50)
+    title = models.CharField(max_length=256)
+    color = models.CharField(max_length=6, default='03b2f8')
+    fields = models.JSONField(default=list)  # [name, value, inline] triples, rendered when sent
+    files = models.JSONField(default=list)  # Storage names attached to the message
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)  # Retry time, or lease expiry while sending
+    claim = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_attempt'),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} ({self.status}, {self.attempts} attempts)"
@@ -0,0 +1,294 @@
+"""
+Durable outbox for Discord webhooks.
+
+Notifications (signups, sign-ins, finished exams, processed documents) are
+written to WebhookOutbox by ``enqueue`` with a single INSERT, so a slow or
+rate-limited Discord never holds up the request that raised them. A
+dispatcher delivers them in the background:
+
+- due events are grouped per webhook URL (channel) and sent as one message
+  of up to EMBEDS_PER_MESSAGE embeds; events with attachments go alone
+- a failed message is retried after an exponential backoff, or after
+  Discord's retry_after on a 429, and given up after MAX_ATTEMPTS
+- the backlog is bounded: past MAX_PENDING waiting events the oldest are
+  dropped, so an unreachable Discord cannot grow the table without limit
+- events are claimed with a lease before they are sent, so several
+  dispatchers never send an event twice and a crashed dispatcher's events
+  are picked up again once the lease expires
+
+With RUN_IN_PROCESS the web process starts a dispatcher thread on the first
+enqueue; otherwise run ``python manage.py dispatch_webhooks`` as a worker.
+"""
+
+import logging
+import threading
+import uuid
+from datetime import timedelta
+
+from discord_webhook import DiscordEmbed, DiscordWebhook
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from core.sqlite import serialized_write
+from .models import WebhookOutbox
+
+logger = logging.getLogger("sisimpur.dashboard.outbox")
+
+OUTBOX_CONFIG = getattr(settings, 'WEBHOOK_OUTBOX_CONFIG', {})
+RUN_IN_PROCESS = OUTBOX_CONFIG.get('RUN_IN_PROCESS', True)
+POLL_INTERVAL_SECONDS = OUTBOX_CONFIG.get('POLL_INTERVAL_SECONDS', 5)
+BATCH_WINDOW_SECONDS = OUTBOX_CONFIG.get('BATCH_WINDOW_SECONDS', 2)
+EMBEDS_PER_MESSAGE = OUTBOX_CONFIG.get('EMBEDS_PER_MESSAGE', 10)
+CLAIM_LIMIT = OUTBOX_CONFIG.get('CLAIM_LIMIT', 100)
+MAX_PENDING = OUTBOX_CONFIG.get('MAX_PENDING', 1000)
+MAX_ATTEMPTS = OUTBOX_CONFIG.get('MAX_ATTEMPTS', 6)
+RETRY_BASE_SECONDS = OUTBOX_CONFIG.get('RETRY_BASE_SECONDS', 5)
+RETRY_MAX_SECONDS = OUTBOX_CONFIG.get('RETRY_MAX_SECONDS', 600)
+LEASE_SECONDS = OUTBOX_CONFIG.get('LEASE_SECONDS', 60)
+SEND_TIMEOUT_SECONDS = OUTBOX_CONFIG.get('SEND_TIMEOUT_SECONDS', 10)
+
+# Discord limits per message
+MAX_MESSAGE_CHARS = 6000
+MAX_FIELD_CHARS = 1024
+
+FOOTER = {'text': "Sisimpur Platform", 'icon_url': "https://cdn.discordapp.com/embed/avatars/0.png"}
+
+
+def enqueue(event_type, webhook_url, title, fields, color='03b2f8', files=()):
+    """
+    Queue a webhook event for background delivery.
+
+    Args:
+        event_type: Event name (e.g. "user_signup")
+        webhook_url: Discord webhook URL of the channel
+        title: Embed title
+        fields: List of (name, value, inline) embed fields
+        color: Embed color as a hex string
+        files: (storage name, filename) pairs to attach
+
+    Returns:
+        dict: Contains 'success' (bool) and 'message' (str).
+    """
+    if not webhook_url or webhook_url.startswith("PLACEHOLDER_"):
+        logger.warning(f"Webhook URL not configured for {event_type}: {webhook_url}")
+        return {"success": False, "message": f"Webhook URL not configured: {webhook_url}"}
+
+    try:
+        WebhookOutbox.objects.create(
+            webhook_url=webhook_url,
+            event_type=event_type,
+            title=title[:256],
+            color=color,
+            fields=[[str(name), str(value)[:MAX_FIELD_CHARS], bool(inline)] for name, value, inline in fields],
+            files=[list(item) for item in files],
+        )
+    except Exception as e:
+        logger.exception(f"Could not queue {event_type} webhook")
+        return {"success": False, "message": f"Discord webhook error: {str(e)}"}
+
+    if RUN_IN_PROCESS:
+        transaction.on_commit(wake_dispatcher)
+    return {"success": True, "message": "Discord webhook queued."}
+
+
+def embed_size(event):
+    """Characters an event's embed counts against the per-message limit."""
+    return len(event.title) + len(FOOTER['text']) + sum(len(name) + len(value) for name, value, _ in event.fields)
+
+
+def group_messages(events):
+    """
+    Coalesce events into messages.
+
+    Events for the same webhook URL share a message, in order, up to
+    EMBEDS_PER_MESSAGE embeds and MAX_MESSAGE_CHARS; events with
+    attachments are sent on their own.
+    """
+    messages = []
+    open_messages = {}
+    for event in events:
+        if event.files:
+            messages.append([event])
+            continue
+        message = open_messages.get(event.webhook_url)
+        if message is None or len(message) >= EMBEDS_PER_MESSAGE or (
+            sum(map(embed_size, message)) + embed_size(event) > MAX_MESSAGE_CHARS
+        ):
+            message = open_messages[event.webhook_url] = []
+            messages.append(message)
+        message.append(event)
+    return messages
+
+
+def send_message(webhook_url, events):
+    """
+    Post one Discord message with an embed per event.
+
+    Returns:
+        dict: Contains 'ok' (bool), 'retry_after' (seconds or None) and 'error' (str).
+    """
+    webhook = DiscordWebhook(url=webhook_url, username="Sisimpur Bot", timeout=SEND_TIMEOUT_SECONDS)
+    for event in events:
+        embed = DiscordEmbed(title=event.title, color=event.color)
+        embed.set_timestamp(event.created_at)
+        embed.set_footer(**FOOTER)
+        for name, value, inline in event.fields:
+            embed.add_embed_field(name=name, value=value, inline=inline)
+        webhook.add_embed(embed)
+        attach_files(webhook, event.files)
+
+    try:
+        response = webhook.execute()
+    except Exception as e:
+        return {'ok': False, 'retry_after': None, 'error': f"Discord webhook error: {str(e)}"}
+
+    if response.status_code in [200, 204]:
+        return {'ok': True, 'retry_after': None, 'error': ''}
+    retry_after = None
+    if response.status_code == 429:
+        try:
+            retry_after = float(response.json().get('retry_after'))
+        except (TypeError, ValueError):
+            retry_after = None
+    return {'ok': False, 'retry_after': retry_after, 'error': f"Discord returned {response.status_code}: {response.text[:500]}"}
+
+
+def attach_files(webhook, files):
+    """Attach stored files to a webhook, skipping any that are gone."""
+    from django.core.files.storage import default_storage
+
+    for name, filename in files:
+        try:
+            if default_storage.exists(name):
+                with default_storage.open(name, 'rb') as f:
+                    webhook.add_file(file=f.read(), filename=filename)
+        except Exception as file_error:
+            logger.warning(f"Could not attach {name}: {file_error}")
+
+
+def retry_delay(attempts, retry_after=None):
+    """Seconds to wait before the next attempt: exponential backoff, at least retry_after."""
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    return max(delay, retry_after or 0)
+
+
+def trim_backlog():
+    """Drop the oldest pending events beyond MAX_PENDING. Returns the number dropped."""
+    pending = WebhookOutbox.objects.filter(status='pending')
+    overflow = pending.count() - MAX_PENDING
+    if overflow <= 0:
+        return 0
+    ids = list(pending.order_by('id').values_list('id', flat=True)[:overflow])
+    with serialized_write():
+        dropped = WebhookOutbox.objects.filter(id__in=ids, status='pending').update(
+            status='dropped', last_error='Outbox full'
+        )
+    logger.warning(f"Webhook outbox full: dropped {dropped} oldest events")
+    return dropped
+
+
+def claim_due(now):
+    """Lease up to CLAIM_LIMIT due events (pending, or sending with an expired lease) to this dispatcher."""
+    due = WebhookOutbox.objects.filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+    ids = list(due.order_by('id').values_list('id', flat=True)[:CLAIM_LIMIT])
+    if not ids:
+        return []
+    claim = uuid.uuid4().hex
+    with serialized_write():
+        due.filter(id__in=ids).update(
+            status='sending', claim=claim, next_attempt_at=now + timedelta(seconds=LEASE_SECONDS)
+        )
+    return list(WebhookOutbox.objects.filter(claim=claim, status='sending').order_by('id'))
+
+
+def dispatch_pending(send=None, now=None):
+    """
+    Deliver due outbox events once.
+
+    Args:
+        send: Callable(webhook_url, events) -> result dict (default send_message)
+        now: Reference time
+
+    Returns:
+        dict: Counts of claimed, messages, sent, retried, failed and dropped events
+    """
+    send = send or send_message
+    now = now or timezone.now()
+    stats = {'claimed': 0, 'messages': 0, 'sent': 0, 'retried': 0, 'failed': 0, 'dropped': trim_backlog()}
+
+    events = claim_due(now)
+    stats['claimed'] = len(events)
+    for message in group_messages(events):
+        result = send(message[0].webhook_url, message)
+        stats['messages'] += 1
+        finished = timezone.now()
+        for event in message:
+            event.attempts += 1
+            event.claim = ''
+            if result['ok']:
+                event.status, event.sent_at, event.last_error = 'sent', finished, ''
+                stats['sent'] += 1
+            elif event.attempts >= MAX_ATTEMPTS:
+                event.status, event.last_error = 'failed', result['error']
+                stats['failed'] += 1
+            else:
+                event.status, event.last_error = 'pending', result['error']
+                event.next_attempt_at = finished + timedelta(seconds=retry_delay(event.attempts, result['retry_after']))
+                stats['retried'] += 1
+        if not result['ok']:
+            logger.warning(f"Webhook message of {len(message)} events failed: {result['error']}")
+        with serialized_write():
+            WebhookOutbox.objects.bulk_update(
+                message, ['status', 'attempts', 'claim', 'sent_at', 'last_error', 'next_attempt_at']
+            )
+    return stats
+
+
+class Dispatcher(threading.Thread):
+    """Background thread delivering the outbox every POLL_INTERVAL_SECONDS, or soon after a wake-up"""
+
+    def __init__(self, interval=POLL_INTERVAL_SECONDS, batch_window=BATCH_WINDOW_SECONDS):
+        super().__init__(name='sisimpur-webhook-outbox', daemon=True)
+        self.interval = interval
+        self.batch_window = batch_window
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+
+    def run(self):
+        logger.info("Webhook outbox dispatcher started")
+        while not self.stopping.is_set():
+            stats = None
+            try:
+                close_old_connections()
+                stats = dispatch_pending()
+                if stats['claimed']:
+                    logger.info(f"Webhook outbox: {stats}")
+            except Exception:
+                logger.exception("Webhook outbox dispatch failed")
+            # Keep going while a pass was full; otherwise wait for new events
+            if stats and stats['claimed'] >= CLAIM_LIMIT:
+                continue
+            if self.wakeup.wait(self.interval):
+                # Let events raised close together coalesce into one message
+                self.stopping.wait(self.batch_window)
+            self.wakeup.clear()
+        close_old_connections()
+
+    def stop(self):
+        self.stopping.set()
+        self.wakeup.set()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def wake_dispatcher():
+    """Start the in-process dispatcher if needed and tell it there is work."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None or not _dispatcher.is_alive():
+            _dispatcher = Dispatcher()
+            _dispatcher.start()
+    _dispatcher.wakeup.set()
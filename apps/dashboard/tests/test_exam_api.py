@@ -0,0 +1,105 @@
+import json
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.brain.models import ProcessingJob, QuestionAnswer
+from apps.dashboard.grading import get_answer_key
+from apps.dashboard.models import ExamAnswer, ExamSession, UserExamStats
+
+
+@override_settings(COMING_SOON=False)
+@mock.patch('apps.dashboard.views.send_exam_completion_webhook')
+class ExamApiTest(TestCase):
+    """Test cases for the single-payload exam API"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('examinee')
+        self.client.force_login(self.user)
+        job = ProcessingJob.objects.create(user=self.user, document_name='doc.pdf', status='completed')
+        self.questions = [
+            QuestionAnswer.objects.create(
+                job=job, question=f'Question {n}?', answer=f'Answer {n}', question_type='MULTIPLECHOICE',
+                options=[{'key': key, 'text': f'Option {key}'} for key in 'ABCD'], correct_option='B'
+            )
+            for n in range(10)
+        ]
+        self.session = ExamSession.objects.create(
+            user=self.user, processing_job=job, session_id=str(uuid.uuid4()),
+            total_questions=10, time_limit_minutes=10,
+            questions_order=[question.id for question in reversed(self.questions)]
+        )
+        self.exam_url = reverse('dashboard:api_exam', args=[self.session.session_id])
+        self.answers_url = reverse('dashboard:api_exam_answers', args=[self.session.session_id])
+
+    def post_answers(self, payload):
+        return self.client.post(self.answers_url, json.dumps(payload), content_type='application/json')
+
+    def test_payload_has_every_question_without_answers(self, webhook):
+        """Test that the exam is delivered in order in one response, with answers stripped"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.exam_url)
+        data = response.json()
+
+        self.assertEqual([q['id'] for q in data['questions']], self.session.questions_order)
+        self.assertEqual(len(data['questions'][0]['options']), 4)
+        serialized = json.dumps(data['questions'])
+        self.assertNotIn('correct_option', serialized)
+        self.assertNotIn('Answer 1', serialized)
+        # session, user, exam session, questions, saved answers
+        self.assertLessEqual(len(queries), 5)
+
+    def test_batches_are_graded_and_submitted(self, webhook):
+        """Test that batched answers are graded server-side and submission scores the exam once"""
+        first = [{'question_id': q.id, 'answer': 'B'} for q in self.questions[:6]]
+        response = self.post_answers({'answers': first, 'current_index': 5})
+        self.assertEqual(response.json()['saved'], 6)
+
+        # Change one answer, answer the rest, ignore an unknown question, then submit
+        rest = [{'question_id': q.id, 'answer': 'C'} for q in self.questions[5:]]
+        rest.append({'question_id': 999999, 'answer': 'A'})
+        response = self.post_answers({'answers': rest, 'submit': True})
+
+        self.assertEqual(response.json()['status'], 'completed')
+        self.session.refresh_from_db()
+        self.assertEqual(ExamAnswer.objects.filter(exam_session=self.session).count(), 10)
+        self.assertEqual(self.session.total_score, 5)
+        self.assertEqual(UserExamStats.objects.get(user=self.user).completed_exams, 1)
+        webhook.assert_called_once()
+
+        self.assertEqual(self.post_answers({'answers': first}).status_code, 409)
+
+    def test_answer_batch_uses_bulk_writes(self, webhook):
+        """Test that the query count of a batch does not grow with the number of answers"""
+        def batch_queries(questions):
+            with CaptureQueriesContext(connection) as queries:
+                self.post_answers({'answers': [{'question_id': q.id, 'answer': 'A'} for q in questions]})
+            return len(queries)
+
+        # Build the cached answer key first so both batches read it from cache
+        get_answer_key(self.session.processing_job_id)
+        self.assertEqual(batch_queries(self.questions[:2]), batch_queries(self.questions[2:]))
+
+    def test_expired_session_rejects_answers(self, webhook):
+        """Test that answers after the time limit are refused and the session expires"""
+        ExamSession.objects.filter(pk=self.session.pk).update(started_at=timezone.now() - timedelta(hours=1))
+
+        response = self.post_answers({'answers': [{'question_id': self.questions[0].id, 'answer': 'B'}]})
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['status'], 'expired')
+        self.assertFalse(ExamAnswer.objects.filter(exam_session=self.session).exists())
+
+    def test_invalid_body(self, webhook):
+        """Test that malformed bodies are rejected"""
+        self.assertEqual(self.client.post(self.answers_url, 'nope', content_type='application/json').status_code, 400)
+        self.assertEqual(self.post_answers({'answers': 'B'}).status_code, 400)
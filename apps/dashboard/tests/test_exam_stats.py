@@ -0,0 +1,94 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.brain.models import ProcessingJob, QuestionAnswer
+from apps.dashboard.models import ExamAnswer, ExamSession, UserExamStats
+
+
+def answered_session(user, correct, total=4):
+    """Create an active exam session with `correct` of `total` questions answered correctly"""
+    job = ProcessingJob.objects.create(user=user, document_name='doc.pdf', status='completed')
+    session = ExamSession.objects.create(
+        user=user,
+        processing_job=job,
+        session_id=str(uuid.uuid4()),
+        total_questions=total,
+        time_limit_minutes=total,
+    )
+    for index in range(total):
+        question = QuestionAnswer.objects.create(
+            job=job, question=f'Q{index}', answer='A', question_type='MULTIPLECHOICE', correct_option='A'
+        )
+        ExamAnswer.objects.create(
+            exam_session=session, question=question, question_index=index,
+            user_answer='A' if index < correct else 'B', is_correct=index < correct
+        )
+    return session
+
+
+class UserExamStatsTest(TestCase):
+    """Test cases for incrementally maintained exam stats"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('student')
+
+    def test_finish_adds_completed_exam_once(self):
+        """Test that finishing updates the totals and a second finish is a no-op"""
+        session = answered_session(self.user, correct=3)
+
+        self.assertTrue(session.finish('completed'))
+        self.assertFalse(ExamSession.objects.get(pk=session.pk).finish('completed'))
+
+        stats = UserExamStats.objects.get(user=self.user)
+        self.assertEqual(stats.completed_exams, 1)
+        self.assertEqual(stats.total_score, 3)
+        self.assertEqual(stats.average_percentage, 75.0)
+        self.assertEqual(stats.credit_points, session.credit_points)
+        self.assertEqual(stats.last_activity_at, session.completed_at)
+
+    def test_expired_exam_only_updates_last_activity(self):
+        """Test that an expired session is not counted as a completed exam"""
+        answered_session(self.user, correct=4).finish('completed')
+        expired = answered_session(self.user, correct=1)
+        expired.finish('expired')
+
+        stats = UserExamStats.objects.get(user=self.user)
+        self.assertEqual((stats.completed_exams, stats.total_score), (1, 4))
+        self.assertEqual(stats.last_activity_at, expired.completed_at)
+
+    def test_rebuild_matches_incremental_totals(self):
+        """Test that a rebuild from exam sessions reproduces the incremental stats"""
+        other = User.objects.create_user('other')
+        for user, correct in ((self.user, 2), (self.user, 4), (other, 1)):
+            answered_session(user, correct).finish('completed')
+        answered_session(other, correct=3).finish('expired')
+        incremental = {
+            stats.user_id: (stats.completed_exams, stats.total_score, stats.percentage_sum,
+                            stats.credit_points, stats.last_activity_at)
+            for stats in UserExamStats.objects.all()
+        }
+
+        UserExamStats.objects.all().delete()
+        self.assertEqual(UserExamStats.rebuild(), 2)
+
+        rebuilt = {
+            stats.user_id: (stats.completed_exams, stats.total_score, stats.percentage_sum,
+                            stats.credit_points, stats.last_activity_at)
+            for stats in UserExamStats.objects.all()
+        }
+        self.assertEqual(rebuilt, incremental)
+
+    @override_settings(COMING_SOON=False)
+    def test_profile_reads_single_stats_row(self):
+        """Test that the profile page shows the stored stats"""
+        answered_session(self.user, correct=2).finish('completed')
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('dashboard:profile'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['exam_stats'].completed_exams, 1)
+        self.assertContains(response, '50%')
@@ -0,0 +1,109 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.brain.models import ProcessingJob, QuestionAnswer
+from apps.dashboard.grading import (
+    check_answer,
+    get_answer_key,
+    grade_session,
+    grade_submissions,
+    normalize_option,
+    normalize_text,
+)
+from apps.dashboard.models import ExamAnswer, ExamSession
+
+
+class NormalizationTest(SimpleTestCase):
+    """Test cases for answer normalization"""
+
+    def test_option_labels(self):
+        """Test that Latin and Bengali option labels share canonical forms"""
+        for label in ['b', 'B', ' B) ', '(b)', 'B.', 'খ', '(খ)']:
+            self.assertEqual(normalize_option(label), 'B', label)
+        self.assertEqual(normalize_option('ঘ'), 'D')
+
+    def test_short_answer_text(self):
+        """Test that case and whitespace differences are ignored"""
+        self.assertEqual(normalize_text('  Photo\tSynthesis \n'), 'photo synthesis')
+
+    def test_check_answer(self):
+        """Test grading against key entries of each question type"""
+        mcq = {'type': 'MULTIPLECHOICE', 'option': 'C', 'answer': 'paris'}
+        self.assertTrue(check_answer(mcq, 'গ'))
+        self.assertFalse(check_answer(mcq, 'A'))
+
+        mcq_without_option = {'type': 'MULTIPLECHOICE', 'option': '', 'answer': 'paris'}
+        self.assertTrue(check_answer(mcq_without_option, ' PARIS '))
+
+        short = {'type': 'SHORT', 'option': '', 'answer': 'the process of photo synthesis'}
+        self.assertTrue(check_answer(short, 'Photo  Synthesis'))
+        self.assertFalse(check_answer(short, '   '))
+
+
+class GradingServiceTest(TestCase):
+    """Test cases for the cached answer key and session grading"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('grader')
+        self.job = ProcessingJob.objects.create(user=self.user, document_name='doc.pdf', status='completed')
+        self.questions = [
+            QuestionAnswer.objects.create(
+                job=self.job, question=f'Question {n}?', answer=f'Answer {n}',
+                question_type='MULTIPLECHOICE', correct_option='ক'
+            )
+            for n in range(5)
+        ]
+        self.session = ExamSession.objects.create(
+            user=self.user, processing_job=self.job, session_id=str(uuid.uuid4()),
+            total_questions=5, questions_order=[question.id for question in self.questions]
+        )
+
+    def test_answer_key_is_cached(self):
+        """Test that the answer key is built with one query and then served from cache"""
+        with CaptureQueriesContext(connection) as queries:
+            first = get_answer_key(self.job.id)
+            second = get_answer_key(self.job.id)
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first[self.questions[0].id]['option'], 'A')
+
+    def test_question_change_invalidates_key(self):
+        """Test that editing or deleting a question drops the cached key"""
+        get_answer_key(self.job.id)
+        self.questions[0].correct_option = 'B'
+        self.questions[0].save()
+        self.assertEqual(get_answer_key(self.job.id)[self.questions[0].id]['option'], 'B')
+
+        self.questions[1].delete()
+        self.assertNotIn(self.questions[1].id, get_answer_key(self.job.id))
+
+    def test_finish_regrades_and_scores(self):
+        """Test that finishing regrades against the current key and scores with one aggregate"""
+        grade_submissions(self.session, [{'question_id': q.id, 'answer': 'A'} for q in self.questions])
+        self.assertEqual(ExamAnswer.objects.filter(exam_session=self.session, is_correct=True).count(), 5)
+
+        self.questions[0].correct_option = 'B'
+        self.questions[0].save()
+        self.session.finish()
+
+        self.assertEqual(self.session.total_score, 4)
+        self.assertEqual(self.session.max_possible_score, 5)
+        self.assertEqual(self.session.percentage_score, 80)
+        self.assertEqual(grade_session(self.session), 0)
+
+    def test_calculate_score_uses_one_aggregate(self):
+        """Test that scoring reads the answer counts in a single query"""
+        grade_submissions(self.session, [{'question_id': q.id, 'answer': 'খ'} for q in self.questions])
+        with CaptureQueriesContext(connection) as queries:
+            self.session.calculate_score()
+
+        selects = [query for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+        self.assertEqual(self.session.total_score, 0)
@@ -0,0 +1,160 @@
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.brain.models import ProcessingJob
+from apps.dashboard import leaderboard
+from apps.dashboard.models import ExamSession, LeaderboardEntry, LeaderboardSnapshot
+
+
+def complete_exam(user, score, percentage, completed_at=None):
+    """Create a completed exam session for a user"""
+    job = ProcessingJob.objects.create(user=user, document_name='doc.pdf', status='completed')
+    return ExamSession.objects.create(
+        user=user,
+        processing_job=job,
+        session_id=str(uuid.uuid4()),
+        total_questions=10,
+        status='completed',
+        completed_at=completed_at or timezone.now(),
+        total_score=score,
+        percentage_score=percentage,
+        credit_points=score * 10,
+    )
+
+
+class LeaderboardRefreshTest(TestCase):
+    """Test cases for rebuilding leaderboard windows"""
+
+    def test_ranks_follow_score_then_average(self):
+        """Test that ranks come from the window function in score, average, exams order"""
+        alice = User.objects.create_user('alice')
+        bob = User.objects.create_user('bob')
+        carol = User.objects.create_user('carol')
+        complete_exam(alice, 8, 80)
+        complete_exam(bob, 8, 90)
+        complete_exam(carol, 5, 50)
+        complete_exam(carol, 5, 50)
+
+        snapshot = leaderboard.refresh_window('all')
+
+        ranks = list(LeaderboardEntry.objects.filter(window='all').values_list('user__username', 'rank'))
+        self.assertEqual(ranks, [('carol', 1), ('bob', 2), ('alice', 3)])
+        self.assertEqual(snapshot.total_users, 3)
+        self.assertEqual(snapshot.total_exams, 4)
+        carol_entry = LeaderboardEntry.objects.get(window='all', user=carol)
+        self.assertEqual((carol_entry.total_exams, carol_entry.total_score, carol_entry.total_credit_points), (2, 10, 100))
+
+    def test_rolling_windows_exclude_old_exams(self):
+        """Test that week/month windows only count exams completed inside them"""
+        user = User.objects.create_user('dave')
+        complete_exam(user, 3, 30, completed_at=timezone.now() - timedelta(days=20))
+        complete_exam(user, 4, 40)
+
+        snapshots = leaderboard.refresh_leaderboard()
+
+        self.assertEqual(snapshots['week'].total_exams, 1)
+        self.assertEqual(snapshots['month'].total_exams, 2)
+        self.assertEqual(LeaderboardEntry.objects.get(window='week', user=user).total_score, 4)
+
+    def test_completion_marks_stale_and_refreshes_after_interval(self):
+        """Test that a completed exam triggers a rebuild once the refresh interval has passed"""
+        user = User.objects.create_user('erin')
+        leaderboard.refresh_window('all')
+        complete_exam(user, 6, 60)
+        self.assertTrue(LeaderboardSnapshot.objects.get(window='all').is_stale)
+
+        # Within the interval the current rows are kept
+        self.assertNotIn('all', leaderboard.refresh_due())
+
+        LeaderboardSnapshot.objects.update(refreshed_at=timezone.now() - timedelta(minutes=5))
+        self.assertIn('all', leaderboard.refresh_due())
+        snapshot = LeaderboardSnapshot.objects.get(window='all')
+        self.assertEqual(snapshot.total_users, 1)
+        self.assertFalse(snapshot.is_stale)
+
+    def test_page_view_never_rebuilds(self):
+        """Test that due or missing windows are served as they are and left to the refresher"""
+        complete_exam(User.objects.create_user('frank'), 6, 60)
+        leaderboard.refresh_window('all')
+        LeaderboardSnapshot.objects.update(refreshed_at=timezone.now() - timedelta(days=1), is_stale=True)
+        complete_exam(User.objects.create_user('gina'), 7, 70)
+
+        with mock.patch.object(leaderboard, 'REFRESH_IN_PROCESS', True), \
+                mock.patch.object(leaderboard, 'wake_refresher') as wake, \
+                mock.patch.object(leaderboard, 'refresh_window') as refresh:
+            snapshots = leaderboard.get_snapshots(['all', 'week'])
+
+        refresh.assert_not_called()
+        wake.assert_called_once()
+        self.assertEqual(snapshots['all'].total_users, 1)
+        self.assertEqual((snapshots['week'].pk, snapshots['week'].total_users), (None, 0))
+
+    def test_completion_wakes_refresher_on_commit(self):
+        """Test that finishing an exam wakes the refresher once the transaction commits"""
+        with mock.patch.object(leaderboard, 'REFRESH_IN_PROCESS', True), \
+                mock.patch.object(leaderboard, 'wake_refresher') as wake:
+            with self.captureOnCommitCallbacks(execute=True):
+                complete_exam(User.objects.create_user('hana'), 5, 50)
+                wake.assert_not_called()
+
+        wake.assert_called_once()
+
+    def test_one_process_rebuilds_a_due_window(self):
+        """Test that a window claimed by one refresh is not rebuilt again by another"""
+        leaderboard.refresh_leaderboard()
+        LeaderboardSnapshot.objects.update(refreshed_at=timezone.now() - timedelta(days=1))
+        now = timezone.now()
+
+        self.assertEqual(sorted(leaderboard.refresh_due(now)), sorted(leaderboard.WINDOW_DAYS))
+        self.assertEqual(leaderboard.refresh_due(now), [])
+
+
+@override_settings(COMING_SOON=False)
+class LeaderboardViewTest(TestCase):
+    """Test cases for the leaderboard view"""
+
+    def seed(self, count):
+        users = []
+        for number in range(count):
+            user = User.objects.create_user(f'user{len(User.objects.all())}')
+            complete_exam(user, 100 - number, 50)
+            users.append(user)
+        return users
+
+    def test_current_user_outside_top_gets_neighbours(self):
+        """Test that a user ranked below the top sees their neighbours"""
+        users = self.seed(10)
+        leaderboard.refresh_leaderboard()
+        self.client.force_login(users[7])
+
+        with mock.patch.object(leaderboard, 'TOP_N', 3), mock.patch.object(leaderboard, 'NEIGHBOURS', 1):
+            response = self.client.get(reverse('dashboard:leaderboard'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['rank'] for item in response.context['leaderboard_data']], [1, 2, 3])
+        self.assertEqual([item['rank'] for item in response.context['neighbour_data']], [7, 8, 9])
+        self.assertEqual(response.context['current_user_rank'], 8)
+        self.assertEqual(response.context['total_users'], 10)
+        self.assertEqual(response.context['total_exams_completed'], 10)
+
+    def test_query_count_does_not_grow_with_users(self):
+        """Test that a page view costs the same number of queries for 5 and 60 ranked users"""
+        def page_queries():
+            leaderboard.refresh_leaderboard()
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse('dashboard:leaderboard'), {'filter': 'week'})
+            return len(queries)
+
+        users = self.seed(5)
+        self.client.force_login(users[0])
+        small = page_queries()
+        self.seed(55)
+        self.assertEqual(page_queries(), small)
@@ -0,0 +1,53 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.brain.models import ProcessingJob, QuestionAnswer
+from apps.dashboard.models import ExamSession
+
+
+@override_settings(COMING_SOON=False)
+class MyQuizzesViewTest(TestCase):
+    """Test cases for the my quizzes listing"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('quizzer')
+        self.client.force_login(self.user)
+
+    def create_quizzes(self, count):
+        for number in range(count):
+            job = ProcessingJob.objects.create(user=self.user, document_name=f'doc{number}.pdf', status='completed')
+            QuestionAnswer.objects.create(job=job, question='Q', answer='A', question_type='SHORT')
+            for attempt in (1, 2):
+                ExamSession.objects.create(
+                    user=self.user, processing_job=job, session_id=f'{job.id}-{attempt}-{uuid.uuid4()}',
+                    total_questions=1, attempt_number=attempt
+                )
+
+    def page_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('dashboard:my_quizzes'), params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_budget_is_flat_and_latest_exam_is_linked(self):
+        """Test that the page costs the same queries for 2 and 30 quizzes and links the latest attempt"""
+        self.create_quizzes(2)
+        small, response = self.page_queries()
+        job = response.context['jobs'][0]
+        latest = ExamSession.objects.filter(processing_job_id=job.id).order_by('-started_at').first()
+        self.assertEqual(job.latest_exam_session_id, latest.session_id)
+        self.assertEqual(job.qa_count, 1)
+
+        self.create_quizzes(28)
+        large, response = self.page_queries()
+        self.assertEqual(large, small)
+        self.assertEqual(len(response.context['jobs']), 20)
+
+        _, older = self.page_queries(cursor=response.context['next_cursor'])
+        self.assertEqual(len(older.context['jobs']), 10)
+        self.assertIsNone(older.context['next_cursor'])
@@ -0,0 +1,187 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.brain.models import ProcessingJob
+from apps.dashboard import outbox
+from apps.dashboard.models import WebhookOutbox
+from apps.utils import (
+    send_document_processing_failed_webhook,
+    send_document_processing_success_webhook,
+    send_user_signup_webhook,
+)
+
+CHANNEL = 'https://discord.test/api/webhooks/1/signups'
+OTHER_CHANNEL = 'https://discord.test/api/webhooks/2/exams'
+
+
+def queue(count, webhook_url=CHANNEL, **kwargs):
+    """Queue a number of simple events"""
+    for n in range(count):
+        outbox.enqueue('user_signup', webhook_url, f'Event {n}', [('User Id', str(n), True)], **kwargs)
+
+
+class FakeDiscord:
+    """Records sent messages and answers with a fixed result"""
+
+    def __init__(self, ok=True, retry_after=None):
+        self.messages = []
+        self.result = {'ok': ok, 'retry_after': retry_after, 'error': '' if ok else 'Discord returned 500'}
+
+    def __call__(self, webhook_url, events):
+        self.messages.append((webhook_url, [event.id for event in events]))
+        return self.result
+
+
+class EnqueueTest(TestCase):
+    """Test cases for writing webhook events to the outbox"""
+
+    def test_webhook_is_queued_not_sent(self):
+        """Test that a signup webhook writes one outbox row without calling Discord"""
+        user = User.objects.create_user('learner', email='learner@example.com')
+
+        with mock.patch.object(outbox, 'DiscordWebhook') as discord:
+            result = send_user_signup_webhook(user, webhook_url=CHANNEL)
+
+        discord.assert_not_called()
+        self.assertTrue(result['success'])
+        event = WebhookOutbox.objects.get()
+        self.assertEqual((event.event_type, event.status, event.webhook_url), ('user_signup', 'pending', CHANNEL))
+        self.assertIn(['Email', 'learner@example.com', True], event.fields)
+
+    def test_unconfigured_url_is_skipped(self):
+        """Test that missing and placeholder URLs queue nothing"""
+        self.assertFalse(outbox.enqueue('user_signup', None, 'Signup', [])['success'])
+        self.assertFalse(outbox.enqueue('user_signup', 'PLACEHOLDER_SIGNUP', 'Signup', [])['success'])
+        self.assertFalse(WebhookOutbox.objects.exists())
+
+    def test_document_webhook_does_not_ship_questions(self):
+        """Test that a processed document's webhook carries counts and the document, not the generated questions"""
+        user = User.objects.create_user('learner')
+        job = ProcessingJob.objects.create(
+            user=user, document_name='notes.pdf', document_file='brain/uploads/notes.pdf', status='completed'
+        )
+
+        send_document_processing_success_webhook(user, job, 12, webhook_url=CHANNEL)
+
+        event = WebhookOutbox.objects.get()
+        self.assertIn(['Questions Generated', '12', True], event.fields)
+        self.assertEqual(event.files, [['brain/uploads/notes.pdf', 'notes.pdf']])
+
+    def test_old_qa_data_argument_fails_loudly(self):
+        """Test that passing qa_data positionally, as before the outbox, raises instead of being misread"""
+        user = User.objects.create_user('learner')
+        job = ProcessingJob.objects.create(user=user, document_name='notes.pdf')
+
+        with self.assertRaises(TypeError):
+            send_document_processing_failed_webhook(user, job, 'error', {'questions': []})
+        with self.assertRaises(TypeError):
+            send_document_processing_success_webhook(user, job, 3, {'questions': []})
+        self.assertFalse(WebhookOutbox.objects.exists())
+
+
+class DispatchTest(TestCase):
+    """Test cases for delivering the outbox"""
+
+    def test_events_are_coalesced_per_channel(self):
+        """Test that due events become one message per channel of at most EMBEDS_PER_MESSAGE embeds"""
+        queue(12)
+        queue(2, OTHER_CHANNEL)
+        discord = FakeDiscord()
+
+        stats = outbox.dispatch_pending(send=discord)
+
+        self.assertEqual([(url, len(ids)) for url, ids in discord.messages], [(CHANNEL, 10), (CHANNEL, 2), (OTHER_CHANNEL, 2)])
+        self.assertEqual((stats['sent'], stats['messages']), (14, 3))
+        self.assertFalse(WebhookOutbox.objects.exclude(status='sent').exists())
+        self.assertEqual(outbox.dispatch_pending(send=discord)['claimed'], 0)
+
+    def test_events_with_files_are_sent_alone(self):
+        """Test that an event with an attachment gets its own message"""
+        queue(2)
+        queue(1, files=[('brain/uploads/notes.pdf', 'notes.pdf')])
+        discord = FakeDiscord()
+
+        outbox.dispatch_pending(send=discord)
+
+        self.assertEqual([len(ids) for _, ids in discord.messages], [2, 1])
+
+    def test_failures_back_off_then_give_up(self):
+        """Test that a failed message is retried with exponential backoff until MAX_ATTEMPTS"""
+        queue(1)
+        discord = FakeDiscord(ok=False)
+        now = timezone.now()
+
+        stats = outbox.dispatch_pending(send=discord, now=now)
+        event = WebhookOutbox.objects.get()
+        self.assertEqual((stats['retried'], event.status, event.attempts), (1, 'pending', 1))
+        self.assertGreaterEqual(event.next_attempt_at, now + timedelta(seconds=outbox.RETRY_BASE_SECONDS))
+        # Not due again before the backoff has passed
+        self.assertEqual(outbox.dispatch_pending(send=discord, now=now)['claimed'], 0)
+
+        for attempt in range(2, outbox.MAX_ATTEMPTS + 1):
+            now += timedelta(seconds=outbox.RETRY_MAX_SECONDS + 1)
+            outbox.dispatch_pending(send=discord, now=now)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('failed', outbox.MAX_ATTEMPTS))
+        self.assertEqual(len(discord.messages), outbox.MAX_ATTEMPTS)
+
+    def test_rate_limit_waits_for_retry_after(self):
+        """Test that a 429 is retried no earlier than Discord's retry_after"""
+        self.assertEqual(outbox.retry_delay(1), outbox.RETRY_BASE_SECONDS)
+        self.assertEqual(outbox.retry_delay(3), outbox.RETRY_BASE_SECONDS * 4)
+        self.assertEqual(outbox.retry_delay(30), outbox.RETRY_MAX_SECONDS)
+        self.assertEqual(outbox.retry_delay(1, retry_after=120.0), 120.0)
+
+    def test_leased_events_are_not_sent_twice(self):
+        """Test that events claimed by another dispatcher are skipped until the lease expires"""
+        queue(1)
+        now = timezone.now()
+        self.assertEqual(len(outbox.claim_due(now)), 1)
+
+        discord = FakeDiscord()
+        self.assertEqual(outbox.dispatch_pending(send=discord, now=now)['claimed'], 0)
+        later = now + timedelta(seconds=outbox.LEASE_SECONDS + 1)
+        self.assertEqual(outbox.dispatch_pending(send=discord, now=later)['sent'], 1)
+
+    @mock.patch.object(outbox, 'MAX_PENDING', 3)
+    def test_backlog_is_bounded(self):
+        """Test that the oldest pending events beyond MAX_PENDING are dropped"""
+        queue(5)
+
+        stats = outbox.dispatch_pending(send=FakeDiscord())
+
+        self.assertEqual((stats['dropped'], stats['sent']), (2, 3))
+        dropped = WebhookOutbox.objects.filter(status='dropped').values_list('title', flat=True)
+        self.assertEqual(sorted(dropped), ['Event 0', 'Event 1'])
+
+
+class SendMessageTest(TestCase):
+    """Test cases for rendering and posting a Discord message"""
+
+    @mock.patch.object(outbox, 'DiscordWebhook')
+    def test_one_embed_per_event(self, discord):
+        """Test that each event becomes an embed of the same message"""
+        queue(3)
+        discord.return_value.execute.return_value = mock.Mock(status_code=200)
+
+        result = outbox.send_message(CHANNEL, list(WebhookOutbox.objects.all()))
+
+        self.assertTrue(result['ok'])
+        self.assertEqual(discord.return_value.add_embed.call_count, 3)
+        self.assertFalse(discord.call_args.kwargs.get('rate_limit_retry'))
+
+    @mock.patch.object(outbox, 'DiscordWebhook')
+    def test_rate_limited_response(self, discord):
+        """Test that a 429 reports Discord's retry_after instead of sleeping on it"""
+        queue(1)
+        response = mock.Mock(status_code=429, text='rate limited')
+        response.json.return_value = {'retry_after': 2.5}
+        discord.return_value.execute.return_value = response
+
+        result = outbox.send_message(CHANNEL, list(WebhookOutbox.objects.all()))
+
+        self.assertEqual((result['ok'], result['retry_after']), (False, 2.5))
@@ -0,0 +1,229 @@
+"""
+Query-count and time budgets for every dashboard and brain view.
+
+The fixture seeds realistic volumes (hundreds of jobs, thousands of questions
+and answers), then each view is requested once with a cold cache and must
+stay within its fixed query budget and the time ceiling, so an N+1 lookup
+fails here instead of in production.
+
+Run it as a local profiling report with QUERY_BUDGET_REPORT set; every view
+is then printed with its query count, time and most repeated query, and a
+value ending in .json also writes the report to that file:
+
+    QUERY_BUDGET_REPORT=1 python manage.py test apps.dashboard.tests.test_query_budgets
+"""
+
+import json
+import os
+import time
+import uuid
+from collections import Counter, namedtuple
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.brain.models import ProcessingJob, QuestionAnswer
+from apps.dashboard.leaderboard import refresh_leaderboard
+from apps.dashboard.models import (
+    ExamAnswer,
+    ExamSession,
+    FlashcardSession,
+    UserExamStats,
+)
+
+JOBS = 200
+QUESTIONS_PER_JOB = 10
+EXAMS = 100
+OTHER_USERS = 50
+TIME_CEILING_MS = 1500
+
+ViewBudget = namedtuple('ViewBudget', 'name method url_name args max_queries data user', defaults=(None, 'owner'))
+
+# Views that run the document pipeline are covered by the loadtest command instead
+NOT_BUDGETED = {
+    'dashboard:api_process_document': 'runs OCR and question generation',
+    'brain:process_document': 'runs OCR and question generation',
+    'brain:dev_test': 'runs OCR and question generation',
+}
+
+# Ordered so views that change data (finish an exam, delete a job) run last
+BUDGETS = [
+    ViewBudget('dashboard:home', 'get', 'dashboard:home', (), 4),
+    ViewBudget('dashboard:profile', 'get', 'dashboard:profile', (), 4),
+    ViewBudget('dashboard:settings', 'get', 'dashboard:settings', (), 3),
+    ViewBudget('dashboard:help', 'get', 'dashboard:help', (), 3),
+    ViewBudget('dashboard:quiz_generator', 'get', 'dashboard:quiz_generator', (), 3),
+    ViewBudget('dashboard:leaderboard', 'get', 'dashboard:leaderboard', (), 5),
+    ViewBudget('dashboard:my_quizzes', 'get', 'dashboard:my_quizzes', (), 4),
+    ViewBudget('dashboard:quiz_results', 'get', 'dashboard:quiz_results', ('job',), 7),
+    ViewBudget('dashboard:quiz_results (json)', 'get', 'dashboard:quiz_results', ('job',), 4, {'format': 'json'}),
+    ViewBudget('dashboard:api_job_status', 'get', 'dashboard:api_job_status', ('job',), 4),
+    ViewBudget('dashboard:exam_session', 'get', 'dashboard:exam_session', ('active_session',), 8),
+    ViewBudget('dashboard:api_exam', 'get', 'dashboard:api_exam', ('active_session',), 5),
+    ViewBudget('dashboard:exam_result', 'get', 'dashboard:exam_result', ('completed_session',), 7),
+    ViewBudget('dashboard:flashcard_session', 'get', 'dashboard:flashcard_session', ('flashcards',), 6),
+    ViewBudget('dashboard:complete_flashcard', 'get', 'dashboard:complete_flashcard', ('finished_flashcards',), 6),
+    ViewBudget('brain:list_jobs', 'get', 'brain:list_jobs', (), 3),
+    ViewBudget('brain:dev_jobs', 'get', 'brain:dev_jobs', (), 3, None, 'staff'),
+    ViewBudget('brain:job_status', 'get', 'brain:job_status', ('job',), 4),
+    ViewBudget('brain:job_status (status only)', 'get', 'brain:job_status', ('job',), 3, {'fields': 'status'}),
+    ViewBudget('brain:job_results', 'get', 'brain:job_results', ('job',), 4),
+    ViewBudget('brain:download_results', 'get', 'brain:download_results', ('job',), 4),
+    ViewBudget('metrics', 'get', 'metrics', (), 2, None, 'staff'),
+    ViewBudget('dashboard:api_exam_answers', 'post', 'dashboard:api_exam_answers', ('active_session',), 8, 'answers'),
+    ViewBudget('dashboard:exam_session (answer)', 'post', 'dashboard:exam_session', ('active_session',), 11,
+               {'answer': 'A', 'action': 'next'}),
+    ViewBudget('dashboard:start_exam', 'get', 'dashboard:start_exam', ('job',), 10),
+    ViewBudget('dashboard:start_flashcard', 'get', 'dashboard:start_flashcard', ('job',), 7),
+    ViewBudget('dashboard:submit_exam', 'get', 'dashboard:submit_exam', ('active_session',), 13),
+    ViewBudget('dashboard:logout', 'get', 'dashboard:logout', (), 0),
+    ViewBudget('brain:delete_job', 'delete', 'brain:delete_job', ('spare_job',), 13),
+]
+
+
+@override_settings(COMING_SOON=False)
+@mock.patch('apps.dashboard.views.send_exam_completion_webhook')
+class QueryBudgetTest(TestCase):
+    """Query-count and time budgets per view at realistic data volumes"""
+
+    report = []
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner')
+        cls.staff = User.objects.create_user('staff', is_staff=True)
+        others = User.objects.bulk_create([User(username=f'learner{n}') for n in range(OTHER_USERS)])
+
+        jobs = ProcessingJob.objects.bulk_create([
+            ProcessingJob(user=cls.owner, document_name=f'doc{n}.pdf', status='completed', completed_at=timezone.now())
+            for n in range(JOBS)
+        ])
+        QuestionAnswer.objects.bulk_create([
+            QuestionAnswer(
+                job=job, question=f'Question {n}?', answer=f'Answer {n}', question_type='MULTIPLECHOICE',
+                options=[{'key': key, 'text': f'Option {key}'} for key in 'ABCD'], correct_option='A'
+            )
+            for job in jobs for n in range(QUESTIONS_PER_JOB)
+        ])
+        questions = {}
+        for question_id, job_id in QuestionAnswer.objects.values_list('id', 'job_id'):
+            questions.setdefault(job_id, []).append(question_id)
+
+        sessions = ExamSession.objects.bulk_create([
+            ExamSession(
+                user=user, processing_job=job, session_id=str(uuid.uuid4()), total_questions=QUESTIONS_PER_JOB,
+                status='completed', completed_at=timezone.now(), questions_order=questions[job.id],
+                total_score=5, max_possible_score=QUESTIONS_PER_JOB, percentage_score=50, credit_points=60,
+            )
+            for job in jobs[:EXAMS] for user in [cls.owner] + others[:1]
+        ] + [
+            ExamSession(
+                user=user, processing_job=jobs[-1], session_id=str(uuid.uuid4()), total_questions=QUESTIONS_PER_JOB,
+                status='completed', completed_at=timezone.now(), questions_order=questions[jobs[-1].id],
+                total_score=3, max_possible_score=QUESTIONS_PER_JOB, percentage_score=30, credit_points=40,
+            )
+            for user in others[1:]
+        ])
+        ExamAnswer.objects.bulk_create([
+            ExamAnswer(
+                exam_session=session, question_id=question_id, question_index=index,
+                user_answer='A' if index % 2 else 'B', is_correct=bool(index % 2)
+            )
+            for session in sessions for index, question_id in enumerate(session.questions_order)
+        ])
+
+        cls.job = jobs[0]
+        cls.spare_job = jobs[1]
+        cls.completed_session = sessions[0]
+        cls.active_session = ExamSession.objects.create(
+            user=cls.owner, processing_job=cls.job, session_id=str(uuid.uuid4()), attempt_number=2,
+            total_questions=QUESTIONS_PER_JOB, questions_order=questions[cls.job.id],
+        )
+        cls.flashcards = FlashcardSession.objects.create(
+            user=cls.owner, processing_job=cls.job, session_id=str(uuid.uuid4()),
+            total_cards=QUESTIONS_PER_JOB, cards_order=questions[cls.job.id],
+        )
+        cls.finished_flashcards = FlashcardSession.objects.create(
+            user=cls.owner, processing_job=cls.job, session_id=str(uuid.uuid4()), status='completed',
+            total_cards=QUESTIONS_PER_JOB, cards_order=questions[cls.job.id],
+        )
+        cls.answers = {'answers': [{'question_id': question_id, 'answer': 'A'} for question_id in questions[cls.job.id]]}
+
+        UserExamStats.rebuild()
+        refresh_leaderboard()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        target = os.environ.get('QUERY_BUDGET_REPORT')
+        if target and cls.report:
+            print_report(cls.report)
+            if target.endswith('.json'):
+                with open(target, 'w') as f:
+                    json.dump(cls.report, f, indent=2)
+
+    def request(self, budget):
+        client = self.client_class()
+        if budget.user:
+            client.force_login(getattr(self, budget.user))
+        # Sessions are addressed by session_id, jobs by primary key
+        fixtures = [getattr(self, name) for name in budget.args]
+        url = reverse(budget.url_name, args=[getattr(item, 'session_id', item.pk) for item in fixtures])
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            if budget.data == 'answers':
+                response = client.post(url, json.dumps(self.answers), content_type='application/json')
+            else:
+                response = getattr(client, budget.method)(url, budget.data or {})
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        return response, queries.captured_queries, elapsed_ms
+
+    def test_view_budgets(self, webhook):
+        """Test that each view stays within its query budget and the time ceiling"""
+        for budget in BUDGETS:
+            with self.subTest(view=budget.name):
+                response, queries, elapsed_ms = self.request(budget)
+                repeated = Counter(query['sql'] for query in queries).most_common(1)
+                self.report.append({
+                    'view': budget.name,
+                    'status': response.status_code,
+                    'queries': len(queries),
+                    'budget': budget.max_queries,
+                    'ms': round(elapsed_ms, 1),
+                    'most_repeated': {'count': repeated[0][1], 'sql': repeated[0][0][:200]} if repeated else None,
+                })
+
+                self.assertLess(response.status_code, 400)
+                self.assertLessEqual(
+                    len(queries), budget.max_queries,
+                    '\n'.join(query['sql'] for query in queries)
+                )
+                self.assertLess(elapsed_ms, TIME_CEILING_MS)
+
+    def test_every_view_is_budgeted(self, webhook):
+        """Test that new dashboard and brain URLs get a budget (or a reason not to)"""
+        from apps.brain.urls import urlpatterns as brain_urls
+        from apps.dashboard.urls import urlpatterns as dashboard_urls
+
+        budgeted = {budget.url_name for budget in BUDGETS} | set(NOT_BUDGETED)
+        names = {f'dashboard:{url.name}' for url in dashboard_urls} | {f'brain:{url.name}' for url in brain_urls}
+        self.assertEqual(names - budgeted, set())
+
+
+def print_report(report):
+    """Print the profiling report table."""
+    print()
+    print(f"{'View':<38} {'Status':>6} {'Queries':>8} {'Budget':>7} {'ms':>8}  Most repeated query")
+    print('-' * 110)
+    for row in report:
+        repeated = row['most_repeated']
+        repeated_text = f"{repeated['count']}x {repeated['sql'][:40]}" if repeated and repeated['count'] > 1 else ''
+        print(f"{row['view']:<38} {row['status']:>6} {row['queries']:>8} {row['budget']:>7} {row['ms']:>8}  {repeated_text}")
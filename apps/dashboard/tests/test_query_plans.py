@@ -0,0 +1,94 @@
+import re
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import OuterRef, Subquery
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.brain.listings import annotate_jobs
+from apps.brain.models import ProcessingJob, QuestionAnswer
+from apps.dashboard.leaderboard import ranked_rows
+from apps.dashboard.models import ExamAnswer, ExamSession
+
+# "SCAN table" without an index is a full table scan; "SCAN table USING INDEX" walks an index in order
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?! USING)')
+
+
+def query_plan(queryset):
+    """EXPLAIN QUERY PLAN output of a queryset, one detail per line."""
+    return queryset.explain()
+
+
+class QueryPlanTest(TestCase):
+    """Regression tests: hot queries must be answered through indexes, not full table scans"""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create([User(username=f'user{n}') for n in range(20)])
+        cls.user = users[0]
+        now = timezone.now()
+        jobs = ProcessingJob.objects.bulk_create([
+            ProcessingJob(user=user, document_name=f'doc{n}.pdf', status='completed')
+            for user in users for n in range(10)
+        ])
+        cls.job = jobs[0]
+        QuestionAnswer.objects.bulk_create([
+            QuestionAnswer(job=job, question=f'Q{n}?', answer='A', question_type='SHORT')
+            for job in jobs for n in range(5)
+        ])
+        ExamSession.objects.bulk_create([
+            ExamSession(
+                user=job.user, processing_job=job, session_id=str(uuid.uuid4()), total_questions=5,
+                attempt_number=attempt, status='completed' if attempt % 2 else 'active',
+                completed_at=now - timedelta(days=attempt * 20) if attempt % 2 else None,
+            )
+            for job in jobs for attempt in range(1, 4)
+        ])
+        sessions = list(ExamSession.objects.select_related('processing_job')[:100])
+        cls.session = sessions[0]
+        ExamAnswer.objects.bulk_create([
+            ExamAnswer(exam_session=session, question=question, question_index=index, user_answer='A')
+            for session in sessions
+            for index, question in enumerate(session.processing_job.question_answers.all())
+        ])
+        # Give the planner table statistics, as a long-running database would have
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def assertUsesIndexes(self, queryset, ordered=False):
+        plan = query_plan(queryset)
+        self.assertIsNone(FULL_SCAN.search(plan), f'Full table scan:\n{plan}')
+        if ordered:
+            self.assertNotIn('TEMP B-TREE FOR ORDER BY', plan, f'Sorts instead of reading in index order:\n{plan}')
+
+    def test_job_listing(self):
+        """Test the keyset-paginated job listing of brain.list_jobs and my_quizzes"""
+        jobs = annotate_jobs(ProcessingJob.objects.filter(user=self.user)).order_by('-created_at', '-id')[:21]
+        self.assertUsesIndexes(jobs)
+
+        recent = ProcessingJob.objects.filter(user=self.user).order_by('-created_at', '-id')[:5]
+        self.assertUsesIndexes(recent, ordered=True)
+
+    def test_latest_exam_per_job(self):
+        """Test the latest-attempt subquery of my_quizzes and the attempt count of start_exam"""
+        latest_exam = ExamSession.objects.filter(
+            user=self.user, processing_job=OuterRef('pk')
+        ).order_by('-started_at').values('session_id')[:1]
+        jobs = ProcessingJob.objects.filter(user=self.user).annotate(latest=Subquery(latest_exam))
+        self.assertUsesIndexes(jobs)
+
+        attempts = ExamSession.objects.filter(user=self.user, processing_job=self.job).order_by('-started_at')
+        self.assertUsesIndexes(attempts, ordered=True)
+
+    def test_leaderboard_window(self):
+        """Test the completed-exam window aggregated by the leaderboard"""
+        self.assertUsesIndexes(ranked_rows('week'))
+        self.assertIn('exam_status_completed', query_plan(ranked_rows('month')))
+
+    def test_job_questions_and_answers(self):
+        """Test a job's questions in order and a session's answers"""
+        self.assertUsesIndexes(QuestionAnswer.objects.filter(job=self.job).order_by('id'), ordered=True)
+        self.assertUsesIndexes(ExamAnswer.objects.filter(exam_session=self.session))
@@ -21,6 +21,8 @@ urlpatterns = [
     path('exam/session/<str:session_id>/', views.exam_session, name='exam_session'),
     path('exam/submit/<str:session_id>/', views.submit_exam, name='submit_exam'),
     path('exam/result/<str:session_id>/', views.exam_result, name='exam_result'),
+    path('exam/api/<str:session_id>/', views.api_exam, name='api_exam'),
+    path('exam/api/<str:session_id>/answers/', views.api_exam_answers, name='api_exam_answers'),
 
     # Flashcard functionality
     path('flashcard/start/<int:job_id>/', views.start_flashcard, name='start_flashcard'),
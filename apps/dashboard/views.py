@@ -1,4 +1,5 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -8,7 +9,9 @@ from django.contrib import messages
 import uuid
 import random
 import json
+from core.sqlite import serialized_write
 from .models import ExamSession
+from .grading import grade_answer
 from apps.utils import send_document_processing_success_webhook, send_document_processing_failed_webhook, send_exam_completion_webhook
 
 @login_required(login_url='auth:signupin')
@@ -37,7 +40,12 @@ def profile(request):
     """
     Render the user profile page
     """
-    return render(request, "profile.html")
+    from .models import UserExamStats
+
+    context = {
+        'exam_stats': UserExamStats.for_user(request.user)
+    }
+    return render(request, "profile.html", context)
 
 @login_required(login_url='auth:signupin')
 def settings(request):
@@ -65,43 +73,36 @@ def my_quizzes(request):
     """
     Render the my quizzes page with user's processing jobs
     """
+    next_cursor = None
     try:
+        from django.db.models import OuterRef, Subquery
         from apps.brain.models import ProcessingJob
-        from .models import ExamSession, ExamConfiguration
-
-        jobs = ProcessingJob.objects.filter(user=request.user).order_by('-created_at')
-
-        # Add latest exam session info for results (no attempt limits)
-        for job in jobs:
-            # Get the latest exam session for results only
-            latest_exam = ExamSession.objects.filter(
-                user=request.user,
-                processing_job=job
-            ).order_by('-started_at').first()
+        from apps.brain.listings import annotate_jobs, paginate_jobs
 
-            job.latest_exam = latest_exam
+        # Latest exam session per job for results (no attempt limits)
+        latest_exam = ExamSession.objects.filter(
+            user=request.user,
+            processing_job=OuterRef('pk')
+        ).order_by('-started_at').values('session_id')[:1]
+
+        jobs, next_cursor = paginate_jobs(
+            annotate_jobs(ProcessingJob.objects.filter(user=request.user)).annotate(
+                latest_exam_session_id=Subquery(latest_exam)
+            ),
+            cursor=request.GET.get('cursor')
+        )
     except:
         jobs = []
 
     context = {
-        'jobs': jobs
+        'jobs': jobs,
+        'next_cursor': next_cursor,
     }
     return render(request, "my_quizzes.html", context)
 
-@login_required(login_url='auth:signupin')
-def quiz_results(request, job_id):
-    """
-    Render the quiz results page for a specific job
-    """
-    try:
-        from apps.brain.models import ProcessingJob
-        from django.shortcuts import get_object_or_404
-
-        job = get_object_or_404(ProcessingJob, id=job_id, user=request.user)
-        qa_pairs = job.get_qa_pairs() if job.status == 'completed' else []
-    except:
-        job = None
-        qa_pairs = []
+def _quiz_results_data(job):
+    """Serialize a job's questions and its settings, detected and generated values"""
+    qa_pairs = job.get_qa_pairs() if job.status == 'completed' else []
 
     # Convert each QA pair to a dictionary with full details
     serialized_qa_pairs = []
@@ -123,68 +124,94 @@ def quiz_results(request, job_id):
 
         serialized_qa_pairs.append(qa_dict)
 
-    # Prepare form settings and detected values
-    form_settings = {}
-    detected_values = {}
-    generated_values = {}
-
-    if job:
-        # Form settings (what user selected)
-        form_settings = {
-            'selected_language': job.language,
-            'selected_question_type': job.question_type,
-            'selected_num_questions': job.num_questions,
-            'selected_document_type': job.document_type,
-        }
+    # Form settings (what user selected)
+    form_settings = {
+        'selected_language': job.language,
+        'selected_question_type': job.question_type,
+        'selected_num_questions': job.num_questions,
+        'selected_document_type': job.document_type,
+    }
 
-        # Detected values (what system detected)
-        metadata = job.processing_metadata or {}
-        detected_values = {
-            'detected_language': metadata.get('language', 'unknown'),
-            'detected_document_type': metadata.get('doc_type', 'unknown'),
-            'detected_is_question_paper': metadata.get('is_question_paper', False),
-            'detected_pdf_type': metadata.get('pdf_type'),
-            'file_size': metadata.get('file_size'),
-            'file_extension': metadata.get('extension'),
-        }
+    # Detected values (what system detected)
+    metadata = job.processing_metadata or {}
+    detected_values = {
+        'detected_language': metadata.get('language', 'unknown'),
+        'detected_document_type': metadata.get('doc_type', 'unknown'),
+        'detected_is_question_paper': metadata.get('is_question_paper', False),
+        'detected_pdf_type': metadata.get('pdf_type'),
+        'file_size': metadata.get('file_size'),
+        'file_extension': metadata.get('extension'),
+    }
 
-        # Add human-readable labels
-        form_settings['selected_language_display'] = dict(job.LANGUAGE_CHOICES).get(job.language, job.language)
-        form_settings['selected_question_type_display'] = dict(job.QUESTION_TYPE_CHOICES).get(job.question_type, job.question_type)
+    # Add human-readable labels
+    form_settings['selected_language_display'] = dict(job.LANGUAGE_CHOICES).get(job.language, job.language)
+    form_settings['selected_question_type_display'] = dict(job.QUESTION_TYPE_CHOICES).get(job.question_type, job.question_type)
 
-        detected_values['detected_language_display'] = {
-            'bengali': 'Bengali', 'english': 'English', 'unknown': 'Unknown'
-        }.get(detected_values['detected_language'], detected_values['detected_language'])
+    detected_values['detected_language_display'] = {
+        'bengali': 'Bengali', 'english': 'English', 'unknown': 'Unknown'
+    }.get(detected_values['detected_language'], detected_values['detected_language'])
 
-        # Generated values (actual results)
-        generated_values = {
-            'generated_num_questions': len(serialized_qa_pairs),
-            'generated_question_types': list(set(qa.question_type for qa in qa_pairs)),
-            'processing_status': job.status,
-            'processing_time': (job.completed_at - job.created_at).total_seconds() if job.completed_at else None,
-        }
+    # Generated values (actual results)
+    generated_values = {
+        'generated_num_questions': len(serialized_qa_pairs),
+        'generated_question_types': list(set(qa['question_type'] for qa in serialized_qa_pairs)),
+        'processing_status': job.status,
+        'processing_time': (job.completed_at - job.created_at).total_seconds() if job.completed_at else None,
+    }
+
+    return {
+        'serialized_qa_pairs': serialized_qa_pairs,
+        'form_settings': form_settings,
+        'detected_values': detected_values,
+        'generated_values': generated_values,
+    }
+
+
+@login_required(login_url='auth:signupin')
+def quiz_results(request, job_id):
+    """
+    Render the quiz results page for a specific job
+
+    The serialized results are cached per job version (see apps/brain/results_cache.py);
+    the JSON format also answers If-None-Match with 304.
+    """
+    from apps.brain.models import ProcessingJob
+    from apps.brain.results_cache import cached_response, get_cached
+
+    try:
+        job = get_object_or_404(ProcessingJob, id=job_id, user=request.user)
+    except:
+        job = None
+
+    def results_data():
+        if job is None:
+            return {'serialized_qa_pairs': [], 'form_settings': {}, 'detected_values': {}, 'generated_values': {}}
+        return get_cached('quiz_results', job, lambda: _quiz_results_data(job))
 
     # Check if this is an AJAX request (for API usage)
     if request.headers.get('Accept') == 'application/json' or request.GET.get('format') == 'json':
-        return JsonResponse({
-            'success': True,
-            'job_id': job_id,
-            'message': 'Quiz results retrieved successfully',
-            'questions_generated': len(serialized_qa_pairs),
-            'qa_pairs': serialized_qa_pairs,
-            'form_settings': form_settings,
-            'detected_values': detected_values,
-            'generated_values': generated_values,
-        })
+        def payload():
+            data = results_data()
+            return {
+                'success': True,
+                'job_id': job_id,
+                'message': 'Quiz results retrieved successfully',
+                'questions_generated': len(data['serialized_qa_pairs']),
+                'qa_pairs': data['serialized_qa_pairs'],
+                'form_settings': data['form_settings'],
+                'detected_values': data['detected_values'],
+                'generated_values': data['generated_values'],
+            }
+
+        if job:
+            return cached_response(request, 'quiz_results_json', job, lambda: json.dumps(payload()))
+        return JsonResponse(payload())
 
     # Render template for regular page access
     context = {
         'job': job,
-        'qa_pairs': qa_pairs,
-        'serialized_qa_pairs': serialized_qa_pairs,
-        'form_settings': form_settings,
-        'detected_values': detected_values,
-        'generated_values': generated_values,
+        'qa_pairs': job.get_qa_pairs() if job and job.status == 'completed' else [],
+        **results_data(),
     }
     return render(request, "quiz_results.html", context)
 
@@ -278,7 +305,9 @@ def api_process_document(request):
 
             # Import and use brain processor
             from apps.brain.brain_engine.processor import DocumentProcessor
-            processor = DocumentProcessor(language=language)
+            processor = DocumentProcessor(
+                language=language, correlation_id=f"job-{job.id}", on_estimate=job.record_token_estimate
+            )
 
             # Process document
             output_file = processor.process(full_file_path, num_questions=num_questions)
@@ -289,31 +318,27 @@ def api_process_document(request):
                 qa_data = json.load(f)
 
             # Save Q&A pairs to database
-            from apps.brain.models import QuestionAnswer
-            for qa_item in qa_data.get('questions', []):
-                QuestionAnswer.objects.create(
-                    job=job,
-                    question=qa_item.get('question', ''),
-                    answer=qa_item.get('answer', ''),
-                    question_type=question_type,
-                    options=qa_item.get('options', []),
-                    correct_option=qa_item.get('correct_option', ''),
-                    confidence_score=qa_item.get('confidence_score'),
-                    source_text=qa_item.get('source_text', '')
-                )
+            with processor.trace.span("persistence.db"):
+                job.add_questions(qa_data.get('questions', []), question_type)
 
             # Save output file path
             output_filename = f'brain/qa_outputs/{job.id}_results.json'
             with open(default_storage.path(output_filename), 'w', encoding='utf-8') as f:
                 json.dump(qa_data, f, ensure_ascii=False, indent=2)
             job.output_file = output_filename
+            job.processing_metadata = {
+                **(job.processing_metadata or {}),
+                'token_estimate': processor.token_estimate,
+                'llm_metrics': processor.llm_metrics,
+                'trace': processor.trace.to_dict(),
+            }
 
             # Mark job as completed
             job.mark_completed()
 
             # Send Discord webhook for processing (success or failure based on question count)
             questions_count = len(qa_data.get('questions', []))
-            send_document_processing_success_webhook(request.user, job, questions_count, qa_data)
+            send_document_processing_success_webhook(request.user, job, questions_count)
 
             # Prepare form settings and detected values for response
             form_settings = {
@@ -345,7 +370,7 @@ def api_process_document(request):
             job.mark_failed(str(processing_error))
 
             # Send Discord webhook for failed processing
-            send_document_processing_failed_webhook(request.user, job, str(processing_error), None)
+            send_document_processing_failed_webhook(request.user, job, str(processing_error))
 
             return JsonResponse({
                 'success': False,
@@ -382,114 +407,42 @@ def leaderboard(request):
     """
     Display global leaderboard with user rankings based on exam performance
     """
-    from django.db.models import Count, Avg, Sum, Q
-    from django.contrib.auth.models import User
-    from datetime import datetime, timedelta
+    from .leaderboard import WINDOW_DAYS, get_snapshots, standings
 
     # Get filter parameter
     filter_type = request.GET.get('filter', 'all')
-
-    # Calculate date range based on filter
-    now = timezone.now()
-    if filter_type == 'week':
-        start_date = now - timedelta(days=7)
-    elif filter_type == 'month':
-        start_date = now - timedelta(days=30)
-    elif filter_type == 'year':
-        start_date = now - timedelta(days=365)
-    else:
-        start_date = None
-
-    # Base queryset for exam sessions
-    exam_sessions = ExamSession.objects.filter(status='completed')
-    if start_date:
-        exam_sessions = exam_sessions.filter(completed_at__gte=start_date)
-
-    # Calculate user statistics
-    user_stats = User.objects.annotate(
-        total_exams=Count('exam_sessions', filter=Q(exam_sessions__in=exam_sessions)),
-        total_score=Sum('exam_sessions__total_score', filter=Q(exam_sessions__in=exam_sessions)),
-        avg_percentage=Avg('exam_sessions__percentage_score', filter=Q(exam_sessions__in=exam_sessions)),
-        total_credit_points=Sum('exam_sessions__credit_points', filter=Q(exam_sessions__in=exam_sessions))
-    ).filter(
-        total_exams__gt=0  # Only users who have taken exams
-    ).order_by('-total_score', '-avg_percentage', '-total_exams')
-
-    # Add rank and badge to each user
-    leaderboard_data = []
-    for rank, user in enumerate(user_stats, 1):
-        # Determine badge based on performance
-        avg_score = user.avg_percentage or 0
-        total_exams = user.total_exams or 0
-
-        if avg_score >= 95 and total_exams >= 20:
-            badge = 'champion'
-            badge_label = 'Champion'
-        elif avg_score >= 90 and total_exams >= 15:
-            badge = 'expert'
-            badge_label = 'Expert'
-        elif avg_score >= 85 and total_exams >= 10:
-            badge = 'master'
-            badge_label = 'Master'
-        elif avg_score >= 75 and total_exams >= 5:
-            badge = 'pro'
-            badge_label = 'Pro'
-        else:
-            badge = 'beginner'
-            badge_label = 'Beginner'
-
-        # Determine user title based on performance
-        if avg_score >= 95:
-            title = 'Quiz Master'
-        elif avg_score >= 90:
-            title = 'Knowledge Seeker'
-        elif avg_score >= 85:
-            title = 'Study Enthusiast'
-        elif avg_score >= 75:
-            title = 'Quick Learner'
-        elif avg_score >= 65:
-            title = 'Rising Star'
-        else:
-            title = 'Knowledge Hunter'
-
-        leaderboard_data.append({
-            'rank': rank,
-            'user': user,
-            'title': title,
-            'total_score': user.total_score or 0,
-            'total_exams': total_exams,
-            'avg_percentage': round(avg_score, 1) if avg_score else 0,
-            'total_credit_points': user.total_credit_points or 0,
+    if filter_type not in WINDOW_DAYS:
+        filter_type = 'all'
+
+    # Precomputed windows; global statistics come from the all-time and weekly snapshots
+    snapshots = get_snapshots({filter_type, 'all', 'week'})
+    top_entries, current_entry, neighbour_entries = standings(filter_type, request.user)
+
+    def leaderboard_item(entry):
+        badge, badge_label = entry.get_badge()
+        return {
+            'rank': entry.rank,
+            'user': entry.user,
+            'title': entry.get_title(),
+            'total_score': entry.total_score,
+            'total_exams': entry.total_exams,
+            'avg_percentage': entry.avg_percentage,
+            'total_credit_points': entry.total_credit_points,
             'badge': badge,
             'badge_label': badge_label,
-            'is_current_user': user == request.user
-        })
-
-    # Calculate global statistics
-    total_users = User.objects.filter(exam_sessions__status='completed').distinct().count()
-    active_users_week = User.objects.filter(
-        exam_sessions__status='completed',
-        exam_sessions__completed_at__gte=now - timedelta(days=7)
-    ).distinct().count()
-    total_exams_completed = ExamSession.objects.filter(status='completed').count()
-
-    # Find current user's position
-    current_user_rank = None
-    current_user_data = None
-    for item in leaderboard_data:
-        if item['is_current_user']:
-            current_user_rank = item['rank']
-            current_user_data = item
-            break
+            'is_current_user': entry.user_id == request.user.id
+        }
 
     context = {
-        'leaderboard_data': leaderboard_data[:50],  # Top 50 users
-        'current_user_rank': current_user_rank,
-        'current_user_data': current_user_data,
+        'leaderboard_data': [leaderboard_item(entry) for entry in top_entries],  # Top 50 users
+        'neighbour_data': [leaderboard_item(entry) for entry in neighbour_entries],
+        'current_user_rank': current_entry.rank if current_entry else None,
+        'current_user_data': leaderboard_item(current_entry) if current_entry else None,
         'filter_type': filter_type,
-        'total_users': total_users,
-        'active_users_week': active_users_week,
-        'total_exams_completed': total_exams_completed,
+        'total_users': snapshots['all'].total_users,
+        'active_users_week': snapshots['week'].total_users,
+        'total_exams_completed': snapshots['all'].total_exams,
+        'leaderboard_refreshed_at': snapshots[filter_type].refreshed_at,
     }
 
     return render(request, 'leaderboard.html', context)
@@ -591,10 +544,7 @@ def exam_session(request, session_id):
         # Check if session has expired
         if exam_session.is_expired():
             print(f"DEBUG: Session expired, marking as expired and redirecting")
-            exam_session.status = 'expired'
-            exam_session.completed_at = timezone.now()
-            exam_session.calculate_score()
-            exam_session.save()
+            exam_session.finish('expired')
             return redirect('dashboard:exam_result', session_id=session_id)
 
         # Get current question
@@ -605,13 +555,9 @@ def exam_session(request, session_id):
         if current_index >= len(exam_session.questions_order):
             # All questions completed
             print(f"DEBUG: All questions completed, marking exam as completed")
-            exam_session.status = 'completed'
-            exam_session.completed_at = timezone.now()
-            exam_session.calculate_score()
-            exam_session.save()
-
-            # Send Discord webhook for exam completion
-            send_exam_completion_webhook(request.user, exam_session)
+            if exam_session.finish('completed'):
+                # Send Discord webhook for exam completion
+                send_exam_completion_webhook(request.user, exam_session)
 
             return redirect('dashboard:exam_result', session_id=session_id)
 
@@ -633,38 +579,23 @@ def exam_session(request, session_id):
 
             if user_answer:
                 # Check if answer is correct
-                is_correct = False
-                print(f"DEBUG: Checking answer - Question: '{current_question.question[:50]}...', User: '{user_answer}', Type: '{current_question.question_type}', CorrectOption: '{current_question.correct_option}', Answer: '{current_question.answer}'")
-
-                if current_question.question_type == 'MULTIPLECHOICE':
-                    # For multiple choice, compare with correct_option field (A, B, C, D)
-                    if current_question.correct_option:
-                        is_correct = user_answer.upper().strip() == current_question.correct_option.upper().strip()
-                        print(f"DEBUG: Multiple choice comparison - '{user_answer.upper().strip()}' == '{current_question.correct_option.upper().strip()}' = {is_correct}")
-                    else:
-                        # Fallback: compare with answer text if correct_option is not set
-                        is_correct = user_answer.lower().strip() == current_question.answer.lower().strip()
-                        print(f"DEBUG: Multiple choice fallback - '{user_answer.lower().strip()}' == '{current_question.answer.lower().strip()}' = {is_correct}")
-                else:
-                    # For short answers, simple string matching (can be enhanced)
-                    is_correct = user_answer.lower().strip() in current_question.answer.lower()
-                    print(f"DEBUG: Short answer comparison - '{user_answer.lower().strip()}' in '{current_question.answer.lower()}' = {is_correct}")
-
+                is_correct = grade_answer(current_question, user_answer)
                 print(f"DEBUG: Final is_correct = {is_correct}")
 
                 # Save or update answer
-                if existing_answer:
-                    existing_answer.user_answer = user_answer
-                    existing_answer.is_correct = is_correct
-                    existing_answer.save()
-                else:
-                    ExamAnswer.objects.create(
-                        exam_session=exam_session,
-                        question=current_question,
-                        question_index=current_index,
-                        user_answer=user_answer,
-                        is_correct=is_correct
-                    )
+                with serialized_write():
+                    if existing_answer:
+                        existing_answer.user_answer = user_answer
+                        existing_answer.is_correct = is_correct
+                        existing_answer.save()
+                    else:
+                        ExamAnswer.objects.create(
+                            exam_session=exam_session,
+                            question=current_question,
+                            question_index=current_index,
+                            user_answer=user_answer,
+                            is_correct=is_correct
+                        )
 
             # Handle navigation
             if action == 'next' and current_index < len(exam_session.questions_order) - 1:
@@ -674,13 +605,9 @@ def exam_session(request, session_id):
                 exam_session.current_question_index -= 1
                 exam_session.save()
             elif action == 'submit':
-                exam_session.status = 'completed'
-                exam_session.completed_at = timezone.now()
-                exam_session.calculate_score()
-                exam_session.save()
-
-                # Send Discord webhook for exam completion
-                send_exam_completion_webhook(request.user, exam_session)
+                if exam_session.finish('completed'):
+                    # Send Discord webhook for exam completion
+                    send_exam_completion_webhook(request.user, exam_session)
 
                 return redirect('dashboard:exam_result', session_id=session_id)
 
@@ -723,12 +650,7 @@ def submit_exam(request, session_id):
 
         exam_session = get_object_or_404(ExamSession, session_id=session_id, user=request.user)
 
-        if exam_session.status == 'active':
-            exam_session.status = 'completed'
-            exam_session.completed_at = timezone.now()
-            exam_session.calculate_score()
-            exam_session.save()
-
+        if exam_session.status == 'active' and exam_session.finish('completed'):
             # Send Discord webhook for exam completion
             send_exam_completion_webhook(request.user, exam_session)
 
@@ -739,6 +661,113 @@ def submit_exam(request, session_id):
         return redirect('dashboard:my_quizzes')
 
 
+# Single-payload exam API: the client loads every question once and sends
+# answers in batches; exam_session above stays as the page-by-page fallback.
+@login_required(login_url='auth:signupin')
+@require_http_methods(["GET"])
+def api_exam(request, session_id):
+    """
+    API endpoint to get a whole exam at once, without correct answers
+    """
+    from apps.brain.models import QuestionAnswer
+    from .models import ExamAnswer
+
+    exam_session = get_object_or_404(ExamSession, session_id=session_id, user=request.user)
+    if exam_session.status == 'active' and exam_session.is_expired():
+        exam_session.finish('expired')
+
+    questions = QuestionAnswer.objects.only(
+        'id', 'question', 'question_type', 'options'
+    ).in_bulk(exam_session.questions_order)
+    answers = ExamAnswer.objects.filter(exam_session=exam_session).values_list('question_id', 'user_answer')
+
+    questions_data = []
+    for index, question_id in enumerate(exam_session.questions_order):
+        question = questions.get(question_id)
+        if question is None:
+            continue
+        question_data = {
+            'id': question.id,
+            'index': index,
+            'question': question.question,
+            'question_type': question.question_type,
+        }
+        if question.question_type == 'MULTIPLECHOICE':
+            question_data['options'] = question.get_formatted_options()
+        questions_data.append(question_data)
+
+    return JsonResponse({
+        'success': True,
+        'session_id': exam_session.session_id,
+        'status': exam_session.status,
+        'current_index': exam_session.current_question_index,
+        'total_questions': len(exam_session.questions_order),
+        'remaining_time': exam_session.get_remaining_time_seconds(),
+        'allow_navigation': exam_session.allow_navigation,
+        'questions': questions_data,
+        'answers': {str(question_id): user_answer for question_id, user_answer in answers},
+        'answers_url': reverse('dashboard:api_exam_answers', args=[session_id]),
+        'result_url': reverse('dashboard:exam_result', args=[session_id]),
+    })
+
+
+@login_required(login_url='auth:signupin')
+@require_http_methods(["POST"])
+def api_exam_answers(request, session_id):
+    """
+    API endpoint to save a batch of answers, optionally submitting the exam
+
+    Body: {"answers": [{"question_id": 12, "answer": "B"}, ...],
+           "current_index": 7, "submit": false}
+    """
+    from .grading import grade_submissions
+
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON body'}, status=400)
+    if not isinstance(payload, dict) or not isinstance(payload.get('answers', []), list):
+        return JsonResponse({'success': False, 'error': 'answers must be a list'}, status=400)
+
+    result_url = reverse('dashboard:exam_result', args=[session_id])
+    submitted = False
+    with serialized_write():
+        exam_session = get_object_or_404(
+            ExamSession.objects.select_for_update(), session_id=session_id, user=request.user
+        )
+        if exam_session.status == 'active' and exam_session.is_expired():
+            exam_session.finish('expired')
+        if exam_session.status != 'active':
+            return JsonResponse({
+                'success': False,
+                'error': f'Exam is {exam_session.status}',
+                'status': exam_session.status,
+                'result_url': result_url,
+            }, status=409)
+
+        saved = grade_submissions(exam_session, payload.get('answers', []))
+
+        current_index = payload.get('current_index')
+        if isinstance(current_index, int) and 0 <= current_index < len(exam_session.questions_order):
+            exam_session.current_question_index = current_index
+            exam_session.save(update_fields=['current_question_index'])
+
+        if payload.get('submit'):
+            submitted = exam_session.finish('completed')
+
+    if submitted:
+        # Send Discord webhook for exam completion
+        send_exam_completion_webhook(request.user, exam_session)
+
+    return JsonResponse({
+        'success': True,
+        'saved': saved,
+        'status': exam_session.status,
+        'remaining_time': exam_session.get_remaining_time_seconds(),
+        'result_url': result_url,
+    })
+
+
 @login_required(login_url='auth:signupin')
 def exam_result(request, session_id):
     """
@@ -759,8 +788,10 @@ def exam_result(request, session_id):
 
         # Get all answers
         print(f"DEBUG: Getting exam answers...")
-        answers = ExamAnswer.objects.filter(exam_session=exam_session).order_by('question_index')
-        print(f"DEBUG: Found {answers.count()} answers")
+        answers = list(
+            ExamAnswer.objects.filter(exam_session=exam_session).select_related('question').order_by('question_index')
+        )
+        print(f"DEBUG: Found {len(answers)} answers")
 
         # Debug each answer
         for i, answer in enumerate(answers):
@@ -768,8 +799,8 @@ def exam_result(request, session_id):
 
         # Calculate detailed statistics
         total_questions = exam_session.total_questions
-        answered_questions = answers.count()
-        correct_answers = answers.filter(is_correct=True).count()
+        answered_questions = len(answers)
+        correct_answers = sum(1 for answer in answers if answer.is_correct)
         incorrect_answers = answered_questions - correct_answers
         print(f"DEBUG: Stats - Total: {total_questions}, Answered: {answered_questions}, Correct: {correct_answers}, Incorrect: {incorrect_answers}")
 
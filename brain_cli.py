@@ -8,7 +8,12 @@ This CLI tool allows you to test the brain functionality quickly during developm
 import os
 import sys
 import json
+import time
 import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
 
 # Add the project root to Python path
@@ -21,7 +26,7 @@ import django
 django.setup()
 
 from django.contrib.auth.models import User
-from apps.brain.models import ProcessingJob, QuestionAnswer
+from apps.brain.models import ProcessingJob
 
 
 def create_test_user():
@@ -41,11 +46,44 @@ def create_test_user():
     return user
 
 
+def run_job(job, file_path):
+    """Run the brain pipeline for a job, save its Q&A pairs and mark it completed"""
+    from apps.brain.brain_engine.processor import DocumentProcessor
+
+    processor = DocumentProcessor(
+        language=job.language, correlation_id=f"job-{job.id}", on_estimate=job.record_token_estimate
+    )
+
+    # Process document (plain text files skip detection and extraction)
+    if Path(file_path).suffix.lower() == '.txt':
+        with open(file_path, 'r', encoding='utf-8') as f:
+            output_file = processor.process_text(
+                f.read(), num_questions=job.num_questions, source_name=Path(file_path).name
+            )
+    else:
+        output_file = processor.process(file_path, num_questions=job.num_questions)
+
+    # Load results
+    with open(output_file, 'r', encoding='utf-8') as f:
+        qa_data = json.load(f)
+
+    # Save to database
+    with processor.trace.span("persistence.db"):
+        job.add_questions(qa_data.get('questions', []))
+
+    job.processing_metadata = {
+        **(job.processing_metadata or {}),
+        'token_estimate': processor.token_estimate,
+        'llm_metrics': processor.llm_metrics,
+        'trace': processor.trace.to_dict(),
+    }
+    job.mark_completed()
+    return output_file, qa_data
+
+
 def process_document(file_path, num_questions=None, language='auto', question_type='MULTIPLECHOICE'):
     """Process a document and generate questions"""
     try:
-        from apps.brain.brain_engine.processor import DocumentProcessor
-        
         print(f"🧠 Processing document: {file_path}")
         print(f"   Language: {language}")
         print(f"   Question Type: {question_type}")
@@ -67,29 +105,7 @@ def process_document(file_path, num_questions=None, language='auto', question_ty
         
         print(f"📝 Created job #{job.id}")
         
-        # Initialize processor
-        processor = DocumentProcessor(language=language)
-        
-        # Process document
-        output_file = processor.process(file_path, num_questions=num_questions)
-        
-        # Load results
-        with open(output_file, 'r', encoding='utf-8') as f:
-            qa_data = json.load(f)
-        
-        # Save to database
-        for qa_item in qa_data.get('questions', []):
-            QuestionAnswer.objects.create(
-                job=job,
-                question=qa_item.get('question', ''),
-                answer=qa_item.get('answer', ''),
-                question_type=question_type,
-                options=qa_item.get('options', []),
-                correct_option=qa_item.get('correct_option', ''),
-                confidence_score=qa_item.get('confidence_score')
-            )
-        
-        job.mark_completed()
+        output_file, qa_data = run_job(job, file_path)
         
         print(f"✅ Processing completed!")
         print(f"   Generated: {len(qa_data.get('questions', []))} questions")
@@ -108,7 +124,9 @@ def process_document(file_path, num_questions=None, language='auto', question_ty
 
 def list_jobs():
     """List all processing jobs"""
-    jobs = ProcessingJob.objects.all().order_by('-created_at')
+    from apps.brain.listings import annotate_jobs
+
+    jobs = annotate_jobs(ProcessingJob.objects.all()).order_by('-created_at')
     
     if not jobs:
         print("📝 No processing jobs found")
@@ -120,7 +138,7 @@ def list_jobs():
     print("-" * 80)
     
     for job in jobs:
-        qa_count = job.get_qa_pairs().count() if job.status == 'completed' else '-'
+        qa_count = job.qa_count if job.status == 'completed' else '-'
         print(f"{job.id:<5} {job.document_name[:29]:<30} {job.status:<12} {qa_count:<10} {job.created_at.strftime('%Y-%m-%d %H:%M'):<20}")
 
 
@@ -162,8 +180,213 @@ def show_results(job_id):
         print(f"❌ Job #{job_id} not found")
 
 
+BATCH_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png', '.txt'}
+
+
+def collect_batch_files(source):
+    """
+    Resolve a batch source to a list of absolute file paths.
+
+    The source is either a directory (searched recursively for supported
+    documents) or a manifest file: a JSON list of paths, or one path per line
+    (blank lines and lines starting with '#' are ignored). Relative manifest
+    paths are resolved against the manifest's directory.
+    """
+    source = Path(source).resolve()
+    if source.is_dir():
+        return sorted(
+            str(path) for path in source.rglob('*')
+            if path.is_file() and path.suffix.lower() in BATCH_EXTENSIONS
+        )
+
+    text = source.read_text(encoding='utf-8')
+    if source.suffix.lower() == '.json':
+        entries = json.loads(text)
+    else:
+        entries = [line.strip() for line in text.splitlines()]
+        entries = [line for line in entries if line and not line.startswith('#')]
+
+    files = []
+    for entry in entries:
+        path = Path(entry).expanduser()
+        files.append(str(path if path.is_absolute() else (source.parent / path).resolve()))
+    return files
+
+
+class BatchProgress:
+    """
+    Resumable progress manifest for batch ingestion.
+
+    Records one entry per file (keyed by absolute path) and is rewritten
+    atomically after every file, so an interrupted batch can be re-run and
+    picks up where it stopped. A file counts as done only if it completed and
+    has not changed (size and mtime) since.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+
+    @staticmethod
+    def _stat(file_path):
+        stat = os.stat(file_path)
+        return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+    def is_done(self, file_path):
+        entry = self.entries.get(file_path)
+        if not entry or entry.get('status') != 'completed':
+            return False
+        try:
+            stat = self._stat(file_path)
+        except OSError:
+            return False
+        return entry.get('size') == stat['size'] and entry.get('mtime') == stat['mtime']
+
+    def record(self, file_path, **result):
+        """Store the outcome for a file and rewrite the manifest."""
+        with self._lock:
+            try:
+                stat = self._stat(file_path)
+            except OSError:
+                stat = {}
+            self.entries[file_path] = {**stat, **result, 'finished_at': datetime.now().isoformat(timespec='seconds')}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'files': self.entries}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+def _batch_file(file_path, user, num_questions, language, question_type):
+    """Process one batch file in a worker thread and describe the outcome."""
+    from django.db import close_old_connections
+
+    start = time.perf_counter()
+    job = None
+    try:
+        job = ProcessingJob.objects.create(
+            user=user,
+            document_name=Path(file_path).name,
+            language=language,
+            num_questions=num_questions,
+            question_type=question_type,
+            status='processing'
+        )
+        _, qa_data = run_job(job, file_path)
+        return {
+            'status': 'completed',
+            'job_id': job.id,
+            'questions': len(qa_data.get('questions', [])),
+            'seconds': round(time.perf_counter() - start, 1),
+        }
+    except Exception as e:
+        if job is not None:
+            job.mark_failed(str(e))
+        return {
+            'status': 'failed',
+            'job_id': job.id if job else None,
+            'error': str(e),
+            'seconds': round(time.perf_counter() - start, 1),
+        }
+    finally:
+        # Worker threads each hold their own connection
+        close_old_connections()
+
+
+def run_batch(source, workers=4, num_questions=None, language='auto',
+              question_type='MULTIPLECHOICE', progress_path=None):
+    """Process a directory or manifest of documents through a worker pool"""
+    files = collect_batch_files(source)
+    if progress_path is None:
+        base = Path(source).resolve()
+        progress_path = (base if base.is_dir() else base.parent) / '.brain_batch_progress.json'
+    progress = BatchProgress(progress_path)
+
+    pending = [file_path for file_path in files if not progress.is_done(file_path)]
+    print(f"📦 Batch: {len(files)} files, {len(files) - len(pending)} already completed, {len(pending)} to process")
+    print(f"   Workers: {workers}  Progress manifest: {progress.path}")
+    print()
+    if not pending:
+        return progress
+
+    # All workers share the api singleton, so they share its rate limiter
+    user = create_test_user()
+    start = time.perf_counter()
+    completed = failed = questions = 0
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+        futures = {
+            executor.submit(_batch_file, file_path, user, num_questions, language, question_type): file_path
+            for file_path in pending
+        }
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                file_path = futures[future]
+                result = future.result()
+                progress.record(file_path, **result)
+
+                if result['status'] == 'completed':
+                    completed += 1
+                    questions += result['questions']
+                    outcome = f"✓ {Path(file_path).name} ({result['questions']} q, {result['seconds']}s)"
+                else:
+                    failed += 1
+                    outcome = f"✗ {Path(file_path).name}: {result['error']}"
+
+                elapsed = time.perf_counter() - start
+                print(
+                    f"[{done}/{len(pending)}] {outcome} | "
+                    f"{completed / elapsed * 60:.1f} docs/min | failed {failed}",
+                    flush=True
+                )
+        except KeyboardInterrupt:
+            print("\n⏹️  Interrupted; waiting for running files (re-run to resume)")
+            for future in futures:
+                future.cancel()
+            raise
+
+    elapsed = time.perf_counter() - start
+    print()
+    print(f"✅ Batch finished in {elapsed:.1f}s: {completed} completed, {failed} failed, {questions} questions")
+    if failed:
+        print("   Failed files are retried on the next run")
+    return progress
+
+
+def run_bench(levels, num_questions, corpus_dir, output=None):
+    """Benchmark the pipeline on the fixed corpus and write the report as JSON"""
+    from django.conf import settings
+    from apps.brain.brain_engine.benchmark import run_benchmark
+
+    corpus_dir = Path(corpus_dir or Path(settings.MEDIA_ROOT) / 'brain' / 'bench_corpus')
+    print(f"⏱️  Benchmarking corpus in {corpus_dir} at concurrency {', '.join(map(str, levels))}")
+
+    report = run_benchmark(corpus_dir, concurrency_levels=levels, num_questions=num_questions)
+    if report['skipped']:
+        print(f"⚠️  Skipped {', '.join(report['skipped'])}: no font with Bengali glyphs (set BRAIN_BENCH_BENGALI_FONT)")
+
+    print(f"\n{'Concurrency':>11} {'Docs/min':>9} {'Calls/doc':>10} {'Failures':>9} {'Peak RSS':>10}")
+    for level in report['levels']:
+        print(
+            f"{level['concurrency']:>11} {level['docs_per_minute']:>9} {level['llm_calls_per_doc']:>10} "
+            f"{level['failures']:>9} {level['peak_rss_mb']:>8}MB"
+        )
+
+    report_json = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        Path(output).write_text(report_json, encoding='utf-8')
+        print(f"\n📄 Report written to {output}")
+    else:
+        print(report_json)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Sisimpur Brain CLI Tool')
+    parser.add_argument('--offline', action='store_true', help='Use the offline fake model backend instead of Gemini')
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Process command
@@ -182,8 +405,29 @@ def main():
     
     # Test command
     test_parser = subparsers.add_parser('test', help='Run a quick test with sample data')
+
+    # Batch command
+    batch_parser = subparsers.add_parser('batch', help='Process a directory or manifest of documents')
+    batch_parser.add_argument('source', help='Directory of documents, or a manifest (JSON list or one path per line)')
+    batch_parser.add_argument('-w', '--workers', type=int, default=4, help='Documents processed at the same time')
+    batch_parser.add_argument('-n', '--num-questions', type=int, help='Number of questions per document')
+    batch_parser.add_argument('-l', '--language', default='auto', choices=['auto', 'english', 'bengali'], help='Language for processing')
+    batch_parser.add_argument('-t', '--type', default='MULTIPLECHOICE', choices=['MULTIPLECHOICE', 'SHORT'], help='Question type')
+    batch_parser.add_argument('--progress', help='Progress manifest path (default: .brain_batch_progress.json next to the source)')
+
+    # Bench command
+    bench_parser = subparsers.add_parser('bench', help='Benchmark the pipeline on a fixed corpus')
+    bench_parser.add_argument('--levels', default='1,2,4', help='Comma-separated concurrency levels')
+    bench_parser.add_argument('-n', '--num-questions', type=int, default=5, help='Questions per document')
+    bench_parser.add_argument('--corpus', help='Corpus directory (generated if missing)')
+    bench_parser.add_argument('-o', '--output', help='Write the JSON report to this file')
     
     args = parser.parse_args()
+
+    if args.offline:
+        from apps.brain.brain_engine.utils.api_utils import use_backend
+        use_backend('fake')
+        print("🔌 Using offline fake model backend")
     
     if args.command == 'process':
         if not os.path.exists(args.file):
@@ -203,6 +447,28 @@ def main():
     elif args.command == 'show':
         show_results(args.job_id)
     
+    elif args.command == 'batch':
+        if not os.path.exists(args.source):
+            print(f"❌ Not found: {args.source}")
+            return
+
+        run_batch(
+            args.source,
+            workers=args.workers,
+            num_questions=args.num_questions,
+            language=args.language,
+            question_type=args.type,
+            progress_path=args.progress
+        )
+
+    elif args.command == 'bench':
+        run_bench(
+            [int(level) for level in args.levels.split(',')],
+            args.num_questions,
+            args.corpus,
+            output=args.output
+        )
+
     elif args.command == 'test':
         print("🧪 Running quick test...")
         print("This would process a sample document if available.")
@@ -0,0 +1,221 @@
+"""
+Scheduled housekeeping: retention policies for rows and generated files.
+
+``run_housekeeping`` runs every task below and reports what each reclaimed.
+Rows are deleted with ``delete_in_batches`` (core/sqlite.py), one short write
+transaction per BATCH_SIZE rows, so a large cleanup never holds the SQLite
+write lock for long. Retention is set per task in HOUSEKEEPING_CONFIG:
+
+- expired_otps: EmailOTP codes past their expiry
+- rate_limits: OTPRateLimit records idle for RETENTION_DAYS['rate_limits']
+- webhook_outbox: sent, failed and dropped webhook events
+- temp_extracts: extracted text in media/brain/temp_extracts
+- qa_outputs: generated JSON in media/brain/qa_outputs
+
+Files are only removed when no ProcessingJob references them and they are
+older than their retention, which also keeps files of jobs still running.
+
+Run it with ``python manage.py housekeeping`` from cron, or set
+RUN_IN_PROCESS to run it every INTERVAL_HOURS from a thread of the web
+process. A cache lock keeps several processes from running it at once.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.sqlite import delete_in_batches
+
+logger = logging.getLogger("sisimpur.core.housekeeping")
+
+HOUSEKEEPING_CONFIG = getattr(settings, 'HOUSEKEEPING_CONFIG', {})
+RUN_IN_PROCESS = HOUSEKEEPING_CONFIG.get('RUN_IN_PROCESS', False)
+INTERVAL_HOURS = HOUSEKEEPING_CONFIG.get('INTERVAL_HOURS', 24)
+BATCH_SIZE = HOUSEKEEPING_CONFIG.get('BATCH_SIZE', 500)
+BATCH_PAUSE_SECONDS = HOUSEKEEPING_CONFIG.get('BATCH_PAUSE_SECONDS', 0.05)
+RETENTION_DAYS = {
+    'rate_limits': 7,
+    'webhook_outbox': 14,
+    'temp_extracts': 1,
+    'qa_outputs': 7,
+    **HOUSEKEEPING_CONFIG.get('RETENTION_DAYS', {}),
+}
+
+LOCK_KEY = 'housekeeping:running'
+
+
+def expired_otps(now):
+    """Delete expired OTP codes."""
+    from apps.authentication.models import EmailOTP
+
+    return {'rows': EmailOTP.cleanup_expired(batch_size=BATCH_SIZE)}
+
+
+def rate_limits(now):
+    """Delete idle OTP rate limit records and passed block records."""
+    from apps.authentication.models import OTPRateLimit
+
+    return {'rows': OTPRateLimit.cleanup_old_records(days=RETENTION_DAYS['rate_limits'], batch_size=BATCH_SIZE)}
+
+
+def webhook_outbox(now):
+    """Delete finished webhook events."""
+    from apps.dashboard.models import WebhookOutbox
+
+    finished = WebhookOutbox.objects.filter(
+        status__in=['sent', 'failed', 'dropped'],
+        created_at__lt=now - timedelta(days=RETENTION_DAYS['webhook_outbox']),
+    )
+    return {'rows': delete_in_batches(finished, BATCH_SIZE, BATCH_PAUSE_SECONDS)}
+
+
+def referenced_files(field):
+    """Media-relative names of the files ProcessingJobs reference through a FileField."""
+    from apps.brain.models import ProcessingJob
+
+    names = ProcessingJob.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+    return {os.path.normpath(name) for name in names.values_list(field, flat=True).iterator()}
+
+
+def remove_orphan_files(directory, referenced, older_than):
+    """
+    Remove files in a media directory that nothing references and that are older than a cutoff.
+
+    Returns:
+        dict: Number of files removed and bytes reclaimed
+    """
+    directory = Path(directory)
+    media_root = Path(settings.MEDIA_ROOT)
+    cutoff = older_than.timestamp()
+    removed, reclaimed = 0, 0
+    if not directory.is_dir():
+        return {'files': 0, 'bytes': 0}
+
+    for entry in os.scandir(directory):
+        if not entry.is_file(follow_symlinks=False):
+            continue
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime >= cutoff:
+            continue
+        if os.path.normpath(os.path.relpath(entry.path, media_root)) in referenced:
+            continue
+        try:
+            os.remove(entry.path)
+        except OSError as e:
+            logger.warning(f"Could not remove {entry.path}: {e}")
+            continue
+        removed += 1
+        reclaimed += stat.st_size
+    return {'files': removed, 'bytes': reclaimed}
+
+
+def temp_extracts(now):
+    """Remove extracted text files no job references."""
+    return remove_orphan_files(
+        settings.BRAIN_TEMP_DIR, referenced_files('extracted_text_file'),
+        now - timedelta(days=RETENTION_DAYS['temp_extracts']),
+    )
+
+
+def qa_outputs(now):
+    """Remove generated question files no job references."""
+    return remove_orphan_files(
+        settings.BRAIN_OUTPUT_DIR, referenced_files('output_file'),
+        now - timedelta(days=RETENTION_DAYS['qa_outputs']),
+    )
+
+
+TASKS = {
+    'expired_otps': expired_otps,
+    'rate_limits': rate_limits,
+    'webhook_outbox': webhook_outbox,
+    'temp_extracts': temp_extracts,
+    'qa_outputs': qa_outputs,
+}
+
+
+def run_housekeeping(tasks=None, now=None):
+    """
+    Run housekeeping tasks and report what they reclaimed.
+
+    A task that fails is logged and reported with its error; the others still run.
+
+    Args:
+        tasks: Task names to run (default: all of TASKS)
+        now: Reference time for the retention cutoffs
+
+    Returns:
+        dict: Task name -> {'rows', 'files', 'bytes', 'seconds'} (and 'error' on failure)
+    """
+    now = now or timezone.now()
+    report = {}
+    for name in tasks or TASKS:
+        started = time.perf_counter()
+        try:
+            result = {'rows': 0, 'files': 0, 'bytes': 0, **TASKS[name](now)}
+        except Exception as e:
+            logger.exception(f"Housekeeping task {name} failed")
+            result = {'rows': 0, 'files': 0, 'bytes': 0, 'error': str(e)}
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        report[name] = result
+    logger.info(
+        f"Housekeeping removed {sum(r['rows'] for r in report.values())} rows and "
+        f"{sum(r['files'] for r in report.values())} files ({format_bytes(sum(r['bytes'] for r in report.values()))})"
+    )
+    return report
+
+
+def format_bytes(size):
+    """Human-readable size."""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class Scheduler(threading.Thread):
+    """Background thread running housekeeping every INTERVAL_HOURS"""
+
+    def __init__(self, interval_hours=INTERVAL_HOURS):
+        super().__init__(name='sisimpur-housekeeping', daemon=True)
+        self.interval = interval_hours * 3600
+        self.stopping = threading.Event()
+
+    def run(self):
+        from django.db import close_old_connections
+
+        # First run a minute after start-up, then every interval
+        delay = min(60, self.interval)
+        while not self.stopping.wait(delay):
+            delay = self.interval
+            # Only one process runs each interval
+            if not cache.add(LOCK_KEY, True, timeout=max(int(self.interval) - 60, 1)):
+                continue
+            try:
+                run_housekeeping()
+            except Exception:
+                logger.exception("Housekeeping run failed")
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self.stopping.set()
+
+
+_scheduler = None
+
+
+def start_scheduler():
+    """Start the in-process scheduler once per process."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+        _scheduler.start()
+    return _scheduler
@@ -133,6 +133,51 @@ DATABASES = {
     }
 }
 
+# SQLite tuning applied to every new connection (see core/sqlite.py)
+SQLITE_CONFIG = {
+    'JOURNAL_MODE': 'WAL',  # Readers and the writer no longer block each other
+    'SYNCHRONOUS': 'NORMAL',  # Durable with WAL; syncs at checkpoints instead of every commit
+    'BUSY_TIMEOUT_MS': 20000,  # Wait this long for the write lock before "database is locked"
+    'CACHE_SIZE_KIB': 65536,  # Page cache per connection
+    'MMAP_SIZE': 256 * 1024 * 1024,  # Memory-mapped reads, bytes
+    'SERIALIZE_WRITES': True,  # Queue hot write paths within a process (core.sqlite.serialized_write)
+}
+
+# Migrations for the project apps are generated per deployment and not committed,
+# so the test runner creates their tables straight from the models
+if len(sys.argv) > 1 and sys.argv[1] == "test":
+    MIGRATION_MODULES = {app: None for app in ("authentication", "frontend", "dashboard", "brain")}
+
+
+# Cache - file-based by default; CACHE_BACKEND=redis uses REDIS_URL (needs the redis package),
+# CACHE_BACKEND=locmem keeps entries per process. Tests always use a fresh in-memory cache.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND') or 'file'
+if len(sys.argv) > 1 and sys.argv[1] == "test":
+    CACHE_BACKEND = 'locmem'
+
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv('REDIS_URL') or 'redis://127.0.0.1:6379/1',
+        }
+    }
+elif CACHE_BACKEND == 'locmem':
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv('CACHE_DIR') or str(BASE_DIR / '.django_cache'),
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -196,6 +241,23 @@ BRAIN_CONFIG = {
     'MAX_RETRY_DELAY': 60,  # seconds
     'RATE_LIMIT_BATCH_SIZE': 3,  # Number of chunks to process before cooling down
     'RATE_LIMIT_COOLDOWN': 10,  # seconds between batches
+    'MAX_CONCURRENT_REQUESTS': 16,  # Max in-flight requests per client, counting timed-out calls still running
+
+    # Request deadline settings
+    'REQUEST_TIMEOUTS': {'ocr': 90, 'classify': 20, 'generate': 120},  # seconds per Gemini call, by task
+    'HEDGE_REQUESTS': False,  # Duplicate a call once it runs past the observed p95 latency
+    'HEDGE_MIN_SAMPLES': 20,  # Latency samples required before a task is hedged
+
+    # Model backend settings
+    'LLM_BACKEND': os.getenv('BRAIN_LLM_BACKEND', 'gemini'),  # 'fake' runs fully offline
+    'LLM_CASSETTE': os.getenv('BRAIN_LLM_CASSETTE'),  # JSON cassette: replayed by 'fake', recorded by 'gemini'
+    'FAKE_LLM': {
+        'SEED': 0,
+        'LATENCY': {'ocr': (1.5, 0.4), 'classify': (0.4, 0.3), 'generate': (3.0, 0.5)},  # (median seconds, log-normal sigma)
+        'RESOURCE_EXHAUSTED_RATE': 0.0,  # Fraction of calls failing with ResourceExhausted
+        'SERVICE_UNAVAILABLE_RATE': 0.0,  # Fraction of calls failing with ServiceUnavailable
+        'QUESTION_PAPER_RATE': 0.0,  # Fraction of images classified as question papers
+    },
 
     # Model settings
     'DEFAULT_GEMINI_MODEL': "models/gemini-1.5-flash",
@@ -205,9 +267,26 @@ BRAIN_CONFIG = {
     # Document processing settings
     'MIN_TEXT_LENGTH': 100,  # Minimum text length to consider a PDF as text-based
 
+    # Benchmark corpus: TTF/OTF font with Bengali glyphs for the scanned/image Bengali pages
+    # (default: first of the common Noto Sans Bengali / Lohit Bengali install paths found)
+    'BENCH_BENGALI_FONT': os.getenv('BRAIN_BENCH_BENGALI_FONT'),
+
+    # /metrics access: staff users, or scrapers sending "Authorization: Bearer <token>"
+    'METRICS_TOKEN': os.getenv('BRAIN_METRICS_TOKEN'),
+
+    # Job status polling
+    'STATUS_LONG_POLL_MAX_SECONDS': 30,  # Longest a status request may be held waiting for a change
+    'STATUS_LONG_POLL_INTERVAL': 0.5,  # seconds between status checks while a request is held
+
     # Question type settings
     'QUESTION_TYPE': "MULTIPLECHOICE",  # Options: "SHORT" or "MULTIPLECHOICE"
     'ANSWER_OPTIONS': 4,  # Number of options for multiple choice questions
+
+    # Token budgeting settings
+    'CHARS_PER_TOKEN': {'english': 4.0, 'bengali': 1.6},  # Bengali costs ~2.5x more tokens per character
+    'IMAGE_TOKENS': 258,  # Input tokens charged per image part
+    'CHUNK_TOKEN_BUDGET': 500,  # Source text tokens per generation chunk (~2,000 English characters)
+    'MAX_PROMPT_TOKENS': 30000,  # Prompts estimated above this are split or rejected
 }
 
 # File upload settings
@@ -233,6 +312,20 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 
+# Background email sending (see apps/authentication/email_queue.py)
+EMAIL_QUEUE_CONFIG = {
+    'ASYNC': True,  # Send from a background thread; False sends inline
+    'MAX_QUEUED': 500,  # Bounded queue: emails beyond this are refused
+    'BATCH_SIZE': 20,  # Emails sent per batch over the open SMTP connection
+    'MAX_RETRIES': 3,  # Attempts per email, each on a fresh connection
+    'RETRY_BASE_SECONDS': 1,  # Backoff doubles from this after each failed attempt
+    'IDLE_SECONDS': 30,  # Close the SMTP connection after this long without mail
+    'UNHEALTHY_AFTER': 3,  # After this many emails in a row fail, check the mail server before queueing
+}
+
+if len(sys.argv) > 1 and sys.argv[1] == "test":
+    EMAIL_QUEUE_CONFIG['ASYNC'] = False
+
 # OTP Configuration - Security Best Practices
 OTP_CONFIG = {
     'OTP_LENGTH': 6,
@@ -241,9 +334,63 @@ OTP_CONFIG = {
     'RESEND_COOLDOWN_MINUTES': 2,
     'MAX_HOURLY_ATTEMPTS': 5,  # Rate limiting: 5 OTP requests per hour per email/IP
     'BLOCK_DURATION_HOURS': 1,  # Block duration after exceeding rate limit
+    # 'cache' (sliding window, see apps/authentication/rate_limit.py) or 'database'; 'cache' needs
+    # CACHE_BACKEND=redis or locmem and falls back to 'database' on the file cache
+    'RATE_LIMIT_BACKEND': 'cache',
     'CLEANUP_INTERVAL_HOURS': 24,  # How often to clean up expired records
 }
 
+# Housekeeping retention policies (see core/housekeeping.py)
+HOUSEKEEPING_CONFIG = {
+    'RUN_IN_PROCESS': os.getenv('HOUSEKEEPING_IN_PROCESS', 'False').lower() == 'true',  # Else run "manage.py housekeeping" from cron
+    'INTERVAL_HOURS': OTP_CONFIG['CLEANUP_INTERVAL_HOURS'],  # Time between in-process runs
+    'BATCH_SIZE': 500,  # Rows deleted per write transaction
+    'BATCH_PAUSE_SECONDS': 0.05,  # Pause between batches so request writes get the lock
+    'RETENTION_DAYS': {
+        'rate_limits': 7,  # Idle OTP rate limit records and passed blocks
+        'webhook_outbox': 14,  # Sent, failed and dropped webhook events
+        'temp_extracts': 1,  # Extracted text files no job references
+        'qa_outputs': 7,  # Generated question files no job references
+    },
+}
+
+if len(sys.argv) > 1 and sys.argv[1] == "test":
+    HOUSEKEEPING_CONFIG['RUN_IN_PROCESS'] = False
+
+# Cached job results (see apps/brain/results_cache.py)
+RESULTS_CACHE_CONFIG = {
+    'TIMEOUT_SECONDS': 60 * 60 * 24,  # Entries are versioned by the job's updated_at, so this only bounds storage
+}
+
+# Discord webhook outbox (see apps/dashboard/outbox.py)
+WEBHOOK_OUTBOX_CONFIG = {
+    'RUN_IN_PROCESS': os.getenv('WEBHOOK_DISPATCH_IN_PROCESS', 'True').lower() == 'true',  # False: run dispatch_webhooks
+    'POLL_INTERVAL_SECONDS': 5,  # How often the dispatcher looks for due events
+    'BATCH_WINDOW_SECONDS': 2,  # Wait after a new event so events close together share a message
+    'EMBEDS_PER_MESSAGE': 10,  # Discord allows at most 10 embeds per message
+    'CLAIM_LIMIT': 100,  # Events leased per dispatch pass
+    'MAX_PENDING': 1000,  # Bounded backlog: the oldest pending events beyond this are dropped
+    'MAX_ATTEMPTS': 6,  # Attempts before an event is marked failed
+    'RETRY_BASE_SECONDS': 5,  # Backoff doubles from this after each failed attempt
+    'RETRY_MAX_SECONDS': 600,  # Longest backoff between attempts
+    'LEASE_SECONDS': 60,  # A claimed event is retried by another dispatcher after this
+    'SEND_TIMEOUT_SECONDS': 10,  # Timeout of one Discord request
+}
+
+if len(sys.argv) > 1 and sys.argv[1] == "test":
+    WEBHOOK_OUTBOX_CONFIG['RUN_IN_PROCESS'] = False
+
+# Leaderboard snapshots (see apps/dashboard/leaderboard.py)
+LEADERBOARD_CONFIG = {
+    'REFRESH_INTERVAL_SECONDS': 30,  # Minimum time between rebuilds of a stale window
+    'MAX_AGE_SECONDS': 900,  # Rebuild any window older than this, so rolling windows move forward
+    'TOP_N': 50,  # Entries shown on the leaderboard page
+    'NEIGHBOURS': 2,  # Entries shown above and below a user outside the top
+    'REFRESH_IN_PROCESS': True,  # Rebuild windows from a thread of the web process; False: run refresh_leaderboard
+}
+if len(sys.argv) > 1 and sys.argv[1] == "test":
+    LEADERBOARD_CONFIG['REFRESH_IN_PROCESS'] = False
+
 # Logging configuration for debugging
 LOGGING = {
     'version': 1,
@@ -0,0 +1,107 @@
+"""
+SQLite connection tuning and write serialization.
+
+``configure_connection`` runs on every new database connection (it is
+connected to ``connection_created`` in the brain app's ready()) and applies
+SQLITE_CONFIG:
+
+- WAL journal, so readers no longer block the writer or each other
+- ``synchronous=NORMAL``, which is durable with WAL and syncs at checkpoints
+  instead of on every commit
+- ``busy_timeout``, so a connection waits for the write lock instead of
+  failing with "database is locked"
+- a larger page cache and memory-mapped reads
+
+SQLite still allows one writer at a time, and a transaction that reads before
+it writes cannot wait for the lock: if another connection wrote in between,
+its upgrade fails at once. ``serialized_write`` runs the hot write paths
+(question inserts, exam answers) as one short transaction each, one at a time
+per process, so they queue instead of failing.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger("sisimpur.core.sqlite")
+
+SQLITE_CONFIG = getattr(settings, 'SQLITE_CONFIG', {})
+
+# Held by serialized_write for the hot write paths of this process
+write_lock = threading.RLock()
+
+
+def pragmas(config=None):
+    """PRAGMA statements for a SQLite config (default SQLITE_CONFIG)."""
+    config = SQLITE_CONFIG if config is None else config
+    statements = []
+    if config.get('JOURNAL_MODE'):
+        statements.append(f"PRAGMA journal_mode={config['JOURNAL_MODE']}")
+    if config.get('SYNCHRONOUS'):
+        statements.append(f"PRAGMA synchronous={config['SYNCHRONOUS']}")
+    if config.get('BUSY_TIMEOUT_MS') is not None:
+        statements.append(f"PRAGMA busy_timeout={int(config['BUSY_TIMEOUT_MS'])}")
+    if config.get('CACHE_SIZE_KIB'):
+        # Negative cache_size is in KiB rather than pages
+        statements.append(f"PRAGMA cache_size=-{int(config['CACHE_SIZE_KIB'])}")
+    if config.get('MMAP_SIZE') is not None:
+        statements.append(f"PRAGMA mmap_size={int(config['MMAP_SIZE'])}")
+    return statements
+
+
+def apply_pragmas(cursor, config=None):
+    """Run the tuning PRAGMAs on a SQLite cursor (DB-API or Django)."""
+    for statement in pragmas(config):
+        cursor.execute(statement)
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created handler: tune new SQLite connections."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor)
+    logger.debug(f"Tuned SQLite connection {connection.alias}")
+
+
+@contextmanager
+def serialized_write(using='default'):
+    """
+    Run a block as one write transaction, one at a time per process on SQLite.
+
+    Keep the block short: do reads that do not need to be consistent with the
+    write, and any slow work, before entering it. Nesting is allowed.
+    """
+    serialize = SQLITE_CONFIG.get('SERIALIZE_WRITES', True) and connections[using].vendor == 'sqlite'
+    with (write_lock if serialize else nullcontext()), transaction.atomic(using=using):
+        yield
+
+
+def delete_in_batches(queryset, batch_size=500, pause_seconds=0.0, using='default'):
+    """
+    Delete a queryset's rows a bounded batch at a time.
+
+    Each batch is its own short serialized write, so a large cleanup never
+    holds the SQLite write lock for long; ``pause_seconds`` between batches
+    lets request writes in.
+
+    Returns:
+        Number of rows of the queryset's model deleted (cascades not counted)
+    """
+    model = queryset.model
+    total = 0
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        with serialized_write(using):
+            _, per_model = model.objects.using(using).filter(pk__in=ids).delete()
+        total += per_model.get(model._meta.label, 0)
+        if len(ids) < batch_size:
+            return total
+        if pause_seconds:
+            time.sleep(pause_seconds)
@@ -3,6 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from apps.frontend.views import health_check
+from apps.brain.views import metrics
 
 
 urlpatterns = [
@@ -10,6 +11,7 @@ urlpatterns = [
     path("healthz/", health_check, name="health_check"),  # Health check endpoint
     path("health/", health_check, name="health_check_alt"),  # Alternative health check
     path("ping/", health_check, name="ping"),  # Simple ping endpoint
+    path("metrics", metrics, name="metrics"),  # Prometheus scrape endpoint
     path("", include("apps.frontend.urls")),
     path("auth/", include("apps.authentication.urls")),
     path("app/", include("apps.dashboard.urls")),
@@ -13,6 +13,7 @@ django.setup()
 
 from django.contrib.auth.models import User
 from apps.brain.models import ProcessingJob
+from apps.dashboard.outbox import dispatch_pending
 from apps.utils import send_document_processing_success_webhook, send_document_processing_failed_webhook
 
 def test_webhook():
@@ -41,51 +42,6 @@ def test_webhook():
     )
     job.mark_completed()
     
-    # Test data with questions
-    qa_data_success = {
-        'questions': [
-            {
-                'question': 'What is the capital of France?',
-                'options': [
-                    {'key': 'A', 'text': 'London'},
-                    {'key': 'B', 'text': 'Berlin'},
-                    {'key': 'C', 'text': 'Paris'},
-                    {'key': 'D', 'text': 'Madrid'}
-                ],
-                'answer': 'Paris',
-                'correct_option': 'C',
-                'type': 'MULTIPLECHOICE'
-            },
-            {
-                'question': 'What is 2 + 2?',
-                'options': [
-                    {'key': 'A', 'text': '3'},
-                    {'key': 'B', 'text': '4'},
-                    {'key': 'C', 'text': '5'},
-                    {'key': 'D', 'text': '6'}
-                ],
-                'answer': '4',
-                'correct_option': 'B',
-                'type': 'MULTIPLECHOICE'
-            }
-        ],
-        'metadata': {
-            'language': 'auto',
-            'question_type': 'MULTIPLECHOICE',
-            'source_document': 'test_document.pdf'
-        }
-    }
-    
-    # Test data with no questions (should trigger failure)
-    qa_data_failure = {
-        'questions': [],
-        'metadata': {
-            'language': 'auto',
-            'question_type': 'MULTIPLECHOICE',
-            'source_document': 'test_document.pdf'
-        }
-    }
-    
     print("🧪 Testing Discord Webhook Functionality")
     print("=" * 50)
     
@@ -94,8 +50,7 @@ def test_webhook():
     result1 = send_document_processing_success_webhook(
         user=user,
         job=job,
-        questions_count=2,
-        qa_data=qa_data_success
+        questions_count=2
     )
     print(f"Result: {result1}")
     
@@ -104,8 +59,7 @@ def test_webhook():
     result2 = send_document_processing_success_webhook(
         user=user,
         job=job,
-        questions_count=0,
-        qa_data=qa_data_failure
+        questions_count=0
     )
     print(f"Result: {result2}")
     
@@ -114,11 +68,14 @@ def test_webhook():
     result3 = send_document_processing_failed_webhook(
         user=user,
         job=job,
-        error_message="Test error: Document could not be processed",
-        qa_data=qa_data_failure
+        error_message="Test error: Document could not be processed"
     )
     print(f"Result: {result3}")
     
+    # The webhooks above were queued in the outbox; deliver them now
+    print("\n📡 Dispatching queued webhooks")
+    print(f"Result: {dispatch_pending()}")
+    
     print("\n✅ Webhook testing completed!")
     print(f"📝 Test job ID: {job.id}")
     